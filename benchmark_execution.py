@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Load test and latency benchmark for code execution.
+
+Drives CodeExecutor.execute_code and the /api/execute endpoint in-process
+(through Flask's test client) with a configurable mix of languages,
+submission sizes and failing submissions, and writes the results as JSON
+so runs can be compared between releases.
+
+Example:
+    python benchmark_execution.py --target both --concurrency 16 --submissions 200 \\
+        --languages python=3,javascript=1 --tle-rate 0.05 --crash-rate 0.05 --output bench.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from code_execution.generators import generate_cases
+
+PROBLEM_ID = 'two_sum'
+
+# Submissions for two_sum by kind: a correct solution, one that never
+# returns and one that crashes the process
+SUBMISSIONS = {
+    'python': {
+        'correct': """def solution(nums, target):
+    seen = {}
+    for i, num in enumerate(nums):
+        if target - num in seen:
+            return [seen[target - num], i]
+        seen[num] = i
+    return []
+""",
+        'tle': """def solution(nums, target):
+    while True:
+        pass
+""",
+        'crash': """import os
+def solution(nums, target):
+    os._exit(1)
+"""
+    },
+    'javascript': {
+        'correct': """function solution(nums, target) {
+    const seen = new Map();
+    for (let i = 0; i < nums.length; i++) {
+        if (seen.has(target - nums[i])) return [seen.get(target - nums[i]), i];
+        seen.set(nums[i], i);
+    }
+    return [];
+}
+""",
+        'tle': """function solution(nums, target) {
+    while (true) {}
+}
+""",
+        'crash': """function solution(nums, target) {
+    process.exit(1);
+}
+"""
+    },
+    'cpp': {
+        'correct': """vector<int> solution(vector<int>& nums, int target) {
+    unordered_map<int, int> seen;
+    for (int i = 0; i < (int)nums.size(); i++) {
+        auto it = seen.find(target - nums[i]);
+        if (it != seen.end()) return {it->second, i};
+        seen[nums[i]] = i;
+    }
+    return {};
+}
+""",
+        'tle': """vector<int> solution(vector<int>& nums, int target) {
+    volatile int spin = 0;
+    while (true) { spin++; }
+}
+""",
+        'crash': """vector<int> solution(vector<int>& nums, int target) {
+    abort();
+}
+"""
+    },
+    'java': {
+        'correct': """public static int[] solution(int[] nums, int target) {
+    java.util.Map<Integer, Integer> seen = new java.util.HashMap<>();
+    for (int i = 0; i < nums.length; i++) {
+        if (seen.containsKey(target - nums[i])) return new int[]{seen.get(target - nums[i]), i};
+        seen.put(nums[i], i);
+    }
+    return new int[0];
+}
+""",
+        'tle': """public static int[] solution(int[] nums, int target) {
+    while (true) {}
+}
+""",
+        'crash': """public static int[] solution(int[] nums, int target) {
+    System.exit(1);
+    return null;
+}
+"""
+    }
+}
+
+COMMENT_PREFIX = {'python': '#', 'javascript': '//', 'cpp': '//', 'java': '//'}
+
+
+def parse_weights(spec):
+    """'python=3,javascript=1' -> {'python': 3.0, 'javascript': 1.0}"""
+    weights = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def parse_sizes(spec):
+    return [int(size) for size in spec.split(',') if size.strip()]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def latency_summary(latencies):
+    values = sorted(latencies)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values),
+        'p50': percentile(values, 0.50),
+        'p95': percentile(values, 0.95),
+        'p99': percentile(values, 0.99),
+        'max': values[-1]
+    }
+
+
+def build_submission(language, kind, code_bytes, nonce):
+    """Source of one submission, padded with comments to about ``code_bytes``.
+
+    The nonce keeps every submission distinct, so the result cache never
+    answers for the executor.
+    """
+    prefix = COMMENT_PREFIX[language]
+    code = SUBMISSIONS[language][kind] + f'{prefix} submission {nonce}\n'
+    padding_line = f'{prefix} {"x" * 70}\n'
+    while len(code) + len(padding_line) <= code_bytes:
+        code += padding_line
+    return code
+
+
+def plan_submissions(args, rng):
+    """Every submission of the run: (language, kind, code size, input size)"""
+    languages = parse_weights(args.languages)
+    code_sizes = parse_sizes(args.code_bytes)
+    input_sizes = parse_sizes(args.input_sizes)
+    plan = []
+    for _ in range(args.warmup + args.submissions):
+        language = rng.choices(list(languages), weights=list(languages.values()))[0]
+        roll = rng.random()
+        if roll < args.tle_rate:
+            kind = 'tle'
+        elif roll < args.tle_rate + args.crash_rate:
+            kind = 'crash'
+        else:
+            kind = 'correct'
+        plan.append((language, kind, rng.choice(code_sizes), rng.choice(input_sizes)))
+    return plan
+
+
+class ResourceSampler:
+    """Samples the RSS of this process and its descendants (workers, fork
+    servers, submissions) in the background, when psutil is available"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_tree_rss = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        process = psutil.Process()
+        while not self._stop.is_set():
+            total = 0
+            try:
+                for member in [process] + process.children(recursive=True):
+                    try:
+                        total += member.memory_info().rss
+                    except psutil.Error:
+                        pass
+            except psutil.Error:
+                pass
+            self.peak_tree_rss = max(self.peak_tree_rss, total)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        if psutil is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+
+def host_cpu():
+    if resource is None:
+        return {}
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return {'user': usage.ru_utime, 'sys': usage.ru_stime}
+
+
+def run_load(name, plan, submit, concurrency, warmup):
+    """Run ``plan`` through ``submit`` with ``concurrency`` threads and summarize"""
+    for entry in plan[:warmup]:
+        submit(*entry)
+    measured = plan[warmup:]
+
+    records = []
+    records_lock = threading.Lock()
+
+    def run_one(entry):
+        start = time.perf_counter()
+        outcome = submit(*entry)
+        latency = (time.perf_counter() - start) * 1000
+        with records_lock:
+            records.append((entry, latency, outcome))
+
+    cpu_before = host_cpu()
+    with ResourceSampler() as sampler, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        wall_start = time.perf_counter()
+        list(pool.map(run_one, measured))
+        wall_time = time.perf_counter() - wall_start
+    cpu_after = host_cpu()
+
+    by_kind, by_language, outcomes = {}, {}, {}
+    submission_cpu = 0.0
+    for (language, kind, _, _), latency, outcome in records:
+        by_kind.setdefault(kind, []).append(latency)
+        by_language.setdefault(language, []).append(latency)
+        outcomes[outcome['status']] = outcomes.get(outcome['status'], 0) + 1
+        submission_cpu += outcome.get('cpu_ms', 0)
+
+    report = {
+        'target': name,
+        'submissions': len(records),
+        'wall_time_s': wall_time,
+        'throughput_per_s': len(records) / wall_time if wall_time else None,
+        'latency_ms': latency_summary([latency for _, latency, _ in records]),
+        'latency_ms_by_kind': {kind: latency_summary(v) for kind, v in sorted(by_kind.items())},
+        'latency_ms_by_language': {lang: latency_summary(v) for lang, v in sorted(by_language.items())},
+        'outcomes': outcomes,
+        'cpu': {
+            'host_user_s': cpu_after.get('user', 0) - cpu_before.get('user', 0),
+            'host_sys_s': cpu_after.get('sys', 0) - cpu_before.get('sys', 0),
+            'submissions_ms': submission_cpu
+        },
+        'memory': {
+            'host_peak_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else None,
+            'tree_peak_rss_bytes': sampler.peak_tree_rss if psutil else None
+        }
+    }
+    return report
+
+
+def classify(result, status_code=200):
+    """Reduce an execution result to an outcome and the CPU it reports"""
+    if status_code == 503 or result.get('busy'):
+        status = 'busy'
+    elif not result.get('success', True) and 'results' in result and not result['results']:
+        status = 'error'
+    elif result.get('all_passed'):
+        status = 'passed'
+    else:
+        status = 'failed'
+    resources = result.get('resources') or {}
+    return {'status': status, 'cpu_ms': (resources.get('cpuUser') or 0) + (resources.get('cpuSys') or 0)}
+
+
+def executor_target(executor, problems_db):
+    """Submit straight to CodeExecutor.execute_code"""
+    stock_cases = problems_db.get_test_cases(PROBLEM_ID)
+    generated = {}
+
+    def test_cases(input_size):
+        if input_size <= 0:
+            return stock_cases
+        if input_size not in generated:
+            generated[input_size] = generate_cases('two_sum', [input_size], repeats=len(stock_cases))
+        return generated[input_size]
+
+    nonces = iter(range(sys.maxsize))
+    nonce_lock = threading.Lock()
+
+    def submit(language, kind, code_bytes, input_size):
+        with nonce_lock:
+            nonce = next(nonces)
+        code = build_submission(language, kind, code_bytes, f'executor-{nonce}')
+        result = executor.execute_code(code, language, test_cases(input_size), PROBLEM_ID)
+        return classify(result)
+    return submit
+
+
+def api_target(app):
+    """Submit through POST /api/execute on Flask's test client"""
+    nonces = iter(range(sys.maxsize))
+    nonce_lock = threading.Lock()
+    local = threading.local()
+
+    def submit(language, kind, code_bytes, input_size):
+        with nonce_lock:
+            nonce = next(nonces)
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        code = build_submission(language, kind, code_bytes, f'api-{nonce}')
+        response = local.client.post('/api/execute', json={
+            'code': code,
+            'language': language,
+            'problem_id': PROBLEM_ID
+        })
+        return classify(response.get_json() or {}, response.status_code)
+    return submit
+
+
+def set_timeouts(executor, timeout):
+    if timeout is not None:
+        for lang_config in executor.supported_languages.values():
+            lang_config['timeout'] = timeout
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--target', choices=['executor', 'api', 'both'], default='executor')
+    parser.add_argument('--submissions', type=int, default=100, help='measured submissions per target')
+    parser.add_argument('--warmup', type=int, default=5, help='unmeasured submissions run first')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--languages', default='python=1,javascript=1',
+                        help='language mix as name=weight pairs')
+    parser.add_argument('--code-bytes', default='0',
+                        help='comma-separated submission sizes in bytes (source is padded to them)')
+    parser.add_argument('--input-sizes', default='0',
+                        help='comma-separated generated input sizes; 0 uses the stock test cases (executor only)')
+    parser.add_argument('--tle-rate', type=float, default=0.0, help='fraction of submissions that never return')
+    parser.add_argument('--crash-rate', type=float, default=0.0, help='fraction of submissions that crash')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='per-test time limit in seconds (default: the executor\'s own)')
+    parser.add_argument('--worker-pool-size', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    args = parser.parse_args(argv)
+
+    unknown = set(parse_weights(args.languages)) - set(SUBMISSIONS)
+    if unknown:
+        parser.error(f'no benchmark submissions for: {", ".join(sorted(unknown))}')
+
+    rng = random.Random(args.seed)
+    reports = []
+
+    if args.target in ('executor', 'both'):
+        from code_execution.executor import CodeExecutor
+        from code_execution.problems import ProblemsDatabase
+        problems_db = ProblemsDatabase()
+        executor = CodeExecutor(worker_pool_size=args.worker_pool_size, problems_db=problems_db)
+        set_timeouts(executor, args.timeout)
+        reports.append(run_load('executor', plan_submissions(args, rng),
+                                executor_target(executor, problems_db), args.concurrency, args.warmup))
+
+    if args.target in ('api', 'both'):
+        # The app builds its own executor, as it would in production
+        import test_app
+        set_timeouts(test_app.code_executor, args.timeout)
+        # The endpoint logs every request to stdout, which is where the report goes
+        with contextlib.redirect_stdout(sys.stderr):
+            reports.append(run_load('api', plan_submissions(args, rng),
+                                    api_target(test_app.app), args.concurrency, args.warmup))
+
+    report = {
+        'config': vars(args),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'timestamp': time.time(),
+        'results': reports
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,30 @@
-from flask import Blueprint, jsonify, request
+import json
+import os
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
+from code_execution.complexity import ComplexityGrader
 from code_execution.executor import CodeExecutor
+from code_execution.jobs import JobScheduler, QueueFullError
+from code_execution.problem_listing import ListingError, ProblemListing
 from code_execution.problems import ProblemsDatabase
+from code_execution.result_cache import ResultCache
+from code_execution.run_control import RunOptionsError, parse_run_options
+from code_execution.sandbox import SandboxManager, parse_uid_range
 
 code_bp = Blueprint('code_bp', __name__)
 CORS_orig = CORS  # Save reference to CORS for use in main app if needed
-code_executor = CodeExecutor()
+result_cache = ResultCache()
 problems_db = ProblemsDatabase()
+# Required when running as root: submissions are switched to this account, or
+# to a uid of their own per working directory from EVALEDGE_SANDBOX_UIDS
+sandbox = SandboxManager(user=os.environ.get('EVALEDGE_SANDBOX_USER', 'nobody'),
+                         uids=parse_uid_range(os.environ.get('EVALEDGE_SANDBOX_UIDS', '2000000-2000999')))
+code_executor = CodeExecutor(worker_pool_size=4, result_cache=result_cache, problems_db=problems_db,
+                             sandbox=sandbox, time_budget=120)
+problems_db.add_change_listener(result_cache.invalidate_problem)
+job_scheduler = JobScheduler(code_executor, max_concurrency=4)
+complexity_grader = ComplexityGrader(code_executor, problems_db)
+problem_listing = ProblemListing(problems_db)
 
 @code_bp.route('/')
 def home():
@@ -15,10 +33,29 @@ def home():
 @code_bp.route('/api/problems', methods=['GET'])
 def get_problems():
     try:
-        problems = problems_db.get_all_problems()
-        return jsonify({"problems": problems}), 200
+        payload = problem_listing.get(
+            ProblemListing.parse_fields(request.args.get('fields')),
+            difficulty=request.args.get('difficulty'),
+            tag=request.args.get('tag'),
+            page=request.args.get('page', type=int),
+            per_page=request.args.get('per_page', type=int)
+        )
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    use_gzip = request.accept_encodings['gzip'] > 0
+    etag = payload.etag + ('-gzip' if use_gzip else '')
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(payload.gzipped() if use_gzip else payload.body, mimetype='application/json')
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @code_bp.route('/api/problems/<problem_id>', methods=['GET'])
 def get_problem(problem_id):
@@ -26,7 +63,7 @@ def get_problem(problem_id):
         problem = problems_db.get_problem(problem_id)
         if not problem:
             return jsonify({"error": "Problem not found"}), 404
-        return jsonify({"problem": problem}), 200
+        return jsonify({"problem": problems_db.public_view(problem)}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -48,11 +85,63 @@ def execute_code():
         test_cases = problems_db.get_test_cases(problem_id)
         if not test_cases:
             return jsonify({"error": "No test cases found for this problem"}), 404
-        result = code_executor.execute_code(code, language, test_cases, problem_id)
-        return jsonify(result), 200
+        if data.get('mode') == 'performance':
+            result = complexity_grader.grade(code, language, problem_id)
+        else:
+            fail_fast, time_budget = parse_run_options(data)
+            result = code_executor.execute_code(code, language, test_cases, problem_id,
+                                                test_set_version=problems_db.get_test_set_version(problem_id),
+                                                fail_fast=fail_fast, time_budget=time_budget)
+        return jsonify(result), 503 if result.get('busy') else 200
+    except RunOptionsError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@code_bp.route('/api/execute/stream', methods=['POST'])
+def execute_code_stream():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    required_fields = ['code', 'language', 'problem_id']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({"error": f"Missing required field: {field}"}), 400
+    problem_id = data['problem_id']
+    if data.get('sample'):
+        test_cases = problems_db.get_sample_test_cases(problem_id)
+        test_set_version = None
+    else:
+        test_cases = problems_db.get_test_cases(problem_id)
+        test_set_version = problems_db.get_test_set_version(problem_id)
+    if not test_cases:
+        return jsonify({"error": "No test cases found for this problem"}), 404
+    try:
+        fail_fast, time_budget = parse_run_options(data)
+    except RunOptionsError as e:
+        return jsonify({"error": str(e)}), 400
+    events = code_executor.stream_code(data['code'], data['language'], test_cases, problem_id,
+                                       test_set_version=test_set_version,
+                                       fail_fast=fail_fast, time_budget=time_budget)
+    ndjson = request.accept_mimetypes.best_match(['text/event-stream', 'application/x-ndjson']) == 'application/x-ndjson'
+
+    def generate():
+        yield stream_line('start', {"total_tests": len(test_cases)}, ndjson)
+        for event, payload in events:
+            if event == 'ping':
+                yield "\n" if ndjson else ": ping\n\n"
+            else:
+                yield stream_line(event, payload, ndjson)
+
+    return Response(stream_with_context(generate()),
+                    mimetype='application/x-ndjson' if ndjson else 'text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def stream_line(event, data, ndjson):
+    if ndjson:
+        return json.dumps({"event": event, "data": data}) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @code_bp.route('/api/run-sample', methods=['POST'])
 def run_sample():
     try:
@@ -64,11 +153,66 @@ def run_sample():
         code = data['code']
         language = data['language']
         problem_id = data['problem_id']
-        test_cases = problems_db.get_test_cases(problem_id)
+        sample_test = problems_db.get_sample_test_cases(problem_id)
+        if not sample_test:
+            return jsonify({"error": "No test cases found for this problem"}), 404
+        fail_fast, time_budget = parse_run_options(data)
+        result = code_executor.execute_code(code, language, sample_test, problem_id,
+                                            fail_fast=fail_fast, time_budget=time_budget)
+        return jsonify(result), 503 if result.get('busy') else 200
+    except RunOptionsError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500 
+
+@code_bp.route('/api/jobs', methods=['POST'])
+def submit_job():
+    try:
+        data = request.get_json()
+        required_fields = ['code', 'language', 'problem_id']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({"error": f"Missing required field: {field}"}), 400
+        test_cases = problems_db.get_test_cases(data['problem_id'])
         if not test_cases:
             return jsonify({"error": "No test cases found for this problem"}), 404
-        sample_test = [test_cases[0]]
-        result = code_executor.execute_code(code, language, sample_test, problem_id)
-        return jsonify(result), 200
+        test_set_version = problems_db.get_test_set_version(data['problem_id'])
+        if data.get('sample'):
+            test_cases = problems_db.get_sample_test_cases(data['problem_id'])
+            test_set_version = None
+        # Never a client-supplied id: one client could take a turn per id
+        candidate_id = request.remote_addr
+        fail_fast, time_budget = parse_run_options(data)
+        job = job_scheduler.submit(candidate_id, data['code'], data['language'], test_cases, data['problem_id'],
+                                   fail_fast=fail_fast, time_budget=time_budget,
+                                   test_set_version=test_set_version)
+        return jsonify({"job_id": job.id, "status": job.status}), 202
+    except RunOptionsError as e:
+        return jsonify({"error": str(e)}), 400
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
-        return jsonify({"error": str(e)}), 500 
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+@code_bp.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_scheduler.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+@code_bp.route('/api/jobs/<job_id>/stream', methods=['GET'])
+def stream_job(job_id):
+    job = job_scheduler.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    def generate():
+        for event, data in job.events():
+            if event == 'ping':
+                yield ": ping\n\n"
+            else:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -0,0 +1,146 @@
+# Incremental, size-bounded capture of subprocess output
+import os
+import subprocess
+import threading
+from typing import BinaryIO, Callable, Iterator, Optional
+
+CHUNK_SIZE = 64 * 1024
+
+# Yielded by iter_lines in place of a line longer than the limit
+LINE_TOO_LONG = object()
+
+
+class BoundedCapture:
+    """Drains a binary pipe on a background thread, keeping a bounded excerpt.
+
+    Everything is read, so the writer never stalls on a full pipe, but only
+    the first and last ``limit // 2`` bytes are kept; the middle is replaced
+    by a truncation marker. ``on_overflow`` is called once when the total
+    passes ``hard_limit`` (e.g. to kill the writer). Bytes are only decoded
+    when ``text`` is called.
+    """
+
+    def __init__(self, stream: BinaryIO, limit: int = 64 * 1024, hard_limit: Optional[int] = None,
+                 on_overflow: Optional[Callable[[], None]] = None):
+        self._stream = stream
+        self.limit = limit
+        self.hard_limit = hard_limit
+        self._on_overflow = on_overflow
+        self._head = bytearray()
+        self._tail = bytearray()
+        self.total = 0
+        self.overflowed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        fd = self._stream.fileno()
+        half = self.limit // 2
+        while True:
+            try:
+                chunk = os.read(fd, CHUNK_SIZE)
+            except OSError:
+                break
+            if not chunk:
+                break
+            with self._lock:
+                self.total += len(chunk)
+                room = half - len(self._head)
+                if room > 0:
+                    self._head += chunk[:room]
+                    chunk = chunk[room:]
+                if chunk:
+                    self._tail += chunk
+                    del self._tail[:-half]
+                overflowed = self.hard_limit is not None and self.total > self.hard_limit and not self.overflowed
+                if overflowed:
+                    self.overflowed = True
+            if overflowed and self._on_overflow:
+                self._on_overflow()
+
+    def join(self, timeout: Optional[float] = None):
+        self._thread.join(timeout)
+
+    def text(self) -> str:
+        with self._lock:
+            head, tail, total = bytes(self._head), bytes(self._tail), self.total
+        dropped = total - len(head) - len(tail)
+        if dropped <= 0:
+            return (head + tail).decode('utf-8', errors='replace')
+        return (head.decode('utf-8', errors='replace')
+                + f'\n... [{dropped} bytes truncated] ...\n'
+                + tail.decode('utf-8', errors='replace'))
+
+
+def iter_lines(stream: BinaryIO, max_line_bytes: Optional[int] = None) -> Iterator[object]:
+    """Decoded lines of a binary pipe, read in chunks as they arrive.
+
+    A line longer than ``max_line_bytes`` is skipped without being buffered
+    and ``LINE_TOO_LONG`` is yielded in its place.
+    """
+    fd = stream.fileno()
+    pending = bytearray()
+    skipping = False
+    while True:
+        try:
+            chunk = os.read(fd, CHUNK_SIZE)
+        except OSError:
+            return
+        if not chunk:
+            if pending and not skipping:
+                yield pending.decode('utf-8', errors='replace')
+            return
+        start = 0
+        while True:
+            newline = chunk.find(b'\n', start)
+            if newline < 0:
+                break
+            if skipping:
+                skipping = False
+            else:
+                pending += chunk[start:newline]
+                if max_line_bytes is not None and len(pending) > max_line_bytes:
+                    yield LINE_TOO_LONG
+                elif pending:
+                    yield pending.decode('utf-8', errors='replace')
+            pending.clear()
+            start = newline + 1
+        if not skipping:
+            pending += chunk[start:]
+            if max_line_bytes is not None and len(pending) > max_line_bytes:
+                pending.clear()
+                skipping = True
+                yield LINE_TOO_LONG
+
+
+RESULT_FD_ENV = 'EVALEDGE_RESULT_FD'
+
+
+def popen_with_result_channel(cmd, stdin=subprocess.PIPE, **kwargs):
+    """Start a harness with a private pipe for its results.
+
+    The write end is inherited by the child, which finds its number in the
+    ``EVALEDGE_RESULT_FD`` environment variable, so harness results never mix
+    with what the submission prints. stdout and stderr are binary pipes, and
+    so is stdin unless a descriptor to read from is given. Returns the
+    process and the read end of the result channel.
+    """
+    read_fd, write_fd = os.pipe()
+    try:
+        process = subprocess.Popen(
+            cmd,
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            pass_fds=(write_fd,),
+            env=dict(os.environ, **{RESULT_FD_ENV: str(write_fd)}),
+            **kwargs
+        )
+    except BaseException:
+        os.close(read_fd)
+        raise
+    finally:
+        # Only the child may hold the write end, so EOF means it exited
+        os.close(write_fd)
+    return process, os.fdopen(read_fd, 'rb', buffering=0)
@@ -0,0 +1,108 @@
+# Host-side output checkers, built once per problem from its checker spec
+import json
+import math
+from collections import Counter
+from typing import Any, Callable, Dict, Optional
+
+# A problem's ``checker`` entry is one of:
+#   {'type': 'exact'}                        JSON equality (the default)
+#   {'type': 'unordered'}                    same elements, in any order
+#   {'type': 'float', 'abs_tol': 1e-6, 'rel_tol': 1e-9}
+#                                            numbers within tolerance, anywhere in the value
+#   {'type': 'custom', 'validator': '...'}   Python source defining
+#                                            check(input, expected, actual) -> bool
+
+
+class CheckerError(ValueError):
+    """Raised for a checker spec that cannot be built"""
+
+
+def _same_kinds(a: Any, b: Any) -> bool:
+    """``==`` holds True equal to 1; JSON, and the languages we grade, do not"""
+    if type(a) is bool or type(b) is bool:
+        return type(a) is type(b)
+    if type(a) is list:
+        return all(map(_same_kinds, a, b))
+    if type(a) is dict:
+        return all(_same_kinds(value, b[key]) for key, value in a.items())
+    return True
+
+
+def exact_match(expected: Any, actual: Any) -> bool:
+    return actual == expected and _same_kinds(actual, expected)
+
+
+def unordered_match(expected: Any, actual: Any) -> bool:
+    if not isinstance(actual, list) or not isinstance(expected, list):
+        return exact_match(expected, actual)
+    if len(actual) != len(expected):
+        return False
+    try:
+        actual_sorted, expected_sorted = sorted(actual), sorted(expected)
+    except TypeError:
+        # Unorderable elements (mixed types, objects): compare as multisets
+        def key(value):
+            return json.dumps(value, sort_keys=True)
+        return Counter(map(key, actual)) == Counter(map(key, expected))
+    return exact_match(expected_sorted, actual_sorted)
+
+
+def tolerance_match(abs_tol: float, rel_tol: float) -> Callable[[Any, Any], bool]:
+    def match(expected: Any, actual: Any) -> bool:
+        if isinstance(expected, bool) or isinstance(actual, bool):
+            return type(expected) is type(actual) and expected == actual
+        if isinstance(expected, (int, float)) and isinstance(actual, (int, float)):
+            return math.isclose(actual, expected, rel_tol=rel_tol, abs_tol=abs_tol)
+        if isinstance(expected, list) and isinstance(actual, list):
+            return len(expected) == len(actual) and all(map(match, expected, actual))
+        if isinstance(expected, dict) and isinstance(actual, dict):
+            return expected.keys() == actual.keys() and all(match(expected[k], actual[k]) for k in expected)
+        return exact_match(expected, actual)
+    return match
+
+
+class Checker:
+    """Decides whether a submission's output is correct.
+
+    Built once from a problem's spec and run by the host on the values the
+    harnesses report, so submissions never see the expected output and every
+    language is graded the same way.
+    """
+
+    def __init__(self, spec: Optional[Dict[str, Any]] = None):
+        self.spec = spec or {'type': 'exact'}
+        kind = self.spec.get('type', 'exact')
+        self._match = self._validator = None
+        if kind == 'exact':
+            self._match = exact_match
+        elif kind == 'unordered':
+            self._match = unordered_match
+        elif kind == 'float':
+            self._match = tolerance_match(self.spec.get('abs_tol', 1e-6), self.spec.get('rel_tol', 1e-9))
+        elif kind == 'custom':
+            self._validator = self._compile_validator(self.spec.get('validator', ''))
+        else:
+            raise CheckerError(f'Unknown checker type: {kind}')
+
+    def _compile_validator(self, source: str) -> Callable[[Any, Any, Any], Any]:
+        namespace = {}
+        try:
+            exec(compile(source, '<checker>', 'exec'), namespace)
+        except Exception as e:
+            raise CheckerError(f'Invalid checker validator: {e}') from e
+        validator = namespace.get('check')
+        if not callable(validator):
+            raise CheckerError('Checker validator must define check(input, expected, actual)')
+        return validator
+
+    def check(self, test_case: Dict[str, Any], actual: Any) -> bool:
+        """Whether ``actual`` is a correct output for ``test_case``"""
+        if self._validator is not None:
+            try:
+                return bool(self._validator(test_case['input'], test_case['expected'], actual))
+            except Exception:
+                return False
+        return self._match(test_case['expected'], actual)
+
+
+DEFAULT_CHECKER = Checker()
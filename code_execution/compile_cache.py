@@ -0,0 +1,210 @@
+# On-disk cache of compiled submissions, keyed by source and compiler
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+
+class CompileCache:
+    """Content-addressed store of compile artifacts.
+
+    Every entry is a directory named after the hash of the prepared source and
+    the compiler command line, so identical resubmissions (and a run-sample
+    followed by a full execute) compile once. Nothing is compiled here: the
+    caller compiles in its own sandbox working directory, and on success
+    only the regular files of its output directory are copied into a staging
+    entry, sealed and renamed into place. A per-key lock (``flock`` across
+    processes) keeps concurrent requests from compiling the same code twice.
+
+    The cache holds other candidates' programs, so it is private to the host
+    user: the root is 0700 and entries are read-only. Sandboxed processes
+    never see it; a hit is copied into the caller's output directory.
+    The least recently used entries are evicted once the cache outgrows
+    ``max_bytes``; entries used in the last ``min_idle_seconds`` are kept
+    because a submission may be about to export them.
+    """
+
+    SIZE_FILE = '.size'
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = 512 * 1024 * 1024,
+                 min_idle_seconds: float = 60):
+        self.root = root or os.path.join(tempfile.gettempdir(), 'evaledge_compile_cache')
+        self.max_bytes = max_bytes
+        self.min_idle_seconds = min_idle_seconds
+        self.hits = 0
+        self.misses = 0
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._make_private_root()
+        os.makedirs(os.path.join(self.root, '.locks'), mode=0o700, exist_ok=True)
+
+    def _make_private_root(self):
+        os.makedirs(self.root, mode=0o700, exist_ok=True)
+        info = os.lstat(self.root)
+        if not stat.S_ISDIR(info.st_mode) or (hasattr(os, 'geteuid') and info.st_uid != os.geteuid()):
+            raise RuntimeError(f'Compile cache {self.root} is not a directory owned by this user')
+        # Also closes up caches created world-readable by earlier versions
+        os.chmod(self.root, 0o700)
+
+    def key(self, source: str, command: List[str]) -> str:
+        payload = json.dumps([command, source]).encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    @contextmanager
+    def _key_lock(self, key: str):
+        with self._locks_guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.root, '.locks', f'{key}.lock'), 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get_or_build(self, key: str, output_dir: str,
+                     build: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Fill ``output_dir`` with the artifact for ``key``, building it on a miss.
+
+        ``output_dir`` lives in the caller's sandbox working directory. On a
+        hit the cached entry is copied there. On a miss ``build`` is called
+        to compile into it (sandboxed, by the caller) and returns None on
+        success or an error result, which is passed back and not cached;
+        otherwise what it left in ``output_dir`` is copied into the cache.
+        """
+        artifact_dir = os.path.join(self.root, key)
+        if self._export_hit(artifact_dir, output_dir):
+            return None
+
+        with self._key_lock(key):
+            # Another request may have finished the same build while we waited
+            if self._export_hit(artifact_dir, output_dir):
+                return None
+
+            self.misses += 1
+            os.makedirs(output_dir, exist_ok=True)
+            error = build()
+            if error is not None:
+                return error
+            staging_dir = tempfile.mkdtemp(prefix='.staging-', dir=self.root)
+            try:
+                self._copy_tree(output_dir, staging_dir)
+                with open(os.path.join(staging_dir, self.SIZE_FILE), 'w') as f:
+                    f.write(str(self._dir_size(staging_dir)))
+                self._seal(staging_dir)
+                os.rename(staging_dir, artifact_dir)
+            finally:
+                self._remove(staging_dir)
+
+        self._evict()
+        return None
+
+    def _export_hit(self, artifact_dir: str, output_dir: str) -> bool:
+        if not os.path.isdir(artifact_dir):
+            return False
+        self._touch(artifact_dir)
+        self.hits += 1
+        self._copy_tree(artifact_dir, output_dir)
+        return True
+
+    def _copy_tree(self, source_dir: str, dest: str):
+        """Copy the regular files under ``source_dir`` into ``dest``.
+
+        Sandbox output is copied by the host, so links and special files are
+        skipped and nothing is followed out of ``source_dir``.
+        """
+        for dirpath, dirnames, filenames in os.walk(source_dir):
+            target = os.path.join(dest, os.path.relpath(dirpath, source_dir))
+            os.makedirs(target, exist_ok=True)
+            for filename in filenames:
+                if filename == self.SIZE_FILE:
+                    continue
+                try:
+                    fd = os.open(os.path.join(dirpath, filename), os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+                except OSError:
+                    continue  # A symlink, or gone
+                with os.fdopen(fd, 'rb') as source:
+                    info = os.fstat(source.fileno())
+                    if not stat.S_ISREG(info.st_mode):
+                        continue
+                    mode = 0o755 if info.st_mode & stat.S_IXUSR else 0o644
+                    with open(os.path.join(target, filename), 'wb') as copy:
+                        shutil.copyfileobj(source, copy)
+                os.chmod(os.path.join(target, filename), mode)
+
+    def _seal(self, path: str):
+        """Make a finished entry read-only"""
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                file_path = os.path.join(dirpath, filename)
+                os.chmod(file_path, 0o555 if os.stat(file_path).st_mode & stat.S_IXUSR else 0o444)
+        for dirpath, _, _ in os.walk(path, topdown=False):
+            os.chmod(dirpath, 0o555)
+
+    def _remove(self, path: str):
+        """Delete a directory tree, sealed or not"""
+        for dirpath, _, _ in os.walk(path):
+            try:
+                os.chmod(dirpath, 0o700)
+            except OSError:
+                pass
+        shutil.rmtree(path, ignore_errors=True)
+
+    def _touch(self, path: str):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _dir_size(self, path: str) -> int:
+        total = 0
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, filename))
+                except OSError:
+                    pass
+        return total
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits its size cap"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.root):
+            if entry.name.startswith('.') or not entry.is_dir():
+                continue
+            try:
+                with open(os.path.join(entry.path, self.SIZE_FILE)) as f:
+                    size = int(f.read())
+                mtime = entry.stat().st_mtime
+            except (OSError, ValueError):
+                continue
+            entries.append((mtime, size, entry.name))
+            total += size
+
+        now = time.time()
+        for mtime, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if now - mtime < self.min_idle_seconds:
+                continue
+            with self._key_lock(key):
+                self._remove(os.path.join(self.root, key))
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        return {'hits': self.hits, 'misses': self.misses, 'root': self.root}
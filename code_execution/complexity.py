@@ -0,0 +1,190 @@
+# Performance grading: empirical growth of running time over scaled inputs
+import hashlib
+import json
+import math
+import threading
+from typing import Any, Dict, List, Optional
+
+from .generators import generate_cases
+
+# Growth exponent (slope of log time against log n) each complexity class
+# should show. Logarithmic factors are too small to measure over a few sizes.
+COMPLEXITY_EXPONENTS = {
+    'O(1)': 0.0,
+    'O(log n)': 0.0,
+    'O(n)': 1.0,
+    'O(n log n)': 1.0,
+    'O(n^2)': 2.0,
+    'O(n^3)': 3.0,
+}
+
+
+def fit_growth_exponent(measurements: List[Dict[str, float]]) -> Optional[float]:
+    """Least-squares slope of log(time) against log(size)"""
+    points = [(math.log(m['size']), math.log(m['time'])) for m in measurements]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if spread == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+class ComplexityGrader:
+    """Grades how a submission's running time grows with input size.
+
+    Problems opt in with a ``performance`` entry naming an input generator,
+    the sizes to run, the target complexity and reference solutions. Each
+    size is run ``repeats`` times in a single process (so cases do not
+    compete for CPU) and the fastest run counts. Times below
+    ``min_time_ms`` are clamped to it, because timer noise would otherwise
+    dominate the fit for fast solutions.
+
+    A submission is within target when its growth exponent is at most the
+    target's exponent (or the reference solution's, if that is higher on
+    this machine) plus ``tolerance``. Reference profiles are measured once
+    per problem and language and kept as the baseline.
+
+    Every grading measures afresh: results never come from the result
+    cache. The scaled inputs are large, so they are generated for each
+    grading and dropped when it ends rather than kept per problem.
+    """
+
+    def __init__(self, executor, problems_db, repeats: int = 3, tolerance: float = 0.5,
+                 min_time_ms: float = 0.05):
+        self.executor = executor
+        self.problems_db = problems_db
+        self.repeats = repeats
+        self.tolerance = tolerance
+        self.min_time_ms = min_time_ms
+        self._baselines = {}  # (problem_id, language, spec hash) -> profile
+        self._lock = threading.Lock()
+
+    def _spec_hash(self, spec: Dict[str, Any]) -> str:
+        payload = json.dumps(spec, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    def _generate_cases(self, spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return generate_cases(spec['generator'], spec['sizes'], self.repeats)
+
+    def _profile(self, code: str, language: str, problem_id: str, cases: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run ``code`` over the scaled cases and fit its growth.
+
+        No test set version is passed, so the encoded inputs live only as
+        long as the run instead of in the shared test data store.
+        """
+        result = self.executor.execute_code(
+            code, language, cases, problem_id, max_parallel=1, use_result_cache=False
+        )
+        if not result.get('success'):
+            return result
+
+        fastest = {}
+        for case, case_result in zip(cases, result['results']):
+            error = case_result.get('error')
+            if error and error != 'Time Limit Exceeded':
+                continue
+            # A timed-out case still bounds the time from below
+            time_ms = max(case_result.get('executionTime') or 0, self.min_time_ms)
+            fastest[case['size']] = min(time_ms, fastest.get(case['size'], math.inf))
+
+        measurements = [{'size': size, 'time': time_ms} for size, time_ms in sorted(fastest.items())]
+        # Scaled inputs and outputs are far too large to send back
+        results = [
+            dict({k: v for k, v in r.items() if k not in ('input', 'expected', 'actual')}, size=case['size'])
+            for case, r in zip(cases, result['results'])
+        ]
+        return dict(result, results=results, measurements=measurements,
+                    growth_exponent=fit_growth_exponent(measurements))
+
+    def baseline(self, problem_id: str, language: str,
+                 cases: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+        """Profile of the problem's reference solution, measured once.
+
+        Uses the reference in ``language`` when there is one, otherwise the
+        Python reference. ``cases`` are the problem's scaled cases if the
+        caller already generated them.
+        """
+        problem = self.problems_db.get_problem(problem_id)
+        spec = problem.get('performance') if problem else None
+        if not spec:
+            return None
+        references = spec.get('reference_solution', {})
+        ref_language = language if language in references else 'python'
+        if ref_language not in references:
+            return None
+
+        spec_hash = self._spec_hash(spec)
+        key = (problem_id, ref_language, spec_hash)
+        with self._lock:
+            if key in self._baselines:
+                return self._baselines[key]
+        if cases is None:
+            cases = self._generate_cases(spec)
+        profile = self._profile(references[ref_language], ref_language, problem_id, cases)
+        if not profile.get('success'):
+            return None
+        baseline = {
+            'language': ref_language,
+            'measurements': profile['measurements'],
+            'growth_exponent': profile['growth_exponent']
+        }
+        with self._lock:
+            self._baselines[key] = baseline
+        return baseline
+
+    def grade(self, code: str, language: str, problem_id: str) -> Dict[str, Any]:
+        """Run a submission in performance mode and score its growth"""
+        problem = self.problems_db.get_problem(problem_id)
+        spec = problem.get('performance') if problem else None
+        if not spec:
+            return {
+                'success': False,
+                'error': f'Problem {problem_id} has no performance profile',
+                'results': []
+            }
+
+        cases = self._generate_cases(spec)
+        profile = self._profile(code, language, problem_id, cases)
+        if not profile.get('success'):
+            return profile
+
+        target = spec['target_complexity']
+        baseline = self.baseline(problem_id, language, cases)
+        # Only the measurements are needed from here on
+        del cases
+        allowed = COMPLEXITY_EXPONENTS.get(target, 1.0)
+        if baseline and baseline['growth_exponent'] is not None:
+            allowed = max(allowed, baseline['growth_exponent'])
+        allowed += self.tolerance
+
+        exponent = profile.pop('growth_exponent')
+        measurements = profile.pop('measurements')
+        within_target = exponent is not None and exponent <= allowed
+        if within_target:
+            performance_score = 100.0
+        elif exponent is None:
+            performance_score = 0.0
+        else:
+            # One full power of n over the allowance scores zero
+            performance_score = max(0.0, 100.0 * (1 - (exponent - allowed)))
+
+        slowdown = None
+        if baseline and baseline['language'] == language and measurements and baseline['measurements']:
+            largest, reference_largest = measurements[-1], baseline['measurements'][-1]
+            if largest['size'] == reference_largest['size']:
+                slowdown = largest['time'] / reference_largest['time']
+
+        profile['performance'] = {
+            'target_complexity': target,
+            'measurements': measurements,
+            'growth_exponent': exponent,
+            'allowed_exponent': allowed,
+            'within_target': within_target,
+            'score': performance_score,
+            'baseline': baseline,
+            'slowdown': slowdown
+        }
+        return profile
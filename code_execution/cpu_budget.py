@@ -0,0 +1,94 @@
+# Server-wide limit on concurrently running sandbox processes
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+import psutil
+
+
+class BudgetBusyError(Exception):
+    """Raised when no CPU slot frees up in time or too many callers are waiting"""
+
+
+class CpuBudget:
+    """Hands out CPU slots to submissions so parallel test runs cannot
+    oversubscribe the host.
+
+    The budget starts at one slot per logical core. Load that is not ours
+    (measured with psutil and minus the slots we have handed out) shrinks the
+    budget, but at least one slot is always available.
+
+    At most ``max_waiting`` callers wait for a slot at a time, each for at
+    most ``wait_timeout`` seconds; beyond that ``BudgetBusyError`` is raised
+    so the server sheds load instead of piling up request threads.
+    """
+
+    def __init__(self, max_slots: Optional[int] = None, load_check_interval: float = 0.5,
+                 max_waiting: int = 100, wait_timeout: float = 30):
+        self.max_slots = max_slots or psutil.cpu_count(logical=True) or 1
+        self.load_check_interval = load_check_interval
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._waiting = 0
+        self._in_use = 0
+        self._external_load = 0
+        self._last_load_check = 0.0
+        self._cond = threading.Condition()
+        psutil.cpu_percent(interval=None)  # prime the measurement
+
+    def _capacity(self) -> int:
+        """Slots available to sandboxes given current host load (lock held)"""
+        now = time.monotonic()
+        if now - self._last_load_check >= self.load_check_interval:
+            busy_cores = psutil.cpu_percent(interval=None) / 100 * self.max_slots
+            self._external_load = max(0, round(busy_cores - self._in_use))
+            self._last_load_check = now
+        return max(1, self.max_slots - self._external_load)
+
+    def acquire(self, wanted: int = 1) -> int:
+        """Wait until at least one slot is free, then take up to ``wanted``"""
+        with self._cond:
+            if self._in_use >= self._capacity():
+                if self._waiting >= self.max_waiting:
+                    raise BudgetBusyError('Too many submissions waiting for CPU')
+                self._waiting += 1
+                deadline = time.monotonic() + self.wait_timeout
+                try:
+                    while self._in_use >= self._capacity():
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise BudgetBusyError('Timed out waiting for CPU')
+                        # Wake up periodically to pick up changes in external load
+                        self._cond.wait(min(self.load_check_interval, remaining))
+                finally:
+                    self._waiting -= 1
+            granted = max(1, min(wanted, self._capacity() - self._in_use))
+            self._in_use += granted
+            return granted
+
+    def release(self, slots: int):
+        with self._cond:
+            self._in_use -= slots
+            self._cond.notify_all()
+
+    @contextmanager
+    def reserve(self, wanted: int = 1):
+        """Context manager around acquire/release yielding the granted slots"""
+        granted = self.acquire(wanted)
+        try:
+            yield granted
+        finally:
+            self.release(granted)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'max_slots': self.max_slots,
+                'in_use': self._in_use,
+                'waiting': self._waiting,
+                'external_load': self._external_load
+            }
+
+
+# Shared by every CodeExecutor in the process
+default_budget = CpuBudget()
@@ -1,40 +1,362 @@
 import subprocess
-import tempfile
 import os
 import json
 import time
-import signal
-from typing import Dict, List, Any, Optional
-import psutil
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Callable, Iterator, Tuple
+from .capture import (
+    LINE_TOO_LONG, RESULT_FD_ENV, BoundedCapture, iter_lines, popen_with_result_channel
+)
+from .checkers import DEFAULT_CHECKER, Checker
+from .compile_cache import CompileCache
+from .cpu_budget import BudgetBusyError, CpuBudget, default_budget
+from .forkserver import ForkServer
+from .limits import ResourceLimits, describe_exit, wait_with_usage
+from .result_cache import ResultCache
+from .run_control import BUDGET_EXCEEDED, FAIL_FAST_ALL, RunControl
+from .sandbox import SandboxManager, kill_process_group
+from .test_data import TestData, TestDataStore
+from .signatures import parse_signature
+from .typed_harness import build_cpp_harness, build_java_harness
+from .worker_pool import WorkerPool, PoolBusyError
+
+# Test-case loops shared by the one-shot harnesses and the pooled workers. Test
+# cases arrive as one JSON line each on stdin, and each case is reported on its
+# own line of the result channel (see capture.popen_with_result_channel) as soon
+# as it finishes. Harnesses only see inputs and never judge the output: the
+# host checks every reported value with the problem's checker (see checkers.py)
+# and fills in input and expected from its own copy. Besides wall time every
+# case reports the CPU time it used and the process's peak RSS so far.
+PYTHON_CASE_RUNNER = """
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def cpu_times():
+    if resource:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return usage.ru_utime, usage.ru_stime
+    return os.times()[:2]
+
+def peak_memory():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else None
+
+def run_test_cases(solution, test_cases, first_test):
+    for i, test_case in enumerate(test_cases, first_test):
+        try:
+            user_before, sys_before = cpu_times()
+            start_time = time.perf_counter()
+            result = solution(*test_case['input'])
+            execution_time = (time.perf_counter() - start_time) * 1000
+            user_after, sys_after = cpu_times()
+            
+            emit_result({
+                'testCase': i + 1,
+                'actual': result,
+                'executionTime': execution_time,
+                'cpuUser': (user_after - user_before) * 1000,
+                'cpuSys': (sys_after - sys_before) * 1000,
+                'peakMemory': peak_memory()
+            })
+        except Exception as e:
+            emit_result({
+                'testCase': i + 1,
+                'actual': None,
+                'error': str(e) or type(e).__name__,
+                'executionTime': 0,
+                'peakMemory': peak_memory()
+            })
+"""
+
+# Opens the result channel and forgets its descriptor number
+PYTHON_RESULT_CHANNEL = f"""
+result_channel = os.fdopen(int(os.environ.pop('{RESULT_FD_ENV}')), 'w')
+
+def emit_result(result):
+    result_channel.write(json.dumps(result, default=str) + '\\n')
+    result_channel.flush()
+"""
+
+# Moves the data channel off fd 0 so a submission reading stdin sees EOF
+PYTHON_PRIVATE_STDIN = """
+def private_stdin():
+    channel = os.fdopen(os.dup(0), 'r')
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    sys.stdin = open(os.devnull)
+    return channel
+"""
+
+JAVASCRIPT_CASE_RUNNER = f"""
+const resultChannel = Number(process.env.{RESULT_FD_ENV});
+delete process.env.{RESULT_FD_ENV};
+
+function emitResult(result) {{
+    require('fs').writeSync(resultChannel, JSON.stringify(result) + '\\n');
+}}
+
+function runTestCases(solution, testCases, firstTest) {{
+    testCases.forEach((testCase, index) => {{
+        try {{
+            const cpuBefore = process.cpuUsage();
+            const startTime = process.hrtime.bigint();
+            const result = solution(...testCase.input);
+            const executionTime = Number(process.hrtime.bigint() - startTime) / 1e6;
+            const cpu = process.cpuUsage(cpuBefore);
+            
+            emitResult({{
+                testCase: firstTest + index + 1,
+                actual: result,
+                executionTime: executionTime,
+                cpuUser: cpu.user / 1000,
+                cpuSys: cpu.system / 1000,
+                peakMemory: process.resourceUsage().maxRSS * 1024
+            }});
+        }} catch (error) {{
+            emitResult({{
+                testCase: firstTest + index + 1,
+                actual: null,
+                error: error.message,
+                executionTime: 0,
+                peakMemory: process.resourceUsage().maxRSS * 1024
+            }});
+        }}
+    }});
+}}
+"""
+
+# Numeric fields a harness reports per case besides ``actual`` and ``error``
+REPORTED_METRICS = ('executionTime', 'cpuUser', 'cpuSys', 'peakMemory')
+
+# Wall-clock seconds a compiler may run; also its CPU limit
+COMPILE_TIMEOUT = 30
+
+# How often a result wait checks whether the run was stopped meanwhile
+STOP_POLL_INTERVAL = 0.05
+
+# Returned instead of a result line when the run is stopped while waiting
+RUN_STOPPED = object()
 
 class CodeExecutor:
-    def __init__(self):
+    def __init__(self, worker_pool_size: int = 0, max_queue_depth: int = 100,
+                 max_parallel_tests: int = 4, cpu_budget: Optional[CpuBudget] = None,
+                 compile_cache: Optional[CompileCache] = None, result_cache: Optional[ResultCache] = None,
+                 problems_db=None, sandbox: Optional[SandboxManager] = None, use_forkserver: bool = True,
+                 time_budget: Optional[float] = None, test_data_store: Optional[TestDataStore] = None):
         self.supported_languages = {
             'javascript': {
                 'extension': '.js',
-                'command': ['node'],
-                'timeout': 10
+                'command': ['node', '--max-old-space-size=256'],
+                'timeout': 10,
+                'batch': True,
+                # V8 reserves its address space up front; the heap flag caps memory
+                'limits': ResourceLimits(memory_bytes=None, cpu_seconds=10)
             },
             'python': {
                 'extension': '.py',
                 'command': ['python3'],
-                'timeout': 10
+                'timeout': 10,
+                'batch': True,
+                # Forked from a pre-started interpreter when the platform allows
+                'forkserver': True,
+                'limits': ResourceLimits(memory_bytes=512 * 1024 * 1024, cpu_seconds=10, max_processes=64)
             },
             'java': {
                 'extension': '.java',
+                'source_file': 'Solution.java',
                 'command': ['javac'],
-                'run_command': ['java'],
-                'timeout': 15
+                'run_command': ['java', '-Xmx256m'],
+                'timeout': 15,
+                'batch': True,
+                # Same for the JVM, which also needs threads of its own
+                'limits': ResourceLimits(memory_bytes=None, cpu_seconds=15),
+                'compile_limits': ResourceLimits(memory_bytes=None, cpu_seconds=COMPILE_TIMEOUT)
             },
             'cpp': {
                 'extension': '.cpp',
-                'command': ['g++', '-o'],
-                'timeout': 15
+                'source_file': 'solution.cpp',
+                'command': ['g++', '-O2'],
+                'timeout': 15,
+                'batch': True,
+                'limits': ResourceLimits(memory_bytes=512 * 1024 * 1024, cpu_seconds=15, max_processes=64),
+                # g++ runs cc1plus, as and ld one after another
+                'compile_limits': ResourceLimits(memory_bytes=1024 * 1024 * 1024, cpu_seconds=COMPILE_TIMEOUT,
+                                                 max_processes=64)
             }
         }
+        
+        # Recycled working directories and the isolation applied to every process
+        self.sandbox = sandbox or SandboxManager()
+        
+        # Compiled submissions are shared between requests with identical source
+        self.compile_cache = compile_cache or CompileCache()
+        
+        # Test inputs encoded once per test set version and passed to
+        # harnesses as a descriptor instead of being written per submission
+        self.test_data_store = test_data_store or TestDataStore()
+        
+        # Submissions see neither, only what they are handed
+        self.sandbox.hide(self.compile_cache.root)
+        self.sandbox.hide(self.test_data_store.root)
+        
+        # Fork servers launch a fresh, already initialized interpreter per run
+        self.forkservers = {}
+        if use_forkserver and ForkServer.available():
+            for language, lang_config in self.supported_languages.items():
+                if lang_config.get('forkserver'):
+                    self.forkservers[language] = ForkServer(lang_config['command'], self.sandbox)
+        
+        # Pre-started single-use workers for interpreted languages without a
+        # fork server (disabled when size is 0)
+        self.worker_pools = {}
+        if worker_pool_size > 0:
+            for language, lang_config in self.supported_languages.items():
+                if language in self.forkservers:
+                    continue
+                worker_script = self._prepare_worker_script(language)
+                if worker_script is None:
+                    continue
+                self.worker_pools[language] = WorkerPool(
+                    lang_config['command'], worker_script, lang_config['extension'],
+                    limits=lang_config['limits'],
+                    sandbox=self.sandbox,
+                    size=worker_pool_size,
+                    max_queue_depth=max_queue_depth
+                )
+        
+        # Opt-in memoization of whole results for unchanged resubmissions
+        self.result_cache = result_cache
+        
+        # Source of starter code signatures for the typed Java/C++ harnesses
+        self.problems_db = problems_db
+        
+        # Test cases of one submission fan out over up to max_parallel_tests
+        # processes, limited by the budget shared across all submissions.
+        self.max_parallel_tests = max(1, max_parallel_tests)
+        self.cpu_budget = cpu_budget or default_budget
+        
+        # Wall time one submission may take before its remaining cases are
+        # cancelled (None for no limit); requests can only lower it
+        self.time_budget = time_budget
+        self._fanout = ThreadPoolExecutor(
+            max_workers=self.cpu_budget.max_slots, thread_name_prefix='test-fanout'
+        )
+    
+    def execute_code(self, code: str, language: str, test_cases: List[Dict], problem_id: str,
+                     on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                     test_set_version: Optional[str] = None,
+                     max_parallel: Optional[int] = None,
+                     fail_fast: str = FAIL_FAST_ALL,
+                     time_budget: Optional[float] = None,
+                     control: Optional[RunControl] = None,
+                     use_result_cache: bool = True) -> Dict[str, Any]:
+        """Execute code with test cases and return results
+
+        ``on_result`` is called with each test result as soon as it is available.
+        ``test_set_version`` identifies ``test_cases`` for the result cache; it
+        is computed from the test cases when not given. ``max_parallel`` lowers
+        the number of processes the test cases fan out over, e.g. to 1 when
+        timings must not disturb each other.
+
+        ``fail_fast`` (see run_control.FAIL_FAST_POLICIES) and ``time_budget``
+        cancel the remaining cases early; they are reported as skipped. Pass
+        a ``control`` instead to be able to cancel the run from another thread.
+
+        Pass ``use_result_cache=False`` for runs whose results are
+        measurements (performance grading): they are neither served from nor
+        stored in the result cache.
+        """
+        control = control or RunControl(fail_fast, time_budget)
+        if self.result_cache is None or not use_result_cache:
+            return self._execute(code, language, test_cases, problem_id, on_result, max_parallel, control,
+                                 test_set_version)
+        
+        cache_key = self.result_cache.key(
+            code, language, problem_id, test_set_version or ResultCache.test_set_version(test_cases)
+        )
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            if on_result:
+                for result in cached['results']:
+                    on_result(result)
+            return dict(cached, cached=True)
+        
+        result = self._execute(code, language, test_cases, problem_id, on_result, max_parallel, control,
+                               test_set_version)
+        if self._is_cacheable(result):
+            self.result_cache.put(cache_key, result)
+        return result
     
-    def execute_code(self, code: str, language: str, test_cases: List[Dict], problem_id: str) -> Dict[str, Any]:
-        """Execute code with test cases and return results"""
+    def stream_code(self, code: str, language: str, test_cases: List[Dict], problem_id: str,
+                    test_set_version: Optional[str] = None, max_parallel: Optional[int] = None,
+                    fail_fast: str = FAIL_FAST_ALL, time_budget: Optional[float] = None,
+                    ping_interval: float = 15) -> Iterator[Tuple[str, Any]]:
+        """Run a submission and yield its progress as (event, data) pairs.
+
+        Yields ('result', result) for every test case as soon as it finishes,
+        in completion order, and ends with ('compile_error', result) when the
+        submission does not compile, ('error', result) when it cannot run, or
+        ('done', summary). The summary carries the score and totals but not
+        the results again, since they were already sent. While nothing new
+        arrives for ``ping_interval`` seconds a ('ping', None) event is yielded
+        so streaming responses can keep the connection open. Closing the
+        generator early, as a server does when the client disconnects,
+        cancels the remaining cases.
+        """
+        events = queue.Queue()
+        control = RunControl(fail_fast, time_budget)
+        
+        def run():
+            try:
+                result = self.execute_code(
+                    code, language, test_cases, problem_id,
+                    on_result=lambda r: events.put(('result', r)),
+                    test_set_version=test_set_version, max_parallel=max_parallel, control=control
+                )
+            except Exception as e:
+                result = {'success': False, 'error': str(e), 'results': []}
+            if result.get('compile_error'):
+                events.put(('compile_error', result))
+            elif not result.get('success'):
+                events.put(('error', {key: value for key, value in result.items() if key != 'results'}))
+            else:
+                events.put(('done', {key: value for key, value in result.items() if key != 'results'}))
+            events.put(None)
+        
+        threading.Thread(target=run, daemon=True, name='stream-submission').start()
+        try:
+            while True:
+                try:
+                    event = events.get(timeout=ping_interval)
+                except queue.Empty:
+                    yield 'ping', None
+                    continue
+                if event is None:
+                    return
+                yield event
+        finally:
+            control.stop('Cancelled')
+    
+    def _is_cacheable(self, result: Dict[str, Any]) -> bool:
+        """Only cache complete outcomes that do not depend on server load"""
+        if not result.get('success'):
+            return False
+        return all(
+            r.get('error') not in ('Time Limit Exceeded', BUDGET_EXCEEDED) and not r.get('skipped')
+            for r in result['results']
+        )
+    
+    def _execute(self, code: str, language: str, test_cases: List[Dict], problem_id: str,
+                 on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 max_parallel: Optional[int] = None,
+                 control: Optional[RunControl] = None,
+                 test_set_version: Optional[str] = None) -> Dict[str, Any]:
+        """Run a submission without consulting the result cache"""
+        control = control or RunControl()
         if language not in self.supported_languages:
             return {
                 'success': False,
@@ -44,45 +366,61 @@ class CodeExecutor:
         
         lang_config = self.supported_languages[language]
         
+        wanted = min(max_parallel or self.max_parallel_tests, self.max_parallel_tests, len(test_cases)) \
+            if lang_config.get('batch') else 1
+        
         try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Create code file
-                code_file = os.path.join(temp_dir, f'solution{lang_config["extension"]}')
-                
-                # Prepare code based on language
-                prepared_code = self._prepare_code(code, language, problem_id)
-                
-                with open(code_file, 'w') as f:
-                    f.write(prepared_code)
-                
-                # Compile if necessary
-                if language in ['java', 'cpp']:
-                    compile_result = self._compile_code(code_file, temp_dir, language)
-                    if not compile_result['success']:
-                        return compile_result
-                
-                # Run test cases
-                results = []
-                for i, test_case in enumerate(test_cases):
-                    result = self._run_test_case(
-                        code_file, temp_dir, language, test_case, i + 1
-                    )
-                    results.append(result)
+            # Encoded once per test set version when the caller names one,
+            # otherwise once for this submission
+            if test_set_version is not None:
+                test_data = self.test_data_store.get(problem_id, test_set_version, test_cases)
+            else:
+                test_data = TestData.from_cases(test_cases)
+            checker = self.problems_db.get_checker(problem_id) if self.problems_db is not None else DEFAULT_CHECKER
+            with self.cpu_budget.reserve(wanted) as slots:
+                # The budget covers compiling and running, not waiting for slots
+                control.start(self.time_budget)
+                chunks = self._split_chunks(len(test_cases), slots)
                 
-                # Calculate overall score
-                passed_tests = sum(1 for r in results if r['passed'])
-                total_tests = len(results)
-                score = (passed_tests / total_tests) * 100 if total_tests > 0 else 0
+                if language in self.worker_pools:
+                    return self._summarize(self._run_chunks(chunks, lambda start, end: self._run_pooled(
+                        code, language, test_cases, test_data, checker, control, on_result, start, end
+                    )), control)
                 
-                return {
-                    'success': True,
-                    'results': results,
-                    'score': score,
-                    'passed_tests': passed_tests,
-                    'total_tests': total_tests,
-                    'all_passed': passed_tests == total_tests
-                }
+                with self.sandbox.workspace() as temp_dir:
+                    # Create code file
+                    code_file = os.path.join(temp_dir, f'solution{lang_config["extension"]}')
+                    
+                    # Prepare code based on language
+                    prepared_code = self._prepare_code(code, language, problem_id)
+                    
+                    with open(code_file, 'w') as f:
+                        f.write(prepared_code)
+                    
+                    # Compile if necessary (cached by source hash)
+                    run_command = lang_config['command'] + [code_file]
+                    if language in ['java', 'cpp']:
+                        # Built in, or copied from the cache into, this working directory
+                        compile_result = self._compile_code(prepared_code, language, temp_dir)
+                        if not compile_result['success']:
+                            return compile_result
+                        run_command = self._run_command(language, compile_result['artifact_dir'])
+                    
+                    # Run test cases
+                    results = self._run_chunks(chunks, lambda start, end: self._run_batch(
+                        run_command, temp_dir, language, test_cases, test_data, checker, control,
+                        on_result, start, end
+                    ))
+                    
+                    return self._summarize(results, control)
                 
+        except (PoolBusyError, BudgetBusyError) as e:
+            return {
+                'success': False,
+                'error': f'Server busy: {e}',
+                'busy': True,
+                'results': []
+            }
         except Exception as e:
             return {
                 'success': False,
@@ -90,6 +428,58 @@ class CodeExecutor:
                 'results': []
             }
     
+    def _split_chunks(self, total: int, parts: int) -> List[tuple]:
+        """Split range(total) into at most ``parts`` contiguous (start, end) chunks"""
+        parts = max(1, min(parts, total))
+        size, extra = divmod(total, parts)
+        chunks, start = [], 0
+        for i in range(parts):
+            end = start + size + (1 if i < extra else 0)
+            chunks.append((start, end))
+            start = end
+        return chunks
+    
+    def _run_chunks(self, chunks: List[tuple], run_chunk: Callable[[int, int], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Run chunks of test cases in parallel and return results in test order"""
+        if len(chunks) == 1:
+            return run_chunk(*chunks[0])
+        futures = [self._fanout.submit(run_chunk, start, end) for start, end in chunks]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+    
+    def _summarize(self, results: List[Dict[str, Any]], control: Optional[RunControl] = None) -> Dict[str, Any]:
+        """Calculate overall score for a list of test results"""
+        passed_tests = sum(1 for r in results if r['passed'])
+        total_tests = len(results)
+        score = (passed_tests / total_tests) * 100 if total_tests > 0 else 0
+        
+        summary = {
+            'success': True,
+            'results': results,
+            'score': score,
+            'passed_tests': passed_tests,
+            'total_tests': total_tests,
+            'all_passed': passed_tests == total_tests,
+            'resources': self._total_usage(results)
+        }
+        skipped_tests = sum(1 for r in results if r.get('skipped'))
+        if skipped_tests:
+            summary['skipped_tests'] = skipped_tests
+            summary['stopped_early'] = control.reason if control else None
+        return summary
+    
+    def _total_usage(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """CPU and wall time summed over all test cases, and the highest peak RSS"""
+        peaks = [r['peakMemory'] for r in results if r.get('peakMemory') is not None]
+        return {
+            'wallTime': sum(r.get('executionTime') or 0 for r in results),
+            'cpuUser': sum(r.get('cpuUser') or 0 for r in results),
+            'cpuSys': sum(r.get('cpuSys') or 0 for r in results),
+            'peakMemory': max(peaks) if peaks else None
+        }
+    
     def _prepare_code(self, code: str, language: str, problem_id: str) -> str:
         """Prepare code for execution based on language and problem"""
         if language == 'javascript':
@@ -107,246 +497,477 @@ class CodeExecutor:
         return f"""
 {code}
 
-// Test execution
-const testCases = JSON.parse(process.argv[2]);
-const results = [];
+{JAVASCRIPT_CASE_RUNNER}
 
-testCases.forEach((testCase, index) => {{
-    try {{
-        const startTime = Date.now();
-        const result = solution(...testCase.input);
-        const executionTime = Date.now() - startTime;
-        
-        const passed = JSON.stringify(result) === JSON.stringify(testCase.expected);
-        
-        results.push({{
-            testCase: index + 1,
-            input: testCase.input,
-            expected: testCase.expected,
-            actual: result,
-            passed: passed,
-            executionTime: executionTime
-        }});
-    }} catch (error) {{
-        results.push({{
-            testCase: index + 1,
-            input: testCase.input,
-            expected: testCase.expected,
-            actual: null,
-            passed: false,
-            error: error.message,
-            executionTime: 0
-        }});
-    }}
-}});
-
-console.log(JSON.stringify(results));
+// Test execution: one JSON test case per stdin line
+const testCases = require('fs').readFileSync(0, 'utf8').split('\\n').filter(Boolean).map(JSON.parse);
+const firstTest = parseInt(process.argv[2] || '0', 10);
+runTestCases(solution, testCases, firstTest);
 """
     
     def _prepare_python_code(self, code: str, problem_id: str) -> str:
         """Prepare Python code with test harness"""
         return f"""
 import json
+import os
 import sys
 import time
 
+{PYTHON_PRIVATE_STDIN}
+test_data = private_stdin()
+{PYTHON_RESULT_CHANNEL}
+
 {code}
 
-# Test execution
+{PYTHON_CASE_RUNNER}
+
+# Test execution: one JSON test case per stdin line, read as the loop goes
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print('[]')
-        sys.exit(0)
-        
-    test_cases = json.loads(sys.argv[1])
-    results = []
-    
-    for i, test_case in enumerate(test_cases):
-        try:
-            start_time = time.time()
-            result = solution(*test_case['input'])
-            execution_time = (time.time() - start_time) * 1000
-            
-            # Debug output for comparison
-            print(f"Debug - Test {{i+1}}: result={{result}}, expected={{test_case['expected']}}", file=sys.stderr)
-            
-            # More robust comparison for lists
-            if isinstance(result, list) and isinstance(test_case['expected'], list):
-                # Sort both lists for comparison in case order doesn't matter
-                passed = sorted(result) == sorted(test_case['expected'])
-            else:
-                passed = result == test_case['expected']
-            
-            results.append({{
-                'testCase': i + 1,
-                'input': test_case['input'],
-                'expected': test_case['expected'],
-                'actual': result,
-                'passed': passed,
-                'executionTime': execution_time
-            }})
-        except Exception as e:
-            results.append({{
-                'testCase': i + 1,
-                'input': test_case['input'],
-                'expected': test_case['expected'],
-                'actual': None,
-                'passed': False,
-                'error': str(e),
-                'executionTime': 0
-            }})
-    
-    print(json.dumps(results))
+    first_test = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    run_test_cases(solution, (json.loads(line) for line in test_data), first_test)
 """
     
-    def _prepare_java_code(self, code: str, problem_id: str) -> str:
-        """Prepare Java code with test harness"""
-        return f"""
-import java.util.*;
-import com.google.gson.*;
+    def _prepare_worker_script(self, language: str) -> Optional[str]:
+        """Script for a pooled worker that runs one submission read from stdin.
+
+        The job is a header line with the code, the number of test cases and
+        the index of the first one, followed by that many test-case lines.
+        The worker exits after the job and is never reused.
+        """
+        if language == 'javascript':
+            return f"""
+const readline = require('readline');
+const vm = require('vm');
+
+{JAVASCRIPT_CASE_RUNNER}
+
+let job = null;
+const testCases = [];
 
-public class Solution {{
-    {code}
+readline.createInterface({{ input: process.stdin }}).on('line', (line) => {{
+    if (job === null) {{
+        job = JSON.parse(line);
+    }} else {{
+        testCases.push(JSON.parse(line));
+    }}
+    if (testCases.length < job.count) {{
+        return;
+    }}
     
-    public static void main(String[] args) {{
-        Gson gson = new Gson();
-        // Test execution logic here
-        System.out.println("Java execution not fully implemented yet");
+    let solution;
+    try {{
+        // The harness's own globals stay out of the submission's reach
+        const context = vm.createContext({{ console }});
+        solution = vm.runInContext(
+            job.code + '\\n;typeof solution === "function" ? solution : undefined',
+            context,
+            {{ filename: 'solution.js' }}
+        );
+        if (typeof solution !== 'function') {{
+            throw new Error('solution is not defined');
+        }}
+    }} catch (error) {{
+        solution = () => {{ throw error; }};
     }}
-}}
+    runTestCases(solution, testCases, job.start);
+    process.exit(0);
+}});
 """
-    
-    def _prepare_cpp_code(self, code: str, problem_id: str) -> str:
-        """Prepare C++ code with test harness"""
-        return f"""
-#include <iostream>
-#include <vector>
-#include <string>
-#include <chrono>
+        elif language == 'python':
+            return f"""
+import json
+import os
+import sys
+import time
 
-using namespace std;
+{PYTHON_CASE_RUNNER}
 
-{code}
+{PYTHON_PRIVATE_STDIN}
+jobs = private_stdin()
+{PYTHON_RESULT_CHANNEL}
 
-int main() {{
-    // Test execution logic here
-    cout << "C++ execution not fully implemented yet" << endl;
-    return 0;
-}}
+job_line = jobs.readline()
+if job_line:
+    job = json.loads(job_line)
+    namespace = {{'__name__': '__solution__'}}
+    try:
+        exec(compile(job['code'], 'solution.py', 'exec'), namespace)
+        solution = namespace['solution']
+    except BaseException as e:
+        error = f'{{type(e).__name__}}: {{e}}'
+        def solution(*args):
+            raise RuntimeError(error)
+    test_cases = (json.loads(jobs.readline()) for _ in range(job['count']))
+    run_test_cases(solution, test_cases, job['start'])
 """
+        return None
     
-    def _compile_code(self, code_file: str, temp_dir: str, language: str) -> Dict[str, Any]:
-        """Compile code for compiled languages"""
-        try:
+    def _solution_signature(self, code: str, language: str, problem_id: str):
+        """Signature of ``solution`` from the problem's starter code, falling back to the submission"""
+        signature = None
+        if self.problems_db is not None:
+            starter_code = self.problems_db.get_starter_code(problem_id, language)
+            if starter_code:
+                signature = parse_signature(starter_code, language)
+        signature = signature or parse_signature(code, language)
+        if signature is None:
+            raise ValueError('Could not find a solution function to test')
+        return signature
+    
+    def _prepare_java_code(self, code: str, problem_id: str) -> str:
+        """Prepare Java code with test harness"""
+        signature = self._solution_signature(code, 'java', problem_id)
+        return build_java_harness(code, signature)
+    
+    def _prepare_cpp_code(self, code: str, problem_id: str) -> str:
+        """Prepare C++ code with test harness"""
+        signature = self._solution_signature(code, 'cpp', problem_id)
+        return build_cpp_harness(code, signature)
+    
+    def _compile_code(self, prepared_code: str, language: str, work_dir: str) -> Dict[str, Any]:
+        """Compile code for compiled languages in ``work_dir``, reusing cached artifacts"""
+        lang_config = self.supported_languages[language]
+        out_dir = os.path.join(work_dir, 'build')
+        
+        def build():
+            with open(os.path.join(work_dir, lang_config['source_file']), 'w') as f:
+                f.write(prepared_code)
+            
+            # Relative to the working directory, where the compiler runs
             if language == 'java':
-                result = subprocess.run(
-                    ['javac', code_file],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
+                cmd = lang_config['command'] + ['-d', 'build', lang_config['source_file']]
             elif language == 'cpp':
-                executable = os.path.join(temp_dir, 'solution')
-                result = subprocess.run(
-                    ['g++', '-o', executable, code_file],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
+                cmd = lang_config['command'] + ['-o', os.path.join('build', 'solution'), lang_config['source_file']]
             
-            if result.returncode != 0:
+            # The compiler reads submitted code (#include "/etc/shadow"), so it
+            # runs sandboxed like the program it builds, as the slot's user
+            owner = os.stat(work_dir)
+            os.chown(out_dir, owner.st_uid, owner.st_gid)
+            process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                cwd=work_dir,
+                env=dict(os.environ, TMPDIR=work_dir),
+                preexec_fn=self.sandbox.preexec_fn(lang_config['compile_limits'], 1, work_dir)
+            )
+            try:
+                output, _ = process.communicate(timeout=COMPILE_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                kill_process_group(process)
+                process.communicate()
+                raise
+            
+            if process.returncode != 0:
                 return {
                     'success': False,
-                    'error': f'Compilation failed: {result.stderr}',
+                    'error': f'Compilation failed: {self._strip_host_paths(output, work_dir)}',
+                    'compile_error': True,
                     'results': []
                 }
-            
-            return {'success': True}
+            return None
+        
+        try:
+            key = self.compile_cache.key(prepared_code, lang_config['command'])
+            error = self.compile_cache.get_or_build(key, out_dir, build)
+            if error is not None:
+                return error
+            return {'success': True, 'artifact_dir': out_dir}
             
         except subprocess.TimeoutExpired:
             return {
                 'success': False,
                 'error': 'Compilation timeout',
+                'compile_error': True,
                 'results': []
             }
         except Exception as e:
             return {
                 'success': False,
-                'error': f'Compilation error: {str(e)}',
+                'error': f'Compilation error: {self._strip_host_paths(str(e), work_dir)}',
                 'results': []
             }
     
-    def _run_test_case(self, code_file: str, temp_dir: str, language: str, test_case: Dict, test_num: int) -> Dict[str, Any]:
-        """Run a single test case"""
+    def _strip_host_paths(self, text: str, work_dir: str) -> str:
+        """Compiler output as seen from the working directory, without server paths"""
+        for path in (work_dir, self.sandbox.root, self.compile_cache.root):
+            text = text.replace(path + os.sep, '').replace(path, '.')
+        return text
+    
+    def _run_command(self, language: str, artifact_dir: str) -> List[str]:
+        """Command that starts a compiled harness"""
+        if language == 'java':
+            # One JVM runs every case, so a parallel collector buys nothing
+            return self.supported_languages['java']['run_command'] + [
+                '-XX:+UseSerialGC', '-cp', artifact_dir, 'Solution'
+            ]
+        return [os.path.join(artifact_dir, 'solution')]
+    
+    def _run_batch(self, run_command: List[str], temp_dir: str, language: str, test_cases: List[Dict],
+                   test_data: TestData, checker: Checker, control: RunControl,
+                   on_result: Optional[Callable] = None, start: int = 0, end: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Run all test cases in as few processes as possible.
+
+        A single process runs every case and streams back one result line per
+        case. If a case crashes the process or exceeds the time limit, that case
+        is reported as failed and the remaining cases resume in a fresh process,
+        unless ``control`` has stopped the run. Only test_cases[start:end] are run.
+        """
+        end = len(test_cases) if end is None else end
+        results = []
+        while start + len(results) < end and not control.stopped():
+            results.extend(self._run_batch_process(
+                run_command, temp_dir, language, test_cases, test_data, checker, control,
+                start + len(results), end, on_result
+            ))
+        return results + self._skip_remaining(test_cases, start + len(results), end, control, on_result)
+    
+    def _run_batch_process(self, run_command: List[str], temp_dir: str, language: str, test_cases: List[Dict],
+                           test_data: TestData, checker: Checker, control: RunControl, start: int, end: int,
+                           on_result: Optional[Callable] = None) -> List[Dict[str, Any]]:
+        """Run test_cases[start:end] in one process until it exits, crashes or times out"""
+        lang_config = self.supported_languages[language]
+        limits = lang_config['limits']
+        cmd = run_command + [str(start)]
+        # A harness that runs through the last case reads the shared test
+        # data directly; other ranges are written to a pipe
+        stdin = test_data.open_from(start) if end == len(test_data) else None
+        
         try:
-            lang_config = self.supported_languages[language]
-            
-            if language == 'javascript':
-                cmd = ['node', code_file, json.dumps([test_case])]
-            elif language == 'python':
-                cmd = ['python3', code_file, json.dumps([test_case])]
-            elif language == 'java':
-                class_name = 'Solution'
-                cmd = ['java', '-cp', temp_dir, class_name, json.dumps([test_case])]
-            elif language == 'cpp':
-                executable = os.path.join(temp_dir, 'solution')
-                cmd = [executable, json.dumps([test_case])]
-            
-            start_time = time.time()
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=lang_config['timeout']
+            if language in self.forkservers:
+                # The server's interpreter replaces the command's
+                process, result_stream = self.forkservers[language].spawn(
+                    cmd[len(lang_config['command']):], temp_dir, limits, end - start, stdin=stdin
+                )
+            else:
+                process, result_stream = popen_with_result_channel(
+                    cmd,
+                    stdin=subprocess.PIPE if stdin is None else stdin,
+                    cwd=temp_dir,
+                    preexec_fn=self.sandbox.preexec_fn(limits, end - start, temp_dir)
+                )
+        except Exception as e:
+            return [self._failed_result(test_cases[start], start + 1, str(e), 0)]
+        finally:
+            if stdin is not None:
+                os.close(stdin)
+        
+        lines = queue.Queue()
+        output_exceeded = threading.Event()
+        
+        def on_overflow():
+            output_exceeded.set()
+            kill_process_group(process)
+        
+        # User prints are drained and capped; only an excerpt is kept
+        stdout = BoundedCapture(process.stdout, hard_limit=limits.output_bytes, on_overflow=on_overflow)
+        stderr = BoundedCapture(process.stderr, hard_limit=limits.output_bytes, on_overflow=on_overflow)
+        
+        def read_results():
+            for line in iter_lines(result_stream, limits.output_bytes):
+                lines.put(line)
+            lines.put(None)
+        
+        def write_stdin():
+            # Fed from a thread so large inputs cannot deadlock against our reads
+            try:
+                process.stdin.write(test_data.lines(start, end))
+                process.stdin.close()
+            except OSError:
+                pass  # The harness exited early; its exit is reported below
+        
+        threads = [threading.Thread(target=read_results, daemon=True)]
+        if process.stdin is not None:
+            threads.append(threading.Thread(target=write_stdin, daemon=True))
+        for thread in threads:
+            thread.start()
+        
+        def exit_error():
+            # Whole-process usage; for a crash it is the best measure of the failing case
+            usage = wait_with_usage(process)
+            stdout.join(1)
+            stderr.join(1)
+            if output_exceeded.is_set():
+                error = 'Output Limit Exceeded'
+            else:
+                error_output = stderr.text().strip()
+                error = describe_exit(process.returncode, error_output) or error_output \
+                    or f'Process exited with code {process.returncode}'
+            return dict(usage, error=error)
+        
+        try:
+            results, _ = self._collect_results(
+                lines, test_cases, checker, control, start, end, lang_config['timeout'], exit_error, on_result
             )
-            execution_time = (time.time() - start_time) * 1000
+            return results
+        finally:
+            # Never poll() here: wait_with_usage must be the one to reap the process
+            if process.returncode is None:
+                kill_process_group(process)
+                wait_with_usage(process)
+            result_stream.close()
+    
+    def _collect_results(self, lines: queue.Queue, test_cases: List[Dict], checker: Checker, control: RunControl,
+                         start: int, end: int, timeout: float, exit_error, on_result: Optional[Callable] = None):
+        """Read per-test result lines for test_cases[start:end] from a running harness.
+
+        Stops early, after recording the failing case, when a case exceeds the
+        time limit or the harness exits (``None`` on the queue) without
+        reporting it; ``exit_error`` is called to describe the exit and returns
+        the ``error`` and any usage fields for the failed case. Also stops,
+        without waiting for the case in progress, once ``control`` stops the
+        run. Returns the results and whether the harness reported every case
+        itself.
+        """
+        results = []
+        
+        def report(result):
+            results.append(result)
+            control.observe(result)
+            if on_result:
+                on_result(result)
+        
+        for offset, test_case in enumerate(test_cases[start:end]):
+            if control.stopped():
+                return results, False
+            test_num = start + offset + 1
+            # The clock restarts for every case, so one slow case cannot eat
+            # into the time limit of the cases after it.
+            case_start = time.perf_counter()
+            wait = control.wait_time(timeout)
+            try:
+                line = self._next_line(lines, wait, control)
+            except queue.Empty:
+                if wait >= timeout:
+                    report(self._failed_result(
+                        test_case, test_num, 'Time Limit Exceeded', timeout * 1000
+                    ))
+                    return results, False
+                control.stop(BUDGET_EXCEEDED)
+                line = RUN_STOPPED
             
-            if result.returncode != 0:
-                return {
-                    'testCase': test_num,
-                    'input': test_case['input'],
-                    'expected': test_case['expected'],
-                    'actual': None,
-                    'passed': False,
-                    'error': result.stderr,
-                    'executionTime': execution_time
-                }
+            if line is RUN_STOPPED:
+                if control.reason == BUDGET_EXCEEDED:
+                    # The case in progress is the one that ran out of time; the rest are skipped
+                    report(self._failed_result(
+                        test_case, test_num, BUDGET_EXCEEDED, (time.perf_counter() - case_start) * 1000
+                    ))
+                return results, False
             
-            # Parse output for JavaScript and Python
-            if language in ['javascript', 'python']:
-                try:
-                    output_results = json.loads(result.stdout.strip())
-                    if output_results:
-                        return output_results[0]  # Return first result
-                except json.JSONDecodeError:
-                    pass
+            if line is LINE_TOO_LONG:
+                report(self._failed_result(
+                    test_case, test_num, 'Output Limit Exceeded', (time.perf_counter() - case_start) * 1000
+                ))
+                continue
             
-            return {
-                'testCase': test_num,
-                'input': test_case['input'],
-                'expected': test_case['expected'],
-                'actual': result.stdout.strip(),
-                'passed': False,
-                'executionTime': execution_time
-            }
+            if line is None:
+                exit_info = exit_error()
+                error = exit_info.pop('error')
+                report(dict(
+                    self._failed_result(test_case, test_num, error, (time.perf_counter() - case_start) * 1000),
+                    **exit_info
+                ))
+                return results, False
             
-        except subprocess.TimeoutExpired:
-            return {
-                'testCase': test_num,
-                'input': test_case['input'],
-                'expected': test_case['expected'],
-                'actual': None,
-                'passed': False,
-                'error': 'Time Limit Exceeded',
-                'executionTime': lang_config['timeout'] * 1000
-            }
-        except Exception as e:
-            return {
-                'testCase': test_num,
-                'input': test_case['input'],
-                'expected': test_case['expected'],
-                'actual': None,
-                'passed': False,
-                'error': str(e),
-                'executionTime': 0
-            }
+            try:
+                report(self._merge_result(test_case, test_num, json.loads(line), checker))
+            except ValueError:
+                report(self._failed_result(
+                    test_case, test_num, 'Malformed result from test harness',
+                    (time.perf_counter() - case_start) * 1000
+                ))
+        return results, True
+    
+    def _next_line(self, lines: queue.Queue, timeout: float, control: RunControl):
+        """Next result line within ``timeout``, or RUN_STOPPED once ``control`` stops the run"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise queue.Empty
+            try:
+                return lines.get(timeout=min(remaining, STOP_POLL_INTERVAL))
+            except queue.Empty:
+                if control.stopped():
+                    return RUN_STOPPED
+    
+    def _skip_remaining(self, test_cases: List[Dict], start: int, end: int, control: RunControl,
+                        on_result: Optional[Callable] = None) -> List[Dict[str, Any]]:
+        """Results for test_cases[start:end], which a stopped run never got to"""
+        results = []
+        for offset, test_case in enumerate(test_cases[start:end]):
+            result = dict(
+                self._failed_result(test_case, start + offset + 1, 'Skipped: ' + (control.reason or 'run stopped'), 0),
+                skipped=True
+            )
+            results.append(result)
+            if on_result:
+                on_result(result)
+        return results
+    
+    def _run_pooled(self, code: str, language: str, test_cases: List[Dict], test_data: TestData,
+                    checker: Checker, control: RunControl, on_result: Optional[Callable] = None,
+                    start: int = 0, end: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Run test_cases[start:end] on pre-started workers from the language's pool, one per process run"""
+        pool = self.worker_pools[language]
+        timeout = self.supported_languages[language]['timeout']
+        end = len(test_cases) if end is None else end
+        worker = pool.acquire()
+        results = []
+        try:
+            while start + len(results) < end and not control.stopped():
+                if worker.used:
+                    # The previous worker crashed or timed out; resume on a fresh one
+                    worker = pool.replace(worker)
+                resume = start + len(results)
+                worker.send(json.dumps({
+                    'code': code,
+                    'count': end - resume,
+                    'start': resume
+                }), [test_data.lines(resume, end)])
+                batch_results, _ = self._collect_results(
+                    worker.lines, test_cases, checker, control, resume, end, timeout, worker.exit_error, on_result
+                )
+                results.extend(batch_results)
+            return results + self._skip_remaining(test_cases, start + len(results), end, control, on_result)
+        finally:
+            pool.release(worker)
+    
+    def _merge_result(self, test_case: Dict, test_num: int, reported: Any, checker: Checker) -> Dict[str, Any]:
+        """Grade a result reported by a harness against the host's copy of the test case.
+
+        Submitted code can write to the result channel too, so only the
+        output and metric fields are taken from ``reported``; the case
+        number, input and expected output are the host's. Raises ValueError
+        for a report that is not a JSON object.
+        """
+        if not isinstance(reported, dict):
+            raise ValueError('Result is not an object')
+        result = {
+            'testCase': test_num,
+            'input': test_case['input'],
+            'expected': test_case['expected'],
+            'actual': reported.get('actual')
+        }
+        if 'error' in reported:
+            result['error'] = str(reported['error'])
+        for key in REPORTED_METRICS:
+            value = reported.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                result[key] = value
+        result['passed'] = 'error' not in result and checker.check(test_case, result['actual'])
+        return result
+    
+    def _failed_result(self, test_case: Dict, test_num: int, error: str, execution_time: float) -> Dict[str, Any]:
+        """Build the result entry for a test case that did not produce output"""
+        return {
+            'testCase': test_num,
+            'input': test_case['input'],
+            'expected': test_case['expected'],
+            'actual': None,
+            'passed': False,
+            'error': error,
+            'executionTime': execution_time
+        }
@@ -0,0 +1,377 @@
+# Fork server: launches Python submissions from a pre-started interpreter
+import importlib
+import json
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import traceback
+import queue
+from typing import Any, Dict, List, Optional, Tuple
+
+from .capture import RESULT_FD_ENV
+from .limits import ResourceLimits
+from .sandbox import SandboxManager, isolate
+
+# Modules the Python harness imports (see executor.PYTHON_CASE_RUNNER), loaded
+# once in the server so forked children find them in sys.modules instead of
+# loading them again; ``resource`` is missing on some platforms
+PRELOAD_MODULES = ('json', 'os', 'sys', 'time', 'resource')
+
+MESSAGE_SIZE = 64 * 1024
+
+
+class ForkedProcess:
+    """Popen-like handle on a submission process started by the fork server.
+
+    The process is a child of the server, not of the host, so the server
+    reaps it and reports its exit status and resource usage (``rusage``,
+    in the format of ``limits.wait_with_usage``).
+    """
+
+    def __init__(self, pid: int, stdin: Optional[int], stdout: int, stderr: int):
+        self.pid = pid
+        self.stdin = os.fdopen(stdin, 'wb') if stdin is not None else None
+        self.stdout = os.fdopen(stdout, 'rb', buffering=0)
+        self.stderr = os.fdopen(stderr, 'rb', buffering=0)
+        self.returncode = None
+        self.rusage: Dict[str, Any] = {}
+        self._exited = threading.Event()
+
+    def _set_exit(self, returncode: int, rusage: Dict[str, Any]):
+        self.rusage = rusage
+        self.returncode = returncode
+        self._exited.set()
+
+    def poll(self) -> Optional[int]:
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        if not self._exited.wait(timeout):
+            raise subprocess.TimeoutExpired(str(self.pid), timeout)
+        return self.returncode
+
+    def kill(self):
+        if self.returncode is None:
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+class _Generation:
+    """Bookkeeping for the processes one server process started"""
+
+    def __init__(self):
+        self.running: Dict[int, ForkedProcess] = {}
+        self.early_exits: Dict[int, Tuple[int, Dict[str, Any]]] = {}
+        self.dead = False
+
+
+class ForkServer:
+    """A Python interpreter that forks a fresh child for every submission.
+
+    The server starts once with the harness dependencies imported; each
+    ``spawn`` forks a copy-on-write child, which enters the sandbox (session,
+    namespaces, rlimits, uid and seccomp filter, see ``sandbox.isolate``) and
+    only then runs the submitted script. This
+    skips interpreter start-up and imports, so a launch costs about as much
+    as a ``fork``.
+
+    Requests travel over a Unix socket together with the child's end of its
+    stdin, stdout, stderr and result pipes. The server replies with the
+    child's pid and later reports its exit status and usage. If the server
+    dies it is restarted on the next ``spawn``; each server process has its
+    own table of running children, so cleaning up after a dead one never
+    touches children of its successor.
+    """
+
+    def __init__(self, command: List[str], sandbox: SandboxManager):
+        self.command = command
+        self.sandbox = sandbox
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._server = None
+        self._socket = None
+        self._replies = queue.Queue()
+        self._generation = _Generation()
+        self._start()
+
+    @staticmethod
+    def available() -> bool:
+        return hasattr(os, 'fork') and hasattr(socket, 'send_fds') and hasattr(socket, 'AF_UNIX')
+
+    def _start(self):
+        host_end, server_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_root, env.get('PYTHONPATH')]))
+        try:
+            self._server = subprocess.Popen(
+                self.command + ['-m', f'{__package__}.forkserver', str(server_end.fileno())],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                pass_fds=(server_end.fileno(),),
+                cwd=self.sandbox.root,
+                env=env
+            )
+        finally:
+            server_end.close()
+        self._socket = host_end
+        self._replies = queue.Queue()
+        self._generation = _Generation()
+        threading.Thread(
+            target=self._read_messages, args=(host_end, self._replies, self._generation), daemon=True
+        ).start()
+
+    def _read_messages(self, sock: socket.socket, replies: queue.Queue, generation: _Generation):
+        while True:
+            try:
+                data = sock.recv(MESSAGE_SIZE)
+            except OSError:
+                data = b''
+            if not data:
+                break
+            message = json.loads(data)
+            if 'exited' in message:
+                self._on_exit(generation, message['exited'], message['returncode'], message['usage'])
+            else:
+                replies.put(message)
+        replies.put(None)
+        # The server is gone, and nobody is left to report on its children
+        with self._state_lock:
+            generation.dead = True
+            orphans = list(generation.running.values())
+            generation.running.clear()
+            generation.early_exits.clear()
+        for process in orphans:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            process._set_exit(-signal.SIGKILL, {})
+
+    def _on_exit(self, generation: _Generation, pid: int, returncode: int, usage: Dict[str, Any]):
+        with self._state_lock:
+            process = generation.running.pop(pid, None)
+            if process is None:
+                # Exited before spawn() registered it
+                generation.early_exits[pid] = (returncode, usage)
+                return
+        process._set_exit(returncode, usage)
+
+    def spawn(self, argv: List[str], cwd: str, limits: ResourceLimits,
+              test_count: Optional[int] = 1, stdin: Optional[int] = None) -> Tuple[ForkedProcess, Any]:
+        """Run ``argv[0]`` as ``__main__`` with ``argv`` in a fresh child.
+
+        The child reads ``stdin`` when a descriptor is given (it stays open
+        for the caller to close) and a new pipe otherwise. Returns the
+        process and the read end of its result channel, like
+        ``capture.popen_with_result_channel``.
+        """
+        stdin_pipe = os.pipe() if stdin is None else (os.dup(stdin), None)
+        pipes = [os.pipe() for _ in range(3)]
+        # (child end, host end) of stdin, stdout, stderr and the result channel
+        ends = [stdin_pipe] + [(w, r) for r, w in pipes]
+        request = json.dumps({
+            'argv': argv,
+            'cwd': cwd,
+            'limits': list(self.sandbox.slot_limits(cwd, limits)),
+            'test_count': test_count,
+            'isolation': list(self.sandbox.isolation(cwd))
+        }).encode('utf-8')
+        try:
+            with self._lock:
+                if self._server.poll() is not None:
+                    self._socket.close()
+                    self._start()
+                generation = self._generation
+                try:
+                    socket.send_fds(self._socket, [request], [child for child, _ in ends])
+                    reply = self._replies.get()
+                except OSError:
+                    reply = None
+        except BaseException:
+            for _, host in ends:
+                if host is not None:
+                    os.close(host)
+            raise
+        finally:
+            # The server holds its own copies now
+            for child, _ in ends:
+                os.close(child)
+        if reply is None or 'pid' not in reply:
+            for _, host in ends:
+                if host is not None:
+                    os.close(host)
+            raise OSError((reply or {}).get('error', 'Fork server is not running'))
+
+        pid = reply['pid']
+        process = ForkedProcess(pid, *(host for _, host in ends[:3]))
+        with self._state_lock:
+            early_exit = generation.early_exits.pop(pid, None)
+            if early_exit is None and generation.dead:
+                # The server died between replying and now; nobody will report this child
+                try:
+                    os.killpg(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+                early_exit = (-signal.SIGKILL, {})
+            elif early_exit is None:
+                generation.running[pid] = process
+        if early_exit is not None:
+            process._set_exit(*early_exit)
+        return process, os.fdopen(ends[3][1], 'rb', buffering=0)
+
+    def shutdown(self):
+        with self._lock:
+            if self._socket is not None:
+                self._socket.close()
+            if self._server is not None:
+                try:
+                    self._server.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self._server.kill()
+
+
+def _run_child(request: Dict[str, Any], fds: List[int]):
+    """Body of a forked child: enter the sandbox and run the script as __main__"""
+    exit_code = 1
+    try:
+        stdin, stdout, stderr, results = fds
+        for target, fd in ((0, stdin), (1, stdout), (2, stderr)):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.environ[RESULT_FD_ENV] = str(results)
+
+        os.chdir(request['cwd'])
+        unshare_flags, uid, gid, hidden = request['isolation']
+        limits = ResourceLimits(*request['limits'])
+        isolate(unshare_flags, uid, gid, limits.preexec_fn(request['test_count']), hidden)
+
+        path = request['argv'][0]
+        sys.argv = request['argv']
+        sys.path[0] = os.path.dirname(path)
+        with open(path) as f:
+            source = f.read()
+        namespace = {'__name__': '__main__', '__file__': path, '__builtins__': __builtins__}
+        try:
+            exec(compile(source, path, 'exec'), namespace)
+            exit_code = 0
+        except SystemExit as e:
+            if e.code is None:
+                exit_code = 0
+            elif isinstance(e.code, int):
+                exit_code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+        except BaseException as e:
+            # Leave this frame out of the traceback, as the interpreter would
+            traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(exit_code & 0xff)
+
+
+def serve(sock: socket.socket):
+    """Fork a child per request until the host closes the socket"""
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    wakeup_read, wakeup_write = os.pipe()
+    os.set_blocking(wakeup_read, False)
+    os.set_blocking(wakeup_write, False)
+    signal.set_wakeup_fd(wakeup_write)
+    signal.signal(signal.SIGCHLD, lambda *args: None)
+    children = set()
+
+    def send(message):
+        try:
+            sock.send(json.dumps(message).encode('utf-8'))
+        except OSError:
+            pass
+
+    def reap():
+        while children:
+            try:
+                pid, status, usage = os.wait4(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            children.discard(pid)
+            send({
+                'exited': pid,
+                'returncode': os.waitstatus_to_exitcode(status),
+                'usage': {
+                    'cpuUser': usage.ru_utime * 1000,
+                    'cpuSys': usage.ru_stime * 1000,
+                    'peakMemory': usage.ru_maxrss * 1024
+                }
+            })
+
+    while True:
+        try:
+            ready = select.select([sock, wakeup_read], [], [])[0]
+        except InterruptedError:
+            continue
+        if wakeup_read in ready:
+            try:
+                while os.read(wakeup_read, 512):
+                    pass
+            except BlockingIOError:
+                pass
+            reap()
+        if sock not in ready:
+            continue
+
+        try:
+            data, fds, _, _ = socket.recv_fds(sock, MESSAGE_SIZE, 4)
+        except OSError:
+            break
+        if not data:
+            break
+        try:
+            request = json.loads(data)
+            if len(fds) != 4:
+                raise ValueError('Expected four file descriptors')
+            pid = os.fork()
+        except (OSError, ValueError) as e:
+            for fd in fds:
+                os.close(fd)
+            send({'error': str(e)})
+            continue
+        if pid == 0:
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            sock.close()
+            os.close(wakeup_read)
+            os.close(wakeup_write)
+            _run_child(request, fds)
+        children.add(pid)
+        for fd in fds:
+            os.close(fd)
+        send({'pid': pid})
+
+    # The host went away: take the running submissions down with us
+    for pid in children:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+if __name__ == '__main__':
+    serve(socket.socket(fileno=int(sys.argv[1])))
@@ -0,0 +1,57 @@
+# Scaled input generators for performance grading
+import random
+import string
+from typing import Any, Callable, Dict, List
+
+
+def two_sum(size: int, rng: random.Random) -> Dict[str, Any]:
+    """Distinct numbers whose only matching pair is the last two elements,
+    the worst case for a nested-loop scan"""
+    # Multiples of 4 plus one number of each of the forms 4k+1 and 4k+2: only
+    # the two odd-form numbers can sum to a target of the form 4k+3
+    nums = [4 * k for k in rng.sample(range(-10**8, 10**8), size - 2)]
+    nums += [4 * rng.randrange(-10**8, 10**8) + 1, 4 * rng.randrange(-10**8, 10**8) + 2]
+    return {'input': [nums, nums[-2] + nums[-1]], 'expected': [size - 2, size - 1]}
+
+
+def binary_search(size: int, rng: random.Random) -> Dict[str, Any]:
+    """Sorted distinct numbers, searching for one near the end"""
+    nums = sorted(rng.sample(range(-10**9, 10**9), size))
+    index = rng.randrange(size * 3 // 4, size)
+    return {'input': [nums, nums[index]], 'expected': index}
+
+
+def palindrome(size: int, rng: random.Random) -> Dict[str, Any]:
+    """A long mixed-case palindrome with punctuation, so the whole string is scanned"""
+    half = ''.join(rng.choice(string.ascii_lowercase + ' ,') for _ in range(size // 2))
+    text = half + half[::-1]
+    return {'input': [text.upper()[:size // 4] + text[size // 4:]], 'expected': True}
+
+
+def reverse_string(size: int, rng: random.Random) -> Dict[str, Any]:
+    chars = [rng.choice(string.ascii_letters) for _ in range(size)]
+    return {'input': [chars], 'expected': chars[::-1]}
+
+
+GENERATORS: Dict[str, Callable[[int, random.Random], Dict[str, Any]]] = {
+    'two_sum': two_sum,
+    'binary_search': binary_search,
+    'palindrome': palindrome,
+    'reverse_string': reverse_string,
+}
+
+
+def generate_cases(generator: str, sizes: List[int], repeats: int = 3, seed: int = 0) -> List[Dict[str, Any]]:
+    """Test cases for every size, ``repeats`` each, with a ``size`` field.
+
+    Seeded, so the same problem always produces the same inputs.
+    """
+    make_case = GENERATORS[generator]
+    rng = random.Random(seed)
+    cases = []
+    for size in sizes:
+        for _ in range(repeats):
+            case = make_case(size, rng)
+            case['size'] = size
+            cases.append(case)
+    return cases
@@ -0,0 +1,185 @@
+# Asynchronous execution jobs with fair per-candidate scheduling
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+
+class QueueFullError(Exception):
+    """Raised when the scheduler cannot accept more pending jobs"""
+
+
+class Job:
+    """A submission queued for execution.
+
+    Per-test results are appended as they finish so pollers and streams can
+    report progress before the whole suite is done.
+    """
+
+    def __init__(self, candidate_id: str, code: str, language: str, test_cases: List[Dict], problem_id: str,
+                 fail_fast: str = 'all', time_budget: Optional[float] = None,
+                 test_set_version: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.candidate_id = candidate_id
+        self.code = code
+        self.language = language
+        self.test_cases = test_cases
+        self.problem_id = problem_id
+        self.fail_fast = fail_fast
+        self.time_budget = time_budget
+        self.test_set_version = test_set_version
+        self.status = 'queued'
+        self.results = []
+        self.result = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._changed = threading.Condition()
+
+    def add_result(self, result: Dict[str, Any]):
+        with self._changed:
+            self.results.append(result)
+            self._changed.notify_all()
+
+    def set_status(self, status: str, result: Optional[Dict[str, Any]] = None):
+        with self._changed:
+            self.status = status
+            if status == 'running':
+                self.started_at = time.time()
+            if result is not None:
+                self.result = result
+                self.finished_at = time.time()
+            self._changed.notify_all()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed')
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._changed:
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'problem_id': self.problem_id,
+                'language': self.language,
+                'total_tests': len(self.test_cases),
+                'results': list(self.results),
+                'result': self.result
+            }
+
+    def events(self, timeout: float = 15) -> Iterator[Tuple[str, Any]]:
+        """Yield ('result', result) per finished test and a final ('done', result).
+
+        While nothing new arrives for ``timeout`` seconds a ('ping', None)
+        event is yielded so streaming responses can keep the connection open.
+        """
+        sent = 0
+        while True:
+            with self._changed:
+                if sent == len(self.results) and not self.finished:
+                    self._changed.wait(timeout)
+                pending = self.results[sent:]
+                finished = self.finished
+            for result in pending:
+                yield 'result', result
+            sent += len(pending)
+            if finished and sent == len(self.results):
+                yield 'done', self.result
+                return
+            if not pending:
+                yield 'ping', None
+
+
+class JobScheduler:
+    """In-process job queue in front of a CodeExecutor.
+
+    Runs at most ``max_concurrency`` jobs at once. Pending jobs are kept in one
+    queue per candidate and served round-robin, so a candidate who submits many
+    times cannot starve the others. Finished jobs are kept for ``job_ttl``
+    seconds so clients can fetch their results.
+    """
+
+    def __init__(self, executor, max_concurrency: int = 4, max_pending: int = 500, job_ttl: float = 600):
+        self.executor = executor
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self._jobs = {}
+        self._queues = OrderedDict()  # candidate_id -> deque of jobs
+        self._pending = 0
+        self._lock = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._work, daemon=True, name=f'job-worker-{i}')
+            for i in range(max_concurrency)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, candidate_id: str, code: str, language: str, test_cases: List[Dict], problem_id: str,
+               fail_fast: str = 'all', time_budget: Optional[float] = None,
+               test_set_version: Optional[str] = None) -> Job:
+        """Queue a submission and return its job immediately.
+
+        ``candidate_id`` decides whose turn the job waits for, so it must come
+        from the server (the connection or an authenticated session), never
+        from the request body. ``test_set_version`` is passed on to
+        ``execute_code``, as the synchronous routes do.
+        """
+        job = Job(candidate_id, code, language, test_cases, problem_id, fail_fast, time_budget, test_set_version)
+        with self._lock:
+            self._evict_expired()
+            if self._pending >= self.max_pending:
+                raise QueueFullError('Too many pending submissions')
+            self._jobs[job.id] = job
+            self._queues.setdefault(candidate_id, deque()).append(job)
+            self._pending += 1
+            self._lock.notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'pending': self._pending,
+                'candidates_waiting': len(self._queues),
+                'jobs_tracked': len(self._jobs)
+            }
+
+    def _next_job(self) -> Job:
+        """Pop the head job of the next candidate in round-robin order"""
+        with self._lock:
+            while not self._queues:
+                self._lock.wait()
+            candidate_id, jobs = self._queues.popitem(last=False)
+            job = jobs.popleft()
+            if jobs:
+                # Send the candidate to the back of the line
+                self._queues[candidate_id] = jobs
+            self._pending -= 1
+            return job
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            job.set_status('running')
+            try:
+                result = self.executor.execute_code(
+                    job.code, job.language, job.test_cases, job.problem_id,
+                    on_result=job.add_result, fail_fast=job.fail_fast, time_budget=job.time_budget,
+                    test_set_version=job.test_set_version
+                )
+                job.set_status('done', result)
+            except Exception as e:
+                job.set_status('failed', {'success': False, 'error': str(e), 'results': list(job.results)})
+
+    def _evict_expired(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and now - job.finished_at > self.job_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,101 @@
+# Resource limits and usage metering for submission processes
+import os
+import signal
+import subprocess
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: limits are not enforced and usage is not metered
+    resource = None
+
+
+class ResourceLimits(NamedTuple):
+    """Limits applied to every process that runs submitted code.
+
+    ``memory_bytes`` caps the address space. Runtimes that reserve large
+    virtual ranges up front (the JVM, V8) do not start under such a cap, so
+    they leave it unset and bound their heap with command-line flags instead.
+    ``max_processes`` is RLIMIT_NPROC, which counts all processes and threads
+    of the user, so it is only set for runtimes that start no threads of
+    their own, and only applied to sandboxes with a uid of their own (see
+    ``SandboxManager.slot_limits``). ``cpu_seconds`` is per test case; a process running several
+    cases gets a proportional CPU allowance. ``output_bytes`` caps both files
+    written by the process and the stdout the host accepts from it.
+    """
+    memory_bytes: Optional[int] = 512 * 1024 * 1024
+    cpu_seconds: Optional[int] = 10
+    max_processes: Optional[int] = None
+    output_bytes: Optional[int] = 16 * 1024 * 1024
+
+    def preexec_fn(self, test_count: Optional[int] = 1) -> Optional[Callable[[], None]]:
+        """Function for Popen that applies the limits in the child.
+
+        With ``test_count`` None no CPU limit is set; pooled workers live
+        across many jobs and rely on the per-case wall-clock timeout instead.
+        """
+        if resource is None:
+            return None
+        # (resource, soft, hard); hard limits are lowered too so submitted
+        # code cannot raise its own soft limits back up
+        limits = []
+        if self.memory_bytes:
+            limits.append((resource.RLIMIT_AS, self.memory_bytes, self.memory_bytes))
+        if self.cpu_seconds and test_count:
+            # A second of slack for interpreter or JVM startup; SIGXCPU at the
+            # soft limit, SIGKILL a second later if it is ignored
+            cpu_seconds = self.cpu_seconds * test_count + 1
+            limits.append((resource.RLIMIT_CPU, cpu_seconds, cpu_seconds + 1))
+        if self.max_processes:
+            limits.append((resource.RLIMIT_NPROC, self.max_processes, self.max_processes))
+        if self.output_bytes:
+            limits.append((resource.RLIMIT_FSIZE, self.output_bytes, self.output_bytes))
+        limits.append((resource.RLIMIT_CORE, 0, 0))
+
+        def apply():
+            for which, soft, hard in limits:
+                current_hard = resource.getrlimit(which)[1]
+                if current_hard != resource.RLIM_INFINITY:
+                    soft, hard = min(soft, current_hard), min(hard, current_hard)
+                resource.setrlimit(which, (soft, hard))
+        return apply
+
+
+def wait_with_usage(process: subprocess.Popen) -> Dict[str, Any]:
+    """Reap ``process`` and return the CPU time and peak RSS it used.
+
+    Returns an empty dict when usage cannot be measured (no ``wait4`` or
+    the process was already reaped).
+    """
+    if hasattr(process, 'rusage'):
+        # Children of the fork server are reaped there, which reports their usage
+        process.wait()
+        return process.rusage
+    if not hasattr(os, 'wait4') or process.returncode is not None:
+        process.wait()
+        return {}
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        process.wait()
+        return {}
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        'cpuUser': usage.ru_utime * 1000,
+        'cpuSys': usage.ru_stime * 1000,
+        # ru_maxrss is in kilobytes on Linux
+        'peakMemory': usage.ru_maxrss * 1024
+    }
+
+
+def describe_exit(returncode: Optional[int], stderr: str = '') -> Optional[str]:
+    """Name the limit that killed a process, if any"""
+    if 'heap out of memory' in stderr:
+        return 'Memory Limit Exceeded'
+    if returncode is None or returncode >= 0:
+        return None
+    if -returncode == getattr(signal, 'SIGXCPU', None):
+        return 'CPU Time Limit Exceeded'
+    if -returncode == getattr(signal, 'SIGXFSZ', None):
+        return 'Output Limit Exceeded'
+    return None
@@ -0,0 +1,124 @@
+# Precomputed, cacheable problem listings for the exam page
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+# Fields a listing may project; test_cases are only ever the samples
+LISTING_FIELDS = ('id', 'title', 'difficulty', 'tags', 'description', 'starter_code', 'test_cases')
+
+# What the exam page reads when it asks for no fields in particular
+DEFAULT_FIELDS = ('id', 'title', 'difficulty', 'description', 'starter_code', 'test_cases')
+
+MAX_PER_PAGE = 200
+
+
+class ListingError(ValueError):
+    """Raised for listing parameters that cannot be served"""
+
+
+class ListingPayload:
+    """A serialized listing with its ETag; the gzip encoding is made on first use"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self._gzipped = None
+        self._lock = threading.Lock()
+
+    def gzipped(self) -> bytes:
+        with self._lock:
+            if self._gzipped is None:
+                self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+            return self._gzipped
+
+
+class ProblemListing:
+    """Problem listings serialized once and reused until a problem changes.
+
+    Each distinct combination of projected fields, filters and page is
+    rendered to JSON the first time it is asked for and kept, with its ETag
+    and gzip encoding, in an LRU of ``max_entries`` payloads. Any change to
+    the problem bank drops them all, since a change can move a problem in
+    or out of any listing; changes other processes make to the database
+    file are noticed on the next ``get``, within the store's
+    ``reload_interval``. Test cases are limited to each problem's samples
+    (see ProblemsDatabase.public_view), so hidden tests never leak.
+    """
+
+    def __init__(self, problems_db, max_entries: int = 256):
+        self.problems_db = problems_db
+        self.max_entries = max_entries
+        self._payloads = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        problems_db.add_change_listener(self.invalidate)
+
+    def invalidate(self, problem_id: Optional[str] = None):
+        with self._lock:
+            self._payloads.clear()
+            self._generation += 1
+
+    @staticmethod
+    def parse_fields(fields: Optional[str]) -> Sequence[str]:
+        if not fields:
+            return DEFAULT_FIELDS
+        requested = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in requested if field not in LISTING_FIELDS]
+        if unknown:
+            raise ListingError(f'Unknown fields: {", ".join(unknown)}')
+        # Listing order, so equivalent requests share one payload
+        return tuple(field for field in LISTING_FIELDS if field in requested)
+
+    def get(self, fields: Sequence[str] = DEFAULT_FIELDS, difficulty: Optional[str] = None,
+            tag: Optional[str] = None, page: Optional[int] = None,
+            per_page: Optional[int] = None) -> ListingPayload:
+        """Serialized listing; without ``page`` and ``per_page`` every match is listed"""
+        if per_page is not None and not 1 <= per_page <= MAX_PER_PAGE:
+            raise ListingError(f'per_page must be between 1 and {MAX_PER_PAGE}')
+        if page is not None and page < 1:
+            raise ListingError('page must be at least 1')
+        if page is not None and per_page is None:
+            per_page = MAX_PER_PAGE
+
+        key = (tuple(fields), difficulty, tag, page, per_page)
+        # A cache hit never reads the store, so let it notice other processes' writes first
+        self.problems_db.check_for_changes()
+        with self._lock:
+            payload = self._payloads.get(key)
+            if payload is not None:
+                self._payloads.move_to_end(key)
+                return payload
+            generation = self._generation
+
+        payload = ListingPayload(self._render(fields, difficulty, tag, page, per_page))
+        with self._lock:
+            # Do not keep a payload rendered from data that changed meanwhile
+            if generation == self._generation:
+                self._payloads[key] = payload
+                while len(self._payloads) > self.max_entries:
+                    self._payloads.popitem(last=False)
+        return payload
+
+    def _render(self, fields: Sequence[str], difficulty: Optional[str], tag: Optional[str],
+                page: Optional[int], per_page: Optional[int]) -> bytes:
+        problems = self.problems_db.list_problems(difficulty=difficulty, tag=tag)
+        total = len(problems)
+        listing = {}
+        if per_page is not None:
+            page = page or 1
+            problems = problems[(page - 1) * per_page:page * per_page]
+            listing.update(page=page, per_page=per_page, total=total)
+        listing['problems'] = [self._project(problem, fields) for problem in problems]
+        return json.dumps(listing, separators=(',', ':')).encode('utf-8')
+
+    def _project(self, problem: dict, fields: Sequence[str]) -> dict:
+        projected = {}
+        for field in fields:
+            if field == 'test_cases':
+                projected[field] = self.problems_db.get_sample_test_cases(problem['id'])
+            elif field in problem:
+                projected[field] = problem[field]
+        return projected
@@ -1,372 +1,358 @@
-from typing import Dict, List, Any
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Any, Callable, Optional
 
-class ProblemsDatabase:
-    def __init__(self):
-        self.problems = {
-            "two_sum": {
-                "id": "two_sum",
-                "title": "Two Sum",
-                "difficulty": "Easy",
-                "description": """Given an array of integers `nums` and an integer `target`, return indices of the two numbers such that they add up to `target`.
-
-You may assume that each input would have exactly one solution, and you may not use the same element twice.
-
-You can return the answer in any order.
-
-**Example:**
-```
-Input: nums = [2,7,11,15], target = 9
-Output: [0,1]
-Explanation: Because nums[0] + nums[1] == 9, we return [0, 1].
-```
-
-**Constraints:**
-- 2 ≤ nums.length ≤ 10⁴
-- -10⁹ ≤ nums[i] ≤ 10⁹
-- -10⁹ ≤ target ≤ 10⁹
-- Only one valid answer exists.""",
-                "starter_code": {
-                    "javascript": """function solution(nums, target) {
-    // Write your code here
-    // Return an array of two indices
-}""",
-                    "python": """def solution(nums, target):
-    # Write your code here
-    # Return a list of two indices
-    pass""",
-                    "java": """public static int[] solution(int[] nums, int target) {
-    // Write your code here
-    // Return an array of two indices
-    return new int[]{};
-}""",
-                    "cpp": """vector<int> solution(vector<int>& nums, int target) {
-    // Write your code here
-    // Return a vector of two indices
-    return {};
-}"""
-                },
-                "test_cases": [
-                    {
-                        "input": [[2, 7, 11, 15], 9],
-                        "expected": [0, 1],
-                        "description": "Basic case: target found at beginning"
-                    },
-                    {
-                        "input": [[3, 2, 4], 6],
-                        "expected": [1, 2],
-                        "description": "Target found at end"
-                    },
-                    {
-                        "input": [[3, 3], 6],
-                        "expected": [0, 1],
-                        "description": "Duplicate numbers"
-                    },
-                    {
-                        "input": [[1, 2, 3, 4, 5], 8],
-                        "expected": [2, 4],
-                        "description": "Numbers in middle"
-                    },
-                    {
-                        "input": [[-1, -2, -3, -4, -5], -8],
-                        "expected": [2, 4],
-                        "description": "Negative numbers"
-                    }
-                ]
-            },
-            "binary_search": {
-                "id": "binary_search",
-                "title": "Binary Search",
-                "difficulty": "Easy",
-                "description": """Given an array of integers `nums` which is sorted in ascending order, and an integer `target`, write a function to search `target` in `nums`. If `target` exists, then return its index. Otherwise, return -1.
-
-You must write an algorithm with O(log n) runtime complexity.
-
-**Example:**
-```
-Input: nums = [-1,0,3,5,9,12], target = 9
-Output: 4
-Explanation: 9 exists in nums and its index is 4
-```
-
-**Constraints:**
-- 1 ≤ nums.length ≤ 10⁴
-- -10⁴ < nums[i], target < 10⁴
-- All the integers in nums are unique.
-- nums is sorted in ascending order.""",
-                "starter_code": {
-                    "javascript": """function solution(nums, target) {
-    // Write your binary search implementation here
-    // Return the index of target, or -1 if not found
-}""",
-                    "python": """def solution(nums, target):
-    # Write your binary search implementation here
-    # Return the index of target, or -1 if not found
-    pass""",
-                    "java": """public static int solution(int[] nums, int target) {
-    // Write your binary search implementation here
-    // Return the index of target, or -1 if not found
-    return -1;
-}""",
-                    "cpp": """int solution(vector<int>& nums, int target) {
-    // Write your binary search implementation here
-    // Return the index of target, or -1 if not found
-    return -1;
-}"""
-                },
-                "test_cases": [
-                    {
-                        "input": [[-1, 0, 3, 5, 9, 12], 9],
-                        "expected": 4,
-                        "description": "Target found in array"
-                    },
-                    {
-                        "input": [[-1, 0, 3, 5, 9, 12], 2],
-                        "expected": -1,
-                        "description": "Target not in array"
-                    },
-                    {
-                        "input": [[5], 5],
-                        "expected": 0,
-                        "description": "Single element array - found"
-                    },
-                    {
-                        "input": [[5], -5],
-                        "expected": -1,
-                        "description": "Single element array - not found"
-                    },
-                    {
-                        "input": [[1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 1],
-                        "expected": 0,
-                        "description": "Target at beginning"
-                    },
-                    {
-                        "input": [[1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 10],
-                        "expected": 9,
-                        "description": "Target at end"
-                    }
-                ]
-            },
-            "palindrome": {
-                "id": "palindrome",
-                "title": "Valid Palindrome",
-                "difficulty": "Easy",
-                "description": """A phrase is a palindrome if, after converting all uppercase letters into lowercase letters and removing all non-alphanumeric characters, it reads the same forward and backward. Alphanumeric characters include letters and numbers.
-
-Given a string `s`, return `true` if it is a palindrome, or `false` otherwise.
+from .checkers import DEFAULT_CHECKER, Checker
 
-**Example:**
-```
-Input: s = "A man, a plan, a canal: Panama"
-Output: true
-Explanation: "amanaplanacanalpanama" is a palindrome.
-```
+# Columns of their own; everything else about a problem is kept as JSON
+INDEXED_FIELDS = ('id', 'title', 'difficulty')
 
-**Constraints:**
-- 1 ≤ s.length ≤ 2 * 10⁵
-- s consists only of printable ASCII characters.""",
-                "starter_code": {
-                    "javascript": """function solution(s) {
-    // Write your code here
-    // Return true if s is a palindrome, false otherwise
-}""",
-                    "python": """def solution(s):
-    # Write your code here
-    # Return True if s is a palindrome, False otherwise
-    pass""",
-                    "java": """public static boolean solution(String s) {
-    // Write your code here
-    // Return true if s is a palindrome, false otherwise
-    return false;
-}""",
-                    "cpp": """bool solution(string s) {
-    // Write your code here
-    // Return true if s is a palindrome, false otherwise
-    return false;
-}"""
-                },
-                "test_cases": [
-                    {
-                        "input": ["A man, a plan, a canal: Panama"],
-                        "expected": True,
-                        "description": "Classic palindrome with spaces and punctuation"
-                    },
-                    {
-                        "input": ["race a car"],
-                        "expected": False,
-                        "description": "Not a palindrome"
-                    },
-                    {
-                        "input": [" "],
-                        "expected": True,
-                        "description": "Single space (empty after cleaning)"
-                    },
-                    {
-                        "input": ["Madam"],
-                        "expected": True,
-                        "description": "Simple palindrome with capitals"
-                    },
-                    {
-                        "input": ["No 'x' in Nixon"],
-                        "expected": True,
-                        "description": "Complex palindrome with quotes"
-                    }
-                ]
-            },
-            "fibonacci": {
-                "id": "fibonacci",
-                "title": "Fibonacci Number",
-                "difficulty": "Easy",
-                "description": """The Fibonacci numbers, commonly denoted F(n) form a sequence, called the Fibonacci sequence, such that each number is the sum of the two preceding ones, starting from 0 and 1. That is,
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS problems (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 1,
+    test_set_version TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS problems_by_difficulty ON problems (difficulty, position);
+CREATE INDEX IF NOT EXISTS problems_by_position ON problems (position);
+CREATE TABLE IF NOT EXISTS problem_tags (
+    tag TEXT NOT NULL,
+    problem_id TEXT NOT NULL REFERENCES problems (id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, problem_id)
+);
+CREATE INDEX IF NOT EXISTS problem_tags_by_problem ON problem_tags (problem_id);
+CREATE TABLE IF NOT EXISTS test_cases (
+    problem_id TEXT PRIMARY KEY REFERENCES problems (id) ON DELETE CASCADE,
+    blob BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
 
-F(0) = 0, F(1) = 1
-F(n) = F(n - 1) + F(n - 2), for n > 1.
 
-Given n, calculate F(n).
+def default_data_dir() -> str:
+    """``EVALEDGE_DATA_DIR``, else ``evaledge`` under the XDG data home; never the package itself"""
+    return os.environ.get('EVALEDGE_DATA_DIR') or os.path.join(
+        os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share'),
+        'evaledge'
+    )
 
-**Example:**
-```
-Input: n = 2
-Output: 1
-Explanation: F(2) = F(1) + F(0) = 1 + 0 = 1.
-```
 
-**Constraints:**
-- 0 ≤ n ≤ 30""",
-                "starter_code": {
-                    "javascript": """function solution(n) {
-    // Write your code here
-    // Return the nth Fibonacci number
-}""",
-                    "python": """def solution(n):
-    # Write your code here
-    # Return the nth Fibonacci number
-    pass""",
-                    "java": """public static int solution(int n) {
-    // Write your code here
-    // Return the nth Fibonacci number
-    return 0;
-}""",
-                    "cpp": """int solution(int n) {
-    // Write your code here
-    // Return the nth Fibonacci number
-    return 0;
-}"""
-                },
-                "test_cases": [
-                    {
-                        "input": [0],
-                        "expected": 0,
-                        "description": "Base case: F(0) = 0"
-                    },
-                    {
-                        "input": [1],
-                        "expected": 1,
-                        "description": "Base case: F(1) = 1"
-                    },
-                    {
-                        "input": [2],
-                        "expected": 1,
-                        "description": "F(2) = F(1) + F(0) = 1"
-                    },
-                    {
-                        "input": [3],
-                        "expected": 2,
-                        "description": "F(3) = F(2) + F(1) = 2"
-                    },
-                    {
-                        "input": [4],
-                        "expected": 3,
-                        "description": "F(4) = F(3) + F(2) = 3"
-                    },
-                    {
-                        "input": [10],
-                        "expected": 55,
-                        "description": "Larger test case"
-                    }
-                ]
-            },
-            "reverse_string": {
-                "id": "reverse_string",
-                "title": "Reverse String",
-                "difficulty": "Easy",
-                "description": """Write a function that reverses a string. The input string is given as an array of characters `s`.
+def default_store_path() -> str:
+    return os.environ.get('EVALEDGE_PROBLEMS_DB') or os.path.join(default_data_dir(), 'problems.sqlite3')
 
-You must do this by modifying the input array in-place with O(1) extra memory.
 
-**Example:**
-```
-Input: s = ["h","e","l","l","o"]
-Output: ["o","l","l","e","h"]
-```
+class ProblemsDatabase:
+    """Problem bank stored in SQLite.
+    
+    Problem metadata is indexed by id, difficulty and tag; test cases are
+    kept as compressed blobs in a table of their own and only loaded when a
+    problem's tests are asked for. Both are cached per process in bounded
+    LRUs, and the database file is memory-mapped, so processes sharing it
+    share its pages instead of each holding a copy of the whole bank.
+    
+    Changes made by other processes (another Flask worker, an import
+    script) are picked up without a restart: at most every
+    ``reload_interval`` seconds the store checks whether the file changed,
+    and drops (and reports to change listeners) the problems whose revision
+    moved. The built-in problems are written whenever the store has not
+    seen the current ``SEED_VERSION`` yet, replacing older copies of them
+    and leaving every other problem alone.
+    """
+    
+    def __init__(self, path: Optional[str] = None, reload_interval: float = 1.0,
+                 max_cached_problems: int = 256, max_cached_test_bytes: int = 32 * 1024 * 1024):
+        self.path = path or default_store_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+        self.reload_interval = reload_interval
+        self.max_cached_problems = max_cached_problems
+        self.max_cached_test_bytes = max_cached_test_bytes
+        self._change_listeners = []
+        self._checkers = {}
+        self._problems = OrderedDict()  # id -> metadata without test cases
+        self._test_cases = OrderedDict()  # id -> (test cases, compressed size)
+        self._test_bytes = 0
+        self._lock = threading.RLock()
+        
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA foreign_keys=ON')
+        self._db.execute('PRAGMA mmap_size=268435456')
+        self._db.executescript(SCHEMA)
+        self._seed()
+        self._revisions = dict(self._db.execute('SELECT id, revision FROM problems'))
+        self._data_version = self._get_data_version()
+        self._checked_at = time.monotonic()
+    
+    def _seed(self):
+        from .seed_problems import SEED_PROBLEMS, SEED_VERSION
+        
+        def write():
+            # Checked inside the transaction so concurrent workers seed only once
+            row = self._db.execute("SELECT value FROM store_meta WHERE key = 'seed_version'").fetchone()
+            if row is not None and int(row[0]) >= SEED_VERSION:
+                return
+            for problem in SEED_PROBLEMS.values():
+                self._write_problem(problem)
+            self._db.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('seed_version', ?)",
+                             (str(SEED_VERSION),))
+        self._transaction(write)
+    
+    def _transaction(self, write: Callable[[], None]):
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                write()
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+    
+    def _get_data_version(self) -> int:
+        return self._db.execute('PRAGMA data_version').fetchone()[0]
+    
+    def _maybe_reload(self):
+        """Forget problems another process changed since we last looked"""
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            data_version = self._get_data_version()
+            if data_version == self._data_version:
+                return
+            self._data_version = data_version
+            revisions = dict(self._db.execute('SELECT id, revision FROM problems'))
+            changed = [
+                problem_id for problem_id in set(revisions) | set(self._revisions)
+                if revisions.get(problem_id) != self._revisions.get(problem_id)
+            ]
+            self._revisions = revisions
+            for problem_id in changed:
+                self._forget(problem_id)
+        for problem_id in changed:
+            self._notify_change(problem_id)
+    
+    def check_for_changes(self):
+        """Pick up changes other processes made to the file, notifying change listeners.
 
-**Constraints:**
-- 1 ≤ s.length ≤ 10⁵
-- s[i] is a printable ascii character.""",
-                "starter_code": {
-                    "javascript": """function solution(s) {
-    // Write your code here
-    // Modify the array in-place and return it
-}""",
-                    "python": """def solution(s):
-    # Write your code here
-    # Modify the list in-place and return it
-    pass""",
-                    "java": """public static char[] solution(char[] s) {
-    // Write your code here
-    // Modify the array in-place and return it
-    return s;
-}""",
-                    "cpp": """vector<char> solution(vector<char>& s) {
-    // Write your code here
-    // Modify the vector in-place and return it
-    return s;
-}"""
-                },
-                "test_cases": [
-                    {
-                        "input": [["h", "e", "l", "l", "o"]],
-                        "expected": ["o", "l", "l", "e", "h"],
-                        "description": "Basic string reversal"
-                    },
-                    {
-                        "input": [["H", "a", "n", "n", "a", "h"]],
-                        "expected": ["h", "a", "n", "n", "a", "H"],
-                        "description": "Palindrome with capitals"
-                    },
-                    {
-                        "input": [["A"]],
-                        "expected": ["A"],
-                        "description": "Single character"
-                    },
-                    {
-                        "input": [["a", "b"]],
-                        "expected": ["b", "a"],
-                        "description": "Two characters"
-                    }
-                ]
-            }
-        }
+        Callers that cache what they read from the store (see ProblemListing)
+        call this before serving from their cache; it is rate-limited by
+        ``reload_interval`` like every other read.
+        """
+        self._maybe_reload()
+    
+    def _forget(self, problem_id: str):
+        self._problems.pop(problem_id, None)
+        self._checkers.pop(problem_id, None)
+        cached = self._test_cases.pop(problem_id, None)
+        if cached:
+            self._test_bytes -= cached[1]
+    
+    def _compute_test_set_version(self, test_cases: List[Dict[str, Any]], checker: Optional[Dict[str, Any]]) -> str:
+        payload = json.dumps([test_cases, checker], sort_keys=True).encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+    
+    def _write_problem(self, problem: Dict[str, Any]):
+        """Insert or replace a problem; the caller holds the lock and a transaction"""
+        test_cases = problem.get('test_cases', [])
+        data = {key: value for key, value in problem.items()
+                if key not in INDEXED_FIELDS and key not in ('test_cases', 'sample_test_cases')}
+        # Samples are public, so they travel with the metadata and listing
+        # problems never has to open a test blob
+        data['sample_test_cases'] = [tc for tc in test_cases if tc.get('sample')] or test_cases[:1]
+        existing = self._db.execute(
+            'SELECT position, revision FROM problems WHERE id = ?', (problem['id'],)
+        ).fetchone()
+        if existing:
+            position, revision = existing[0], existing[1] + 1
+        else:
+            position = self._db.execute('SELECT COALESCE(MAX(position), -1) + 1 FROM problems').fetchone()[0]
+            revision = 1
+        self._db.execute(
+            'INSERT OR REPLACE INTO problems (id, title, difficulty, position, revision, test_set_version, data) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (problem['id'], problem['title'], problem['difficulty'], position, revision,
+             self._compute_test_set_version(test_cases, problem.get('checker')), json.dumps(data))
+        )
+        self._db.execute('DELETE FROM problem_tags WHERE problem_id = ?', (problem['id'],))
+        self._db.executemany('INSERT INTO problem_tags (tag, problem_id) VALUES (?, ?)',
+                             [(tag, problem['id']) for tag in problem.get('tags', [])])
+        self._db.execute('INSERT OR REPLACE INTO test_cases (problem_id, blob) VALUES (?, ?)',
+                         (problem['id'], zlib.compress(json.dumps(test_cases).encode('utf-8'))))
+    
+    def _load_metadata(self, problem_id: str) -> Optional[Dict[str, Any]]:
+        """A problem without its test cases, through the LRU"""
+        self._maybe_reload()
+        with self._lock:
+            if problem_id in self._problems:
+                self._problems.move_to_end(problem_id)
+                return self._problems[problem_id]
+            row = self._db.execute(
+                'SELECT id, title, difficulty, data FROM problems WHERE id = ?', (problem_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            problem = dict(id=row[0], title=row[1], difficulty=row[2], **json.loads(row[3]))
+            self._problems[problem_id] = problem
+            if len(self._problems) > self.max_cached_problems:
+                self._problems.popitem(last=False)
+            return problem
+    
+    def _query_ids(self, sql: str, params: tuple = ()) -> List[str]:
+        self._maybe_reload()
+        with self._lock:
+            return [row[0] for row in self._db.execute(sql, params)]
     
     def get_problem(self, problem_id: str) -> Dict[str, Any]:
         """Get a specific problem by ID"""
-        return self.problems.get(problem_id)
+        problem = self._load_metadata(problem_id)
+        if problem is None:
+            return None
+        return dict(problem, test_cases=self.get_test_cases(problem_id))
     
     def get_all_problems(self) -> List[Dict[str, Any]]:
         """Get all problems"""
-        return list(self.problems.values())
+        return [self.get_problem(problem_id)
+                for problem_id in self._query_ids('SELECT id FROM problems ORDER BY position')]
     
     def get_problems_by_difficulty(self, difficulty: str) -> List[Dict[str, Any]]:
         """Get problems filtered by difficulty"""
-        return [p for p in self.problems.values() if p['difficulty'] == difficulty]
+        return [self.get_problem(problem_id) for problem_id in self._query_ids(
+            'SELECT id FROM problems WHERE difficulty = ? ORDER BY position', (difficulty,)
+        )]
+    
+    def get_problems_by_tag(self, tag: str) -> List[Dict[str, Any]]:
+        """Get problems carrying a tag"""
+        return [self.get_problem(problem_id) for problem_id in self._query_ids(
+            'SELECT p.id FROM problem_tags t JOIN problems p ON p.id = t.problem_id '
+            'WHERE t.tag = ? ORDER BY p.position', (tag,)
+        )]
+    
+    def list_problems(self, difficulty: Optional[str] = None, tag: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get problems without their test cases, optionally filtered; no test blob is loaded"""
+        sql, params = 'SELECT p.id FROM problems p', []
+        if tag is not None:
+            sql += ' JOIN problem_tags t ON t.problem_id = p.id AND t.tag = ?'
+            params.append(tag)
+        if difficulty is not None:
+            sql += ' WHERE p.difficulty = ?'
+            params.append(difficulty)
+        sql += ' ORDER BY p.position'
+        problems = (self._load_metadata(problem_id) for problem_id in self._query_ids(sql, tuple(params)))
+        return [dict(problem) for problem in problems if problem is not None]
     
     def get_test_cases(self, problem_id: str) -> List[Dict[str, Any]]:
         """Get test cases for a specific problem"""
-        problem = self.get_problem(problem_id)
-        return problem['test_cases'] if problem else []
+        self._maybe_reload()
+        with self._lock:
+            if problem_id in self._test_cases:
+                self._test_cases.move_to_end(problem_id)
+                return self._test_cases[problem_id][0]
+            row = self._db.execute('SELECT blob FROM test_cases WHERE problem_id = ?', (problem_id,)).fetchone()
+            if row is None:
+                return []
+            test_cases = json.loads(zlib.decompress(row[0]))
+            size = len(row[0])
+            self._test_cases[problem_id] = (test_cases, size)
+            self._test_bytes += size
+            # Always keep the newest entry, however large
+            while self._test_bytes > self.max_cached_test_bytes and len(self._test_cases) > 1:
+                _, (_, evicted_size) = self._test_cases.popitem(last=False)
+                self._test_bytes -= evicted_size
+            return test_cases
+    
+    def get_sample_test_cases(self, problem_id: str) -> List[Dict[str, Any]]:
+        """Get the test cases candidates may see: those marked ``sample``, or else the first one"""
+        problem = self._load_metadata(problem_id)
+        if problem is None:
+            return []
+        if 'sample_test_cases' in problem:
+            return problem['sample_test_cases']
+        test_cases = self.get_test_cases(problem_id)
+        return [tc for tc in test_cases if tc.get('sample')] or test_cases[:1]
     
     def get_starter_code(self, problem_id: str, language: str) -> str:
         """Get starter code for a specific problem and language"""
-        problem = self.get_problem(problem_id)
+        problem = self._load_metadata(problem_id)
         if problem and 'starter_code' in problem:
             return problem['starter_code'].get(language, '')
         return ''
+    
+    def public_view(self, problem: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a problem without grading internals (reference solutions, custom
+        checkers) and with only its sample test cases"""
+        view = {key: value for key, value in problem.items()
+                if key not in ('performance', 'checker', 'test_cases', 'sample_test_cases')}
+        view['test_cases'] = self.get_sample_test_cases(problem['id'])
+        return view
+    
+    def get_checker(self, problem_id: str) -> Checker:
+        """Get the output checker of a problem, built on first use"""
+        problem = self._load_metadata(problem_id)
+        with self._lock:
+            if problem_id not in self._checkers:
+                spec = problem.get('checker') if problem else None
+                self._checkers[problem_id] = Checker(spec) if spec else DEFAULT_CHECKER
+            return self._checkers[problem_id]
+    
+    def get_test_set_version(self, problem_id: str) -> str:
+        """Get a hash identifying the current test cases and checker of a problem"""
+        self._maybe_reload()
+        with self._lock:
+            row = self._db.execute(
+                'SELECT test_set_version FROM problems WHERE id = ?', (problem_id,)
+            ).fetchone()
+        return row[0] if row else self._compute_test_set_version([], None)
+    
+    def add_problem(self, problem: Dict[str, Any]):
+        """Add a problem, or replace the one with the same id, and notify change listeners"""
+        if problem.get('checker'):
+            Checker(problem['checker'])  # Reject an invalid spec before storing it
+        self._update(problem['id'], lambda: self._write_problem(problem))
+    
+    def set_test_cases(self, problem_id: str, test_cases: List[Dict[str, Any]]):
+        """Replace the test cases of a problem and notify change listeners"""
+        self._update(problem_id, lambda: self._write_problem(
+            dict(self._load_metadata(problem_id), test_cases=test_cases)
+        ))
+    
+    def set_checker(self, problem_id: str, spec: Dict[str, Any]):
+        """Replace the checker spec of a problem and notify change listeners.
+        
+        The spec is built right away, so an invalid one raises CheckerError
+        and leaves the problem unchanged.
+        """
+        Checker(spec)
+        self._update(problem_id, lambda: self._write_problem(
+            dict(self.get_problem(problem_id), checker=spec)
+        ))
+    
+    def _update(self, problem_id: str, write: Callable[[], None]):
+        with self._lock:
+            self._transaction(write)
+            row = self._db.execute('SELECT revision FROM problems WHERE id = ?', (problem_id,)).fetchone()
+            self._revisions[problem_id] = row[0] if row else None
+            # Our own commits do not move data_version; nothing to reload for them
+            self._forget(problem_id)
+        self._notify_change(problem_id)
+    
+    def _notify_change(self, problem_id: str):
+        for listener in self._change_listeners:
+            listener(problem_id)
+    
+    def add_change_listener(self, listener: Callable[[str], None]):
+        """Register a callback invoked with the problem id when it changes, here or in another process"""
+        self._change_listeners.append(listener)
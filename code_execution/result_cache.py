@@ -0,0 +1,74 @@
+# Memoized execution results for repeated identical submissions
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+
+
+class ResultCache:
+    """LRU cache of execute_code results with a time-to-live.
+
+    Keys combine a hash of the exact source, the language, the problem
+    id and a version hash of the test cases that were run, so a change to a
+    problem's tests never serves a stale result. ``invalidate_problem`` drops
+    a problem's entries early; ProblemsDatabase calls it through its change
+    listeners.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (stored_at, result)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def test_set_version(test_cases: List[Dict]) -> str:
+        payload = json.dumps(test_cases, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    def key(self, code: str, language: str, problem_id: str, test_set_version: str) -> tuple:
+        # The exact source: whitespace can be part of a string literal's value
+        source_hash = hashlib.sha256(code.encode('utf-8')).hexdigest()
+        return (problem_id, language, source_hash, test_set_version)
+
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, result: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_problem(self, problem_id: str):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == problem_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,84 @@
+# Early termination of a submission's remaining test cases
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# When to stop running a submission's remaining test cases
+FAIL_FAST_ALL = 'all'                # run every case
+FAIL_FAST_FIRST_FAIL = 'first_fail'  # stop after the first failed case
+FAIL_FAST_FIRST_TLE = 'first_tle'    # stop after the first case that runs out of time
+FAIL_FAST_POLICIES = (FAIL_FAST_ALL, FAIL_FAST_FIRST_FAIL, FAIL_FAST_FIRST_TLE)
+
+TIME_LIMIT_ERRORS = ('Time Limit Exceeded', 'CPU Time Limit Exceeded')
+BUDGET_EXCEEDED = 'Submission Time Budget Exceeded'
+
+
+class RunControl:
+    """Decides when the remaining test cases of one submission are cancelled.
+
+    Every result is passed to ``observe``; once it matches the fail-fast
+    policy, the submission has used up ``time_budget`` seconds of wall time
+    since ``start``, or ``stop`` is called (e.g. when a streaming client
+    goes away), ``stopped`` turns true and the chunks running in parallel
+    stop at their next case. Cases that never ran are reported as skipped.
+    """
+
+    def __init__(self, policy: str = FAIL_FAST_ALL, time_budget: Optional[float] = None):
+        if policy not in FAIL_FAST_POLICIES:
+            raise ValueError(f'Unknown fail-fast policy: {policy}')
+        self.policy = policy
+        self.time_budget = time_budget
+        self.deadline = None
+        self.reason = None
+        self._stop = threading.Event()
+
+    def start(self, max_budget: Optional[float] = None):
+        """Start the budget clock, capped at ``max_budget`` seconds if given"""
+        budgets = [budget for budget in (self.time_budget, max_budget) if budget]
+        if budgets:
+            self.deadline = time.monotonic() + min(budgets)
+
+    def observe(self, result: Dict[str, Any]):
+        if result.get('passed') or result.get('skipped'):
+            return
+        if self.policy == FAIL_FAST_FIRST_FAIL:
+            self.stop('Stopped after the first failed test case')
+        elif self.policy == FAIL_FAST_FIRST_TLE and result.get('error') in TIME_LIMIT_ERRORS:
+            self.stop('Stopped after the first test case over the time limit')
+
+    def stop(self, reason: str):
+        if not self._stop.is_set():
+            self.reason = reason
+            self._stop.set()
+
+    def stopped(self) -> bool:
+        if not self._stop.is_set() and self.remaining() == 0:
+            self.stop(BUDGET_EXCEEDED)
+        return self._stop.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the time budget, or None without a budget"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def wait_time(self, timeout: float) -> float:
+        """How long to wait for a result: the case's time limit, cut short by the budget"""
+        remaining = self.remaining()
+        return timeout if remaining is None else min(timeout, remaining)
+
+
+class RunOptionsError(ValueError):
+    """Raised for fail-fast options a request cannot use"""
+
+
+def parse_run_options(data: Dict[str, Any]) -> Tuple[str, Optional[float]]:
+    """The ``fail_fast`` policy and ``time_budget`` seconds of a request body"""
+    fail_fast = data.get('fail_fast', FAIL_FAST_ALL)
+    if fail_fast not in FAIL_FAST_POLICIES:
+        raise RunOptionsError(f'fail_fast must be one of: {", ".join(FAIL_FAST_POLICIES)}')
+    time_budget = data.get('time_budget')
+    if time_budget is not None and (
+            isinstance(time_budget, bool) or not isinstance(time_budget, (int, float)) or time_budget <= 0):
+        raise RunOptionsError('time_budget must be a positive number of seconds')
+    return fail_fast, time_budget
@@ -0,0 +1,366 @@
+# Recycled working directories and process isolation for submissions
+import atexit
+import errno
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import warnings
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .limits import ResourceLimits
+
+try:
+    import ctypes
+    _libc = ctypes.CDLL(None, use_errno=True)
+except (ImportError, OSError):  # Windows or no libc: no namespaces
+    ctypes = None
+    _libc = None
+
+try:
+    import seccomp
+except ImportError:
+    try:
+        import pyseccomp as seccomp
+    except ImportError:  # libseccomp bindings are optional
+        seccomp = None
+
+CLONE_NEWNS = 0x00020000
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+
+MS_NOSUID = 0x2
+MS_NODEV = 0x4
+MS_BIND = 0x1000
+MS_REC = 0x4000
+MS_PRIVATE = 0x40000
+
+# System calls submissions never need; they fail with EPERM when seccomp is available
+DENIED_SYSCALLS = [
+    'ptrace', 'process_vm_readv', 'process_vm_writev', 'socket', 'socketpair',
+    'mount', 'umount2', 'pivot_root', 'chroot', 'setns', 'unshare',
+    'bpf', 'perf_event_open', 'keyctl', 'add_key', 'request_key',
+    'kexec_load', 'init_module', 'finit_module', 'delete_module', 'reboot', 'swapon', 'swapoff'
+]
+
+
+def _libc_call(name: str, *args):
+    if _libc is None or getattr(_libc, name)(*args) != 0:
+        error = ctypes.get_errno() if ctypes else 0
+        raise OSError(error, f'{name} failed: {os.strerror(error)}')
+
+
+def _unshare(flags: int):
+    if hasattr(os, 'unshare'):  # Python 3.12+
+        os.unshare(flags)
+        return
+    _libc_call('unshare', flags)
+
+
+def _mount(source: Optional[str], target: str, fstype: Optional[str], flags: int, data: Optional[str] = None):
+    def encode(value):
+        return value.encode() if value is not None else None
+    _libc_call('mount', encode(source), encode(target), encode(fstype), ctypes.c_ulong(flags), encode(data))
+
+
+def _map_own_ids(uid: int, gid: int):
+    """Keep our uid and gid inside a fresh user namespace instead of 'nobody'"""
+    for name, content in (('setgroups', 'deny'), ('uid_map', f'{uid} {uid} 1'), ('gid_map', f'{gid} {gid} 1')):
+        with open(f'/proc/self/{name}', 'w') as f:
+            f.write(content)
+
+
+def _drop_capabilities():
+    """Give up the capabilities a user namespace grants, so mounts stay in place"""
+    header = (ctypes.c_uint32 * 2)(0x20080522, 0)  # _LINUX_CAPABILITY_VERSION_3, this process
+    data = (ctypes.c_uint32 * 6)()
+    _libc_call('capset', header, data)
+
+
+def _hide_paths(hidden: Sequence[str]):
+    """Cover ``hidden`` with empty tmpfs mounts, except the working directory.
+
+    Every submission's working directory lives under the sandbox root, next
+    to the slots of concurrent submissions; shared caches hold other
+    candidates' programs. Only the caller's own slot is mounted back.
+    """
+    workdir = os.getcwd()
+    workdir_fd = os.open('.', os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        _mount(None, '/', None, MS_REC | MS_PRIVATE)
+        for path in hidden:
+            if os.path.isdir(path):
+                _mount('tmpfs', path, 'tmpfs', MS_NOSUID | MS_NODEV, 'mode=0755,size=64k')
+        if any(workdir == path or workdir.startswith(path.rstrip('/') + '/') for path in hidden):
+            os.makedirs(workdir, exist_ok=True)
+            _mount(f'/proc/self/fd/{workdir_fd}', workdir, None, MS_BIND | MS_REC)
+    finally:
+        os.close(workdir_fd)
+    os.chdir(workdir)
+
+
+def apply_seccomp():
+    """Make DENIED_SYSCALLS fail with EPERM for this process and its children"""
+    if seccomp is None:
+        return
+    syscall_filter = seccomp.SyscallFilter(defaction=seccomp.ALLOW)
+    for name in DENIED_SYSCALLS:
+        try:
+            syscall_filter.add_rule(seccomp.ERRNO(errno.EPERM), name)
+        except (RuntimeError, ValueError, OSError):
+            pass  # Not a system call on this architecture
+    syscall_filter.load()
+
+
+def isolate(unshare_flags: int = 0, uid: Optional[int] = None, gid: Optional[int] = None,
+            apply_limits: Optional[Callable[[], None]] = None, hidden: Sequence[str] = ()):
+    """Detach the calling process into a sandbox; run in the child, in its
+    working directory, before user code.
+
+    With CLONE_NEWNS in ``unshare_flags`` the ``hidden`` directories are
+    covered up (see ``_hide_paths``). The seccomp filter comes last, once
+    nothing is left that needs the system calls it denies.
+    """
+    host_uid, host_gid = os.getuid(), os.getgid()
+    os.setsid()
+    if unshare_flags:
+        _unshare(unshare_flags)
+        if unshare_flags & CLONE_NEWUSER:
+            _map_own_ids(host_uid, host_gid)
+        if unshare_flags & CLONE_NEWNS:
+            _hide_paths(hidden)
+        if unshare_flags & CLONE_NEWUSER:
+            _drop_capabilities()
+    os.umask(0o077)
+    if apply_limits:
+        apply_limits()
+    if uid is not None:
+        os.setgroups([])
+        os.setgid(gid)
+        os.setuid(uid)
+    apply_seccomp()
+
+
+def parse_uid_range(spec: Optional[str]) -> Optional[range]:
+    """``first-last`` (inclusive) as a range of uids; None for an empty spec"""
+    if not spec:
+        return None
+    first, _, last = spec.partition('-')
+    uids = range(int(first), int(last or first) + 1)
+    if not uids or uids.start < 1:
+        raise ValueError(f'Invalid uid range: {spec}')
+    return uids
+
+
+def kill_process_group(process: subprocess.Popen):
+    """Kill a sandboxed process together with anything it started"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, OSError):
+        process.kill()
+
+
+class SandboxManager:
+    """Working directories and an isolation profile shared by all submissions.
+
+    Directories live on tmpfs (``/dev/shm``) when available and are recycled:
+    ``acquire`` hands out an emptied directory from the free list, creating one
+    only when the list is empty, and ``release`` wipes what the submission
+    left behind and keeps up to ``max_idle`` directories for reuse.
+
+    The isolation profile is probed once at start-up: every sandboxed process
+    gets its own session (so a timeout kills its whole process group), a
+    private umask, a seccomp filter when libseccomp bindings are installed
+    and, where the kernel allows it, an empty network namespace and a mount
+    namespace in which the sandbox root and every path passed to ``hide``
+    are empty except for the process's own working directory.
+
+    ``user`` is required when the host runs as root: it names the
+    unprivileged account submissions are switched to, since a submission
+    running as root could undo its mounts and read anything. ``uids``, when
+    the host runs as root, gives every working directory a uid of its own
+    from that range instead, so per-user limits (RLIMIT_NPROC) count one
+    submission and not every process of the server; directories created
+    when the range is used up fall back to ``user``. Without root,
+    submissions keep the host's uid inside a user namespace of their own.
+
+    A uid shared by several directories (or with the host) makes
+    RLIMIT_NPROC a cap on all of them together, so ``slot_limits`` leaves it
+    out for such directories.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_idle: int = 32, isolate_network: bool = True,
+                 user: Optional[str] = None, isolate_filesystem: bool = True,
+                 uids: Optional[Sequence[int]] = None):
+        if root is None:
+            base = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) \
+                else tempfile.gettempdir()
+            root = tempfile.mkdtemp(prefix='evaledge_sandbox_', dir=base)
+            # tmpfs is memory: do not leave our directories behind
+            atexit.register(shutil.rmtree, root, True)
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+        self.max_idle = max_idle
+        self._free: List[str] = []
+        self._lock = threading.Lock()
+        self._created = 0
+
+        self._hidden = [self.root]
+
+        self._uid = self._gid = None
+        self._free_uids: List[int] = []
+        self._slot_ids: Dict[str, Tuple[int, int]] = {}
+        if hasattr(os, 'geteuid') and os.geteuid() == 0:
+            if user is None:
+                warnings.warn('Running as root without a sandbox user: submissions run as root',
+                              RuntimeWarning, stacklevel=2)
+            else:
+                import pwd
+                entry = pwd.getpwnam(user)
+                self._uid, self._gid = entry.pw_uid, entry.pw_gid
+            # Popped from the end, so the lowest uids go first
+            self._free_uids = sorted(uids or (), reverse=True)
+            if self._uid is not None or self._free_uids:
+                # Traversable, not listable, for sandbox users to reach their slots
+                os.chmod(self.root, 0o711)
+
+        self._unshare_flags = self._probe_unshare(isolate_network, isolate_filesystem)
+
+        for _ in range(max_idle):
+            self._free.append(self._new_dir())
+
+    def _probe_unshare(self, isolate_network: bool, isolate_filesystem: bool) -> int:
+        """Find namespace flags this host lets us use, trying once at start-up"""
+        wanted = (CLONE_NEWNET if isolate_network else 0) | (CLONE_NEWNS if isolate_filesystem else 0)
+        if not wanted or _libc is None:
+            return 0
+        # Most isolation first; unprivileged processes may create namespaces
+        # inside a user namespace of their own
+        candidates = [wanted, wanted & CLONE_NEWNS, wanted & CLONE_NEWNET]
+        if os.geteuid() != 0:
+            candidates = [CLONE_NEWUSER | flags for flags in candidates]
+        for flags in dict.fromkeys(flag for flag in candidates if flag & ~CLONE_NEWUSER):
+            try:
+                subprocess.run(
+                    [sys.executable, '-c', 'pass'],
+                    preexec_fn=lambda: isolate(flags, hidden=[self.root]),
+                    cwd=self.root,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    timeout=10,
+                    check=True
+                )
+                return flags
+            except (OSError, subprocess.SubprocessError):
+                continue
+        return 0
+
+    def hide(self, path: str):
+        """Keep ``path`` out of sight of sandboxed processes, e.g. a shared cache"""
+        if path not in self._hidden:
+            self._hidden.append(path)
+
+    def _new_dir(self) -> str:
+        with self._lock:
+            self._created += 1
+            index = self._created
+        path = os.path.join(self.root, f'slot-{index}')
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        with self._lock:
+            if self._free_uids:
+                uid = self._free_uids.pop()
+                self._slot_ids[path] = (uid, uid)
+        uid, gid = self._slot_ids.get(path, (self._uid, self._gid))
+        if uid is not None:
+            os.chown(path, uid, gid)
+        return path
+
+    def _retire(self, path: str):
+        """Delete a working directory for good and free its uid"""
+        shutil.rmtree(path, ignore_errors=True)
+        with self._lock:
+            ids = self._slot_ids.pop(path, None)
+            if ids is not None:
+                self._free_uids.append(ids[0])
+
+    def acquire(self) -> str:
+        """Take an empty working directory"""
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+        return self._new_dir()
+
+    def wipe(self, path: str) -> bool:
+        """Remove everything inside a working directory; False if that failed"""
+        try:
+            for entry in os.scandir(path):
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+        except OSError:
+            return False
+        return True
+
+    def release(self, path: str):
+        """Wipe a working directory and keep it for reuse"""
+        if not self.wipe(path):
+            # Something the submission left cannot be removed; retire the slot
+            self._retire(path)
+            return
+        with self._lock:
+            if len(self._free) < self.max_idle:
+                self._free.append(path)
+                return
+        self._retire(path)
+
+    @contextmanager
+    def workspace(self):
+        path = self.acquire()
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    def preexec_fn(self, limits: ResourceLimits, test_count: Optional[int] = 1,
+                   path: Optional[str] = None) -> Optional[Callable[[], None]]:
+        """Function for Popen that isolates a child working in ``path`` and applies ``limits``"""
+        apply_limits = self.slot_limits(path, limits).preexec_fn(test_count)
+        if not hasattr(os, 'setsid'):
+            return apply_limits
+        unshare_flags, uid, gid, hidden = self.isolation(path)
+
+        def apply():
+            isolate(unshare_flags, uid, gid, apply_limits, hidden)
+        return apply
+
+    def isolation(self, path: Optional[str] = None) -> Tuple[int, Optional[int], Optional[int], List[str]]:
+        """Namespace flags, uid, gid and hidden paths for ``isolate`` in working directory ``path``"""
+        uid, gid = self._slot_ids.get(path, (self._uid, self._gid))
+        return self._unshare_flags, uid, gid, list(self._hidden)
+
+    def slot_limits(self, path: Optional[str], limits: ResourceLimits) -> ResourceLimits:
+        """``limits`` without RLIMIT_NPROC unless ``path`` has a uid of its own"""
+        if limits.max_processes and path not in self._slot_ids:
+            return limits._replace(max_processes=None)
+        return limits
+
+    def profile(self) -> dict:
+        return {
+            'root': self.root,
+            'network_isolated': bool(self._unshare_flags & CLONE_NEWNET),
+            'filesystem_isolated': bool(self._unshare_flags & CLONE_NEWNS),
+            'user_namespace': bool(self._unshare_flags & CLONE_NEWUSER),
+            'seccomp': seccomp is not None,
+            'hidden': list(self._hidden),
+            'uid': self._uid,
+            'slot_uids': len(self._slot_ids) + len(self._free_uids),
+            'idle_dirs': len(self._free)
+        }
+
+    def shutdown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
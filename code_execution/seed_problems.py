@@ -0,0 +1,438 @@
+# Built-in problems, written into the problem store on start
+from typing import Any, Dict
+
+# Bump whenever a problem below changes; stores that have seen an older
+# version get every built-in problem rewritten on their next start
+SEED_VERSION = 1
+
+SEED_PROBLEMS: Dict[str, Dict[str, Any]] = {
+    "two_sum": {
+        "id": "two_sum",
+        "title": "Two Sum",
+        "difficulty": "Easy",
+        "tags": ["array", "hash-table"],
+        "description": """Given an array of integers `nums` and an integer `target`, return indices of the two numbers such that they add up to `target`.
+
+You may assume that each input would have exactly one solution, and you may not use the same element twice.
+
+You can return the answer in any order.
+
+**Example:**
+```
+Input: nums = [2,7,11,15], target = 9
+Output: [0,1]
+Explanation: Because nums[0] + nums[1] == 9, we return [0, 1].
+```
+
+**Constraints:**
+- 2 ≤ nums.length ≤ 10⁴
+- -10⁹ ≤ nums[i] ≤ 10⁹
+- -10⁹ ≤ target ≤ 10⁹
+- Only one valid answer exists.""",
+        "starter_code": {
+            "javascript": """function solution(nums, target) {
+    // Write your code here
+    // Return an array of two indices
+}""",
+            "python": """def solution(nums, target):
+    # Write your code here
+    # Return a list of two indices
+    pass""",
+            "java": """public static int[] solution(int[] nums, int target) {
+    // Write your code here
+    // Return an array of two indices
+    return new int[]{};
+}""",
+            "cpp": """vector<int> solution(vector<int>& nums, int target) {
+    // Write your code here
+    // Return a vector of two indices
+    return {};
+}"""
+        },
+        "performance": {
+            "generator": "two_sum",
+            "sizes": [500, 1000, 2000, 4000],
+            "target_complexity": "O(n)",
+            "reference_solution": {
+                "python": """def solution(nums, target):
+    seen = {}
+    for i, num in enumerate(nums):
+        if target - num in seen:
+            return [seen[target - num], i]
+        seen[num] = i
+    return []""",
+                "javascript": """function solution(nums, target) {
+    const seen = new Map();
+    for (let i = 0; i < nums.length; i++) {
+        if (seen.has(target - nums[i])) return [seen.get(target - nums[i]), i];
+        seen.set(nums[i], i);
+    }
+    return [];
+}"""
+            }
+        },
+        # The two indices may be returned in either order
+        "checker": {"type": "unordered"},
+        "test_cases": [
+            {
+                "input": [[2, 7, 11, 15], 9],
+                "expected": [0, 1],
+                "description": "Basic case: target found at beginning"
+            },
+            {
+                "input": [[3, 2, 4], 6],
+                "expected": [1, 2],
+                "description": "Target found at end"
+            },
+            {
+                "input": [[3, 3], 6],
+                "expected": [0, 1],
+                "description": "Duplicate numbers"
+            },
+            {
+                "input": [[1, 2, 3, 4, 5], 8],
+                "expected": [2, 4],
+                "description": "Numbers in middle"
+            },
+            {
+                "input": [[-1, -2, -3, -4, -5], -8],
+                "expected": [2, 4],
+                "description": "Negative numbers"
+            }
+        ]
+    },
+    "binary_search": {
+        "id": "binary_search",
+        "title": "Binary Search",
+        "difficulty": "Easy",
+        "tags": ["array", "binary-search"],
+        "description": """Given an array of integers `nums` which is sorted in ascending order, and an integer `target`, write a function to search `target` in `nums`. If `target` exists, then return its index. Otherwise, return -1.
+
+You must write an algorithm with O(log n) runtime complexity.
+
+**Example:**
+```
+Input: nums = [-1,0,3,5,9,12], target = 9
+Output: 4
+Explanation: 9 exists in nums and its index is 4
+```
+
+**Constraints:**
+- 1 ≤ nums.length ≤ 10⁴
+- -10⁴ < nums[i], target < 10⁴
+- All the integers in nums are unique.
+- nums is sorted in ascending order.""",
+        "starter_code": {
+            "javascript": """function solution(nums, target) {
+    // Write your binary search implementation here
+    // Return the index of target, or -1 if not found
+}""",
+            "python": """def solution(nums, target):
+    # Write your binary search implementation here
+    # Return the index of target, or -1 if not found
+    pass""",
+            "java": """public static int solution(int[] nums, int target) {
+    // Write your binary search implementation here
+    // Return the index of target, or -1 if not found
+    return -1;
+}""",
+            "cpp": """int solution(vector<int>& nums, int target) {
+    // Write your binary search implementation here
+    // Return the index of target, or -1 if not found
+    return -1;
+}"""
+        },
+        "performance": {
+            "generator": "binary_search",
+            "sizes": [10000, 100000, 1000000],
+            "target_complexity": "O(log n)",
+            "reference_solution": {
+                "python": """def solution(nums, target):
+    lo, hi = 0, len(nums) - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if nums[mid] == target:
+            return mid
+        if nums[mid] < target:
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    return -1""",
+                "javascript": """function solution(nums, target) {
+    let lo = 0, hi = nums.length - 1;
+    while (lo <= hi) {
+        const mid = (lo + hi) >> 1;
+        if (nums[mid] === target) return mid;
+        if (nums[mid] < target) lo = mid + 1; else hi = mid - 1;
+    }
+    return -1;
+}"""
+            }
+        },
+        "checker": {"type": "exact"},
+        "test_cases": [
+            {
+                "input": [[-1, 0, 3, 5, 9, 12], 9],
+                "expected": 4,
+                "description": "Target found in array"
+            },
+            {
+                "input": [[-1, 0, 3, 5, 9, 12], 2],
+                "expected": -1,
+                "description": "Target not in array"
+            },
+            {
+                "input": [[5], 5],
+                "expected": 0,
+                "description": "Single element array - found"
+            },
+            {
+                "input": [[5], -5],
+                "expected": -1,
+                "description": "Single element array - not found"
+            },
+            {
+                "input": [[1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 1],
+                "expected": 0,
+                "description": "Target at beginning"
+            },
+            {
+                "input": [[1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 10],
+                "expected": 9,
+                "description": "Target at end"
+            }
+        ]
+    },
+    "palindrome": {
+        "id": "palindrome",
+        "title": "Valid Palindrome",
+        "difficulty": "Easy",
+        "tags": ["string", "two-pointers"],
+        "description": """A phrase is a palindrome if, after converting all uppercase letters into lowercase letters and removing all non-alphanumeric characters, it reads the same forward and backward. Alphanumeric characters include letters and numbers.
+
+Given a string `s`, return `true` if it is a palindrome, or `false` otherwise.
+
+**Example:**
+```
+Input: s = "A man, a plan, a canal: Panama"
+Output: true
+Explanation: "amanaplanacanalpanama" is a palindrome.
+```
+
+**Constraints:**
+- 1 ≤ s.length ≤ 2 * 10⁵
+- s consists only of printable ASCII characters.""",
+        "starter_code": {
+            "javascript": """function solution(s) {
+    // Write your code here
+    // Return true if s is a palindrome, false otherwise
+}""",
+            "python": """def solution(s):
+    # Write your code here
+    # Return True if s is a palindrome, False otherwise
+    pass""",
+            "java": """public static boolean solution(String s) {
+    // Write your code here
+    // Return true if s is a palindrome, false otherwise
+    return false;
+}""",
+            "cpp": """bool solution(string s) {
+    // Write your code here
+    // Return true if s is a palindrome, false otherwise
+    return false;
+}"""
+        },
+        "performance": {
+            "generator": "palindrome",
+            "sizes": [10000, 40000, 160000],
+            "target_complexity": "O(n)",
+            "reference_solution": {
+                "python": """def solution(s):
+    chars = [c.lower() for c in s if c.isalnum()]
+    return chars == chars[::-1]""",
+                "javascript": """function solution(s) {
+    const cleaned = s.toLowerCase().replace(/[^a-z0-9]/g, '');
+    return cleaned === cleaned.split('').reverse().join('');
+}"""
+            }
+        },
+        "checker": {"type": "exact"},
+        "test_cases": [
+            {
+                "input": ["A man, a plan, a canal: Panama"],
+                "expected": True,
+                "description": "Classic palindrome with spaces and punctuation"
+            },
+            {
+                "input": ["race a car"],
+                "expected": False,
+                "description": "Not a palindrome"
+            },
+            {
+                "input": [" "],
+                "expected": True,
+                "description": "Single space (empty after cleaning)"
+            },
+            {
+                "input": ["Madam"],
+                "expected": True,
+                "description": "Simple palindrome with capitals"
+            },
+            {
+                "input": ["No 'x' in Nixon"],
+                "expected": True,
+                "description": "Complex palindrome with quotes"
+            }
+        ]
+    },
+    "fibonacci": {
+        "id": "fibonacci",
+        "title": "Fibonacci Number",
+        "difficulty": "Easy",
+        "tags": ["math", "dynamic-programming"],
+        "description": """The Fibonacci numbers, commonly denoted F(n) form a sequence, called the Fibonacci sequence, such that each number is the sum of the two preceding ones, starting from 0 and 1. That is,
+
+F(0) = 0, F(1) = 1
+F(n) = F(n - 1) + F(n - 2), for n > 1.
+
+Given n, calculate F(n).
+
+**Example:**
+```
+Input: n = 2
+Output: 1
+Explanation: F(2) = F(1) + F(0) = 1 + 0 = 1.
+```
+
+**Constraints:**
+- 0 ≤ n ≤ 30""",
+        "starter_code": {
+            "javascript": """function solution(n) {
+    // Write your code here
+    // Return the nth Fibonacci number
+}""",
+            "python": """def solution(n):
+    # Write your code here
+    # Return the nth Fibonacci number
+    pass""",
+            "java": """public static int solution(int n) {
+    // Write your code here
+    // Return the nth Fibonacci number
+    return 0;
+}""",
+            "cpp": """int solution(int n) {
+    // Write your code here
+    // Return the nth Fibonacci number
+    return 0;
+}"""
+        },
+        "checker": {"type": "exact"},
+        "test_cases": [
+            {
+                "input": [0],
+                "expected": 0,
+                "description": "Base case: F(0) = 0"
+            },
+            {
+                "input": [1],
+                "expected": 1,
+                "description": "Base case: F(1) = 1"
+            },
+            {
+                "input": [2],
+                "expected": 1,
+                "description": "F(2) = F(1) + F(0) = 1"
+            },
+            {
+                "input": [3],
+                "expected": 2,
+                "description": "F(3) = F(2) + F(1) = 2"
+            },
+            {
+                "input": [4],
+                "expected": 3,
+                "description": "F(4) = F(3) + F(2) = 3"
+            },
+            {
+                "input": [10],
+                "expected": 55,
+                "description": "Larger test case"
+            }
+        ]
+    },
+    "reverse_string": {
+        "id": "reverse_string",
+        "title": "Reverse String",
+        "difficulty": "Easy",
+        "tags": ["string", "two-pointers"],
+        "description": """Write a function that reverses a string. The input string is given as an array of characters `s`.
+
+You must do this by modifying the input array in-place with O(1) extra memory.
+
+**Example:**
+```
+Input: s = ["h","e","l","l","o"]
+Output: ["o","l","l","e","h"]
+```
+
+**Constraints:**
+- 1 ≤ s.length ≤ 10⁵
+- s[i] is a printable ascii character.""",
+        "starter_code": {
+            "javascript": """function solution(s) {
+    // Write your code here
+    // Modify the array in-place and return it
+}""",
+            "python": """def solution(s):
+    # Write your code here
+    # Modify the list in-place and return it
+    pass""",
+            "java": """public static char[] solution(char[] s) {
+    // Write your code here
+    // Modify the array in-place and return it
+    return s;
+}""",
+            "cpp": """vector<char> solution(vector<char>& s) {
+    // Write your code here
+    // Modify the vector in-place and return it
+    return s;
+}"""
+        },
+        "performance": {
+            "generator": "reverse_string",
+            "sizes": [10000, 40000, 160000],
+            "target_complexity": "O(n)",
+            "reference_solution": {
+                "python": """def solution(s):
+    s.reverse()
+    return s""",
+                "javascript": """function solution(s) {
+    return s.reverse();
+}"""
+            }
+        },
+        "checker": {"type": "exact"},
+        "test_cases": [
+            {
+                "input": [["h", "e", "l", "l", "o"]],
+                "expected": ["o", "l", "l", "e", "h"],
+                "description": "Basic string reversal"
+            },
+            {
+                "input": [["H", "a", "n", "n", "a", "h"]],
+                "expected": ["h", "a", "n", "n", "a", "H"],
+                "description": "Palindrome with capitals"
+            },
+            {
+                "input": [["A"]],
+                "expected": ["A"],
+                "description": "Single character"
+            },
+            {
+                "input": [["a", "b"]],
+                "expected": ["b", "a"],
+                "description": "Two characters"
+            }
+        ]
+    }
+}
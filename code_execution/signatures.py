@@ -0,0 +1,66 @@
+# Parsing of `solution` function signatures for typed test harnesses
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+
+class Signature(NamedTuple):
+    return_type: str
+    params: List[Tuple[str, str]]  # (type, name)
+
+
+JAVA_MODIFIERS = {'public', 'private', 'protected', 'static', 'final', 'synchronized'}
+CPP_QUALIFIERS = {'const', 'static', 'inline', 'constexpr'}
+
+_SIGNATURE_RE = re.compile(r'([\w:<>\[\],\s&*]+?)\b{name}\s*\(([^)]*)\)\s*(?:const\s*)?\{{')
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas that are not nested inside <...>"""
+    parts, depth, current = [], 0, ''
+    for ch in text:
+        if ch == '<':
+            depth += 1
+        elif ch == '>':
+            depth -= 1
+        if ch == ',' and depth == 0:
+            parts.append(current)
+            current = ''
+        else:
+            current += ch
+    if current.strip():
+        parts.append(current)
+    return parts
+
+
+def _normalize_type(type_text: str, language: str) -> str:
+    """Drop qualifiers, references and whitespace that do not affect marshaling"""
+    words = type_text.replace('&', ' ').replace('*', ' ').split()
+    skip = JAVA_MODIFIERS if language == 'java' else CPP_QUALIFIERS
+    type_text = ' '.join(word for word in words if word not in skip)
+    type_text = re.sub(r'\s*([<>,\[\]])\s*', r'\1', type_text)
+    return type_text.replace('std::', '')
+
+
+def parse_signature(code: str, language: str, name: str = 'solution') -> Optional[Signature]:
+    """Find the definition of ``name`` in Java or C++ source.
+
+    Returns None when no definition is found. Parameter types are normalized,
+    e.g. ``const std::vector<int>& nums`` becomes ``('vector<int>', 'nums')``.
+    """
+    match = re.search(_SIGNATURE_RE.pattern.format(name=re.escape(name)), code)
+    if not match:
+        return None
+    # The lazy prefix may have picked up the tail of a previous statement
+    return_text = re.split(r'[;}{]', match.group(1))[-1]
+    return_type = _normalize_type(return_text, language)
+
+    params = []
+    for param in _split_top_level(match.group(2)):
+        param = param.strip()
+        if not param:
+            continue
+        param_match = re.match(r'(.*?)([A-Za-z_]\w*)\s*$', param, re.S)
+        if not param_match:
+            return None
+        params.append((_normalize_type(param_match.group(1), language), param_match.group(2)))
+    return Signature(return_type, params)
@@ -0,0 +1,171 @@
+# Test inputs encoded once per test set and shared by every submission
+import atexit
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+def encode_inputs(test_cases: List[Dict]) -> bytes:
+    """One JSON line per test case, as the harnesses read them from stdin"""
+    return b''.join(
+        (json.dumps({'input': tc['input']}) + '\n').encode('utf-8')
+        for tc in test_cases
+    )
+
+
+class TestData:
+    """Encoded inputs of one test set, with the byte offset of every case.
+
+    File-backed test data (from a TestDataStore) can be handed to a harness
+    as a stdin descriptor with ``open_from``; in-memory test data is written
+    to a pipe from ``lines``.
+    """
+
+    def __init__(self, data, offsets: List[int], path: Optional[str] = None):
+        self._data = data
+        self.offsets = offsets
+        self.path = path
+
+    @classmethod
+    def from_cases(cls, test_cases: List[Dict]) -> 'TestData':
+        data = encode_inputs(test_cases)
+        return cls(data, cls._line_offsets(data, len(test_cases)))
+
+    @staticmethod
+    def _line_offsets(data, count: int) -> List[int]:
+        offsets = [0]
+        for _ in range(count):
+            offsets.append(data.find(b'\n', offsets[-1]) + 1)
+        return offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def size(self) -> int:
+        return self.offsets[-1]
+
+    def lines(self, start: int, end: int) -> memoryview:
+        """Encoded cases [start:end] as one buffer, without copying"""
+        return memoryview(self._data)[self.offsets[start]:self.offsets[end]]
+
+    def open_from(self, start: int) -> Optional[int]:
+        """A new read-only descriptor positioned at case ``start``, or None
+        for in-memory test data. Reading it to EOF yields cases [start:]."""
+        if self.path is None:
+            return None
+        try:
+            fd = os.open(self.path, os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0))
+        except FileNotFoundError:
+            return None  # Evicted meanwhile; ``lines`` still works from the mapping
+        os.lseek(fd, self.offsets[start], os.SEEK_SET)
+        return fd
+
+
+class TestDataStore:
+    """Encoded test sets kept in files on tmpfs, keyed by problem and version.
+
+    A test set is encoded and written once, the first time any submission
+    runs it; later submissions map the same file and give each harness a
+    descriptor on it as stdin, so the host does no encoding or copying per
+    submission however large the inputs are. The directory is private to
+    the host user, so sandboxed processes only reach data through the
+    descriptor they were handed. Files are evicted least recently used once
+    their total passes ``max_bytes``; submissions still holding one keep
+    their mapping and descriptors, which outlive the unlink.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = 256 * 1024 * 1024):
+        if root is None:
+            base = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) \
+                else tempfile.gettempdir()
+            root = tempfile.mkdtemp(prefix='evaledge_test_data_', dir=base)
+            # tmpfs is memory: do not leave our files behind
+            atexit.register(shutil.rmtree, root, True)
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> TestData
+        self._bytes = 0
+        self._building = {}  # key -> Event set when the build finishes
+        self._lock = threading.Lock()
+
+    def get(self, problem_id: str, test_set_version: str, test_cases: List[Dict]) -> TestData:
+        """Test data for ``test_cases``, encoded on the first call for this version"""
+        key = (problem_id, test_set_version)
+        while True:
+            with self._lock:
+                test_data = self._entries.get(key)
+                if test_data is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return test_data
+                building = self._building.get(key)
+                if building is None:
+                    building = self._building[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # Another submission is encoding this test set; use its result
+            building.wait()
+
+        try:
+            test_data = self._build(key, test_cases)
+            with self._lock:
+                self._entries[key] = test_data
+                self._bytes += test_data.size
+                self._evict()
+            return test_data
+        finally:
+            with self._lock:
+                del self._building[key]
+            building.set()
+
+    def _build(self, key: tuple, test_cases: List[Dict]) -> TestData:
+        data = encode_inputs(test_cases)
+        offsets = TestData._line_offsets(data, len(test_cases))
+        if not data:
+            return TestData(data, offsets)
+        name = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+        path = os.path.join(self.root, name)
+        staging = f'{path}.{threading.get_ident()}.tmp'
+        fd = os.open(staging, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, 'r+b') as f:
+                f.write(data)
+                f.flush()
+                mapped = mmap.mmap(f.fileno(), len(data), access=mmap.ACCESS_READ)
+            os.replace(staging, path)
+        except BaseException:
+            try:
+                os.unlink(staging)
+            except OSError:
+                pass
+            raise
+        return TestData(mapped, offsets, path)
+
+    def _evict(self):
+        # Lock held; the newest entry stays even when it alone is too large
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, test_data = self._entries.popitem(last=False)
+            self._bytes -= test_data.size
+            if test_data.path is not None:
+                try:
+                    os.unlink(test_data.path)
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
@@ -0,0 +1,198 @@
+# Pre-started interpreter workers for code execution
+import os
+import subprocess
+import tempfile
+import threading
+import queue
+import shutil
+from typing import Any, Dict, List, Optional
+from .capture import BoundedCapture, iter_lines, popen_with_result_channel
+from .limits import ResourceLimits, describe_exit
+from .sandbox import SandboxManager, kill_process_group
+
+
+class PoolBusyError(Exception):
+    """Raised when a worker pool has no free worker and its wait queue is full"""
+
+
+class Worker:
+    """A pre-started interpreter waiting for the one job it will run.
+
+    The job is written to the worker's stdin as a JSON header line followed
+    by one line per test case; the worker script exits once it is done.
+    Workers are never handed a second job: submissions share no interpreter,
+    so nothing one candidate's code changes can reach another's. Each line the worker writes to its result channel
+    is pushed onto ``lines``; ``None`` is pushed once the process has exited.
+    What submissions print is drained with a bounded excerpt kept per job, and
+    a job printing more than the output limit kills the worker.
+    """
+
+    def __init__(self, command: List[str], script_file: str, sandbox: SandboxManager,
+                 limits: Optional[ResourceLimits] = None):
+        self.sandbox = sandbox
+        self.work_dir = sandbox.acquire()
+        self.limits = limits or ResourceLimits()
+        self.used = False
+        self.lines = queue.Queue()
+        self._output_exceeded = False
+        self.process, self._results = popen_with_result_channel(
+            command + [script_file],
+            cwd=self.work_dir,
+            # No CPU limit: time spent idle before the job would count; the timeout covers the job
+            preexec_fn=sandbox.preexec_fn(self.limits, None, self.work_dir)
+        )
+        self._stdout = BoundedCapture(
+            self.process.stdout, hard_limit=self.limits.output_bytes, on_overflow=self._on_overflow
+        )
+        self._stderr = BoundedCapture(
+            self.process.stderr, hard_limit=self.limits.output_bytes, on_overflow=self._on_overflow
+        )
+        threading.Thread(target=self._read_results, daemon=True).start()
+
+    def _on_overflow(self):
+        self._output_exceeded = True
+        kill_process_group(self.process)
+
+    def _read_results(self):
+        for line in iter_lines(self._results, self.limits.output_bytes):
+            self.lines.put(line)
+        self.lines.put(None)
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def send(self, header: str, data_lines: List[bytes]):
+        """Hand the worker its job"""
+        if self.used:
+            raise RuntimeError('Worker already ran a job')
+        self.used = True
+        try:
+            self.process.stdin.write(header.encode('utf-8') + b'\n')
+            self.process.stdin.writelines(data_lines)
+            self.process.stdin.flush()
+        except OSError:
+            pass  # The worker died; its exit shows up on ``lines``
+
+    def exit_error(self) -> Dict[str, Any]:
+        """Describe why the worker stopped producing results.
+
+        Usage is not reported: the worker's totals include its start-up.
+        """
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+        self._stderr.join(1)
+        if self._output_exceeded:
+            return {'error': 'Output Limit Exceeded'}
+        stderr = self._stderr.text().strip()
+        error = describe_exit(self.process.returncode, stderr) or stderr
+        return {'error': error or f'Process exited with code {self.process.returncode}'}
+
+    def kill(self):
+        if self.is_alive():
+            kill_process_group(self.process)
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+        self._results.close()
+        self.sandbox.release(self.work_dir)
+
+
+class WorkerPool:
+    """Fixed-size pool of pre-started, single-use workers for one language.
+
+    The pool hides interpreter start-up, not isolation: every job gets a
+    process of its own, and a released worker is killed and replaced by a
+    fresh one that starts while nobody waits for it. Interpreters cannot be
+    forked warm the way the Python fork server does, and a shared process
+    would let one submission patch builtins and read the next one's code.
+
+    ``acquire`` hands out an idle worker, waiting for one if all are busy. At
+    most ``max_queue_depth`` callers may wait at a time; beyond that, and when
+    ``queue_timeout`` runs out, ``PoolBusyError`` is raised so the caller can
+    shed load instead of piling up threads.
+    """
+
+    def __init__(self, command: List[str], script: str, extension: str,
+                 limits: Optional[ResourceLimits] = None, sandbox: Optional[SandboxManager] = None,
+                 size: int = 4, max_queue_depth: int = 100, queue_timeout: float = 30):
+        self.command = command
+        self.limits = limits
+        self.sandbox = sandbox or SandboxManager(max_idle=size)
+        self.size = size
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout = queue_timeout
+
+        self._script_dir = tempfile.mkdtemp(prefix='evaledge_pool_')
+        # Readable by workers running as the sandbox user
+        os.chmod(self._script_dir, 0o755)
+        self._script_file = f'{self._script_dir}/worker{extension}'
+        with open(self._script_file, 'w') as f:
+            f.write(script)
+
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(size)
+        self._waiting = 0
+        self._idle = [self._spawn() for _ in range(size)]
+        self._closed = False
+
+    def _spawn(self) -> Worker:
+        return Worker(self.command, self._script_file, self.sandbox, self.limits)
+
+    def acquire(self) -> Worker:
+        """Take a warm worker out of the pool"""
+        with self._lock:
+            if self._closed:
+                raise PoolBusyError('Worker pool is shut down')
+            if self._waiting >= self.max_queue_depth:
+                raise PoolBusyError('Too many submissions waiting for a worker')
+            self._waiting += 1
+        try:
+            if not self._slots.acquire(timeout=self.queue_timeout):
+                raise PoolBusyError('Timed out waiting for a worker')
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        with self._lock:
+            worker = self._idle.pop() if self._idle else None
+        if worker is None or worker.used or not worker.is_alive():
+            if worker is not None:
+                worker.kill()
+            worker = self._spawn()
+        return worker
+
+    def replace(self, worker: Worker) -> Worker:
+        """Retire a used worker and return a fresh one, keeping the caller's slot"""
+        worker.kill()
+        return self._spawn()
+
+    def release(self, worker: Worker):
+        """Give back the caller's slot after a job; the worker itself is discarded"""
+        worker.kill()
+        # Start the replacement now so the next caller gets a warm one
+        worker = self._spawn()
+        with self._lock:
+            if self._closed:
+                worker.kill()
+            else:
+                self._idle.append(worker)
+        self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'waiting': self._waiting
+            }
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+        shutil.rmtree(self._script_dir, ignore_errors=True)
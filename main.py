@@ -2,7 +2,7 @@ from flask import Flask
 from flask_cors import CORS
 from code_app.routes import code_bp
 from monitor_app.routes import monitor_bp
-from verify_app.routes import verify_bp
+from verify_app.routes import verify_bp, sock
 
 app = Flask(__name__)
 CORS(app)
@@ -11,6 +11,8 @@ CORS(app)
 app.register_blueprint(code_bp, url_prefix='/code')
 app.register_blueprint(monitor_bp, url_prefix='/monitor')
 app.register_blueprint(verify_bp, url_prefix='/verify')
+if sock:  # flask-sock installed: enables /verify/verify_ws
+    sock.init_app(app)
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True) 
\ No newline at end of file
@@ -2,6 +2,7 @@ import cv2, time, mediapipe as mp, numpy as np, winsound
 from collections import deque
 from threading import Lock
 from flask import Blueprint, Response, jsonify
+from proctoring.landmarks import LandmarkBuffer, eye_aspect_ratios, gaze_ratios, iris_centers
 
 monitor_bp = Blueprint('monitor_bp', __name__)
 state_lock = Lock()
@@ -16,15 +17,8 @@ LEFT = [33, 160, 158, 133, 153, 144]
 RIGHT = [362, 385, 387, 263, 373, 380]
 LEFT_IRIS = [468, 469, 470, 471]
 RIGHT_IRIS = [473, 474, 475, 476]
-
-def ear(p):
-    p1, p2, p3, p4, p5, p6 = p
-    return (np.linalg.norm(p2 - p6) + np.linalg.norm(p3 - p5)) / (2 * np.linalg.norm(p1 - p4))
-
-def gaze_ratio(iris, left_corner, right_corner):
-    dl = np.linalg.norm(iris - left_corner)
-    dr = np.linalg.norm(iris - right_corner)
-    return dr / dl if dl else 1
+EYES = np.array([LEFT, RIGHT])
+IRISES = np.array([LEFT_IRIS, RIGHT_IRIS])
 
 def direction(r):
     return "RIGHT" if r > GAZE_L_THR else "LEFT" if r < GAZE_R_THR else "CENTER"
@@ -39,6 +33,7 @@ def generate_frames():
     fps_hist, blink_cntr, blinks = deque(maxlen=FPS_BUF), 0, 0
     last_center = time.time()
     warned = False
+    landmarks = LandmarkBuffer(max_faces=1)
     while cam.isOpened():
         t0 = time.time()
         ok, frame = cam.read()
@@ -50,24 +45,18 @@ def generate_frames():
         gazeL = gazeR = "--"
         ear_disp = 0
         if res.multi_face_landmarks:
-            lm = res.multi_face_landmarks[0].landmark
-            eyeL = np.array([[lm[i].x * w, lm[i].y * h] for i in LEFT])
-            eyeR = np.array([[lm[i].x * w, lm[i].y * h] for i in RIGHT])
-            irisL = np.array([[lm[i].x * w, lm[i].y * h] for i in LEFT_IRIS]).mean(0)
-            irisR = np.array([[lm[i].x * w, lm[i].y * h] for i in RIGHT_IRIS]).mean(0)
-            ear_disp = round((ear(eyeL) + ear(eyeR)) / 2, 3)
+            pts = landmarks.fill(res.multi_face_landmarks, w, h)[0]
+            ear_disp = round(float(eye_aspect_ratios(pts, EYES).mean()), 3)
             if ear_disp < BLINK_EAR_THR:
                 blink_cntr += 1
             else:
                 if blink_cntr >= BLINK_CONSEC_FR:
                     blinks += 1
                 blink_cntr = 0
-            gazeL = direction(gaze_ratio(irisL, eyeL[0], eyeL[3]))
-            gazeR = direction(gaze_ratio(irisR, eyeR[0], eyeR[3]))
-            for poly in (eyeL, eyeR):
-                cv2.polylines(frame, [poly.astype(int)], True, (0, 255, 0), 1)
-            cv2.circle(frame, tuple(irisL.astype(int)), 2, (0, 255, 0), -1)
-            cv2.circle(frame, tuple(irisR.astype(int)), 2, (0, 255, 0), -1)
+            gazeL, gazeR = (direction(r) for r in gaze_ratios(pts, EYES, IRISES))
+            cv2.polylines(frame, list(pts[EYES, :2].astype(np.int32)), True, (0, 255, 0), 1)
+            for iris in iris_centers(pts, IRISES).astype(int):
+                cv2.circle(frame, tuple(iris), 2, (0, 255, 0), -1)
         if gazeL == gazeR == "CENTER":
             last_center = time.time()
             warned = False
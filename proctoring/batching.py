@@ -0,0 +1,95 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import numpy as np
+from insightface.utils import face_align
+
+MAX_BATCH = 32
+MAX_DELAY = 0.005  # seconds a request may wait for others to join its batch
+
+
+class MicroBatcher:
+    """Runs ``fn`` on items submitted by concurrent callers, many at a time.
+
+    A worker thread takes the first waiting item, keeps collecting until
+    ``max_batch`` items are in or ``max_delay`` has passed, calls ``fn``
+    once on the list and hands each caller its own result. A lone caller
+    waits at most ``max_delay`` longer than it would unbatched.
+    """
+
+    def __init__(self, fn: Callable[[list], list], max_batch: int = MAX_BATCH,
+                 max_delay: float = MAX_DELAY, name: str = 'micro-batcher'):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        threading.Thread(target=self._worker, name=name, daemon=True).start()
+
+    def submit(self, item):
+        """``fn``'s result for ``item``; blocks until its batch has run"""
+        future = Future()
+        self._queue.put((item, future))
+        return future.result()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._collect()
+            items, futures = zip(*batch)
+            try:
+                results = self.fn(list(items))
+            except BaseException as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {'batches': self.batches, 'items': self.items,
+                'mean_batch': self.items / self.batches if self.batches else 0.0}
+
+
+class FaceEmbedder:
+    """Unit-norm ArcFace embedding of the best face in a BGR image.
+
+    Detection runs in the caller's thread, one image at a time; the aligned
+    crops of concurrent callers go through the recognition model as one
+    ONNX Runtime batch. ``face_app`` only needs its detection and
+    recognition models loaded.
+    """
+
+    def __init__(self, face_app, max_batch: int = MAX_BATCH, max_delay: float = MAX_DELAY):
+        self.detector = face_app.det_model
+        self.recognizer = face_app.models['recognition']
+        self.batcher = MicroBatcher(self._embed_batch, max_batch, max_delay, name='face-embedder')
+
+    def embed(self, bgr: np.ndarray) -> Optional[np.ndarray]:
+        """None when no face is detected"""
+        _, kpss = self.detector.detect(bgr, max_num=0, metric='default')
+        if kpss is None or not len(kpss):
+            return None
+        crop = face_align.norm_crop(bgr, landmark=kpss[0], image_size=self.recognizer.input_size[0])
+        return self.batcher.submit(crop)
+
+    def _embed_batch(self, crops: List[np.ndarray]) -> np.ndarray:
+        emb = self.recognizer.get_feat(crops)
+        return emb / np.linalg.norm(emb, axis=1, keepdims=True)
@@ -1,36 +1,91 @@
 import cv2
-import mediapipe as mp
 import numpy as np
 
+from .landmarks import eye_aspect_ratios, gaze_ratios, iris_centers
+
+# Eye contours (outer corner first, inner corner fourth) and iris rings, left then right
+EYES = np.array([[33, 160, 158, 133, 153, 144], [362, 385, 387, 263, 373, 380]])
+IRISES = np.array([[469, 470, 471, 472], [474, 475, 476, 477]])
+
+BLINK_EAR_THR, BLINK_CONSEC_FR = 0.21, 2
+GAZE_L_THR, GAZE_R_THR = 1.25, 0.75
+
+
+def direction(r):  # mirrored webcam
+    if r > GAZE_L_THR:
+        return 'RIGHT'
+    if r < GAZE_R_THR:
+        return 'LEFT'
+    return 'CENTER'
+
+
 class EyeTracker:
     """
-    A class to track eyes using OpenCV and MediaPipe.
+    A class to track gaze and blinks from Face Mesh landmarks.
     """
 
     def __init__(self, enable_iris_tracking=False):
         """
-        Initializes the EyeTracker with MediaPipe's Face Mesh model.
+        Initializes the blink state. Landmarks come from the caller's
+        perception stage, so the tracker runs no model of its own.
         """
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-
-    def analyze_gaze(self, frame):
-        """Analyzes the gaze direction."""
-        # To be implemented
+        self.enable_iris_tracking = enable_iris_tracking
+        self.blink_counter = 0
+        self.blinks = 0
+
+    def analyze_gaze(self, landmarks):
+        """Analyzes the gaze direction and blinks of one face.
+
+        ``landmarks`` is the face's (N, 3) array of pixel coordinates, or
+        None when no face is visible.
+        """
+        if landmarks is None or len(landmarks) < 478:
+            return {
+                'left_gaze': 'UNKNOWN',
+                'right_gaze': 'UNKNOWN',
+                'combined_gaze': 'UNKNOWN',
+                'left_ratio': 0,
+                'right_ratio': 0,
+                'ear': 0,
+                'blinks': self.blinks
+            }
+
+        ear = float(eye_aspect_ratios(landmarks, EYES).mean())
+        if ear < BLINK_EAR_THR:
+            self.blink_counter += 1
+        else:
+            if self.blink_counter >= BLINK_CONSEC_FR:
+                self.blinks += 1
+            self.blink_counter = 0
+
+        left_ratio, right_ratio = gaze_ratios(landmarks, EYES, IRISES)
+        left_iris, right_iris = iris_centers(landmarks, IRISES)
+        left_gaze, right_gaze = direction(left_ratio), direction(right_ratio)
+        if left_gaze == right_gaze == 'CENTER':
+            combined_gaze = 'CENTER'
+        else:
+            combined_gaze = 'LEFT' if 'LEFT' in (left_gaze, right_gaze) else 'RIGHT'
+
         return {
-            'left_gaze': 'CENTER',
-            'right_gaze': 'CENTER',
-            'combined_gaze': 'CENTER',
-            'left_ratio': 0.5,
-            'right_ratio': 0.5
+            'left_gaze': left_gaze,
+            'right_gaze': right_gaze,
+            'combined_gaze': combined_gaze,
+            'left_ratio': float(left_ratio),
+            'right_ratio': float(right_ratio),
+            'ear': ear,
+            'blinks': self.blinks,
+            'left_iris': left_iris,
+            'right_iris': right_iris
         }
 
     def draw_gaze_info(self, frame, gaze_data):
         """Draws gaze information on the frame."""
-        # To be implemented
+        if gaze_data.get('combined_gaze', 'UNKNOWN') == 'UNKNOWN':
+            return frame
+        for iris in (gaze_data['left_iris'], gaze_data['right_iris']):
+            cv2.circle(frame, tuple(iris.astype(int)), 2, (0, 255, 0), -1)
+        cv2.putText(frame, f"Gaze: {gaze_data['combined_gaze']}", (10, 260),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        cv2.putText(frame, f"Blinks: {gaze_data['blinks']}", (10, 290),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
         return frame
@@ -0,0 +1,34 @@
+import base64
+from typing import Optional, Union
+
+import cv2
+import numpy as np
+
+# Request bodies that are an encoded image as-is
+IMAGE_MIMETYPES = {'image/jpeg', 'image/webp', 'image/png', 'application/octet-stream'}
+
+
+def decode_image(data: Union[bytes, bytearray, memoryview, str]) -> Optional[np.ndarray]:
+    """BGR image from an encoded JPEG/WebP/PNG buffer, or None if it does not decode.
+
+    Buffers are decoded in place through ``np.frombuffer``. Base64 data URLs
+    (``data:image/...;base64,...``), as str or bytes, are still accepted.
+    """
+    if not isinstance(data, str) and data[:5] == b'data:':
+        data = bytes(data).decode('ascii')
+    if isinstance(data, str):
+        data = base64.b64decode(data.split(',', 1)[-1])
+    if not len(data):
+        return None
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+
+def request_image(request) -> Union[bytes, str]:
+    """The image a Flask request carries: a raw image body, a multipart
+    ``image`` file, or the ``image`` form field as a base64 data URL."""
+    if request.mimetype in IMAGE_MIMETYPES:
+        return request.get_data(cache=False)
+    upload = request.files.get('image')
+    if upload is not None:
+        return upload.read()
+    return request.form['image']
@@ -0,0 +1,94 @@
+"""
+proctoring/landmarks.py  –  Face Mesh landmarks as NumPy arrays
+---------------------------------------------------------------
+• LandmarkBuffer.fill(res.multi_face_landmarks, w, h) -> (faces, N, 3) float32 view
+• eye_aspect_ratios / gaze_ratios / head_poses work on every eye of every face at once
+"""
+
+import numpy as np
+
+NUM_LANDMARKS = 478          # 468 mesh points + 10 iris points (refine_landmarks=True)
+EPS = 1e-6
+
+# A serialized NormalizedLandmarkList is one 17-byte record per landmark:
+# field 1 (len 15) { field 1 float x, field 2 float y, field 3 float z }
+_RECORD = np.dtype([("head", "u1", 3), ("x", "<f4"), ("tag_y", "u1"), ("y", "<f4"),
+                    ("tag_z", "u1"), ("z", "<f4")])
+_HEAD = np.array([0x0A, 0x0F, 0x0D], np.uint8)
+
+# Pose landmarks: nose tip, chin, outer eye corners
+NOSE_TIP, CHIN, EYE_OUTER_L, EYE_OUTER_R = 1, 175, 33, 263
+
+# Eye contour positions: p1/p4 are the corners, (p2,p6) and (p3,p5) the lids
+_UPPER, _LOWER, _CORNERS = np.array([1, 2]), np.array([5, 4]), np.array([0, 3])
+
+
+class LandmarkBuffer:
+    """Preallocated (max_faces, N, 3) float32 array the landmarks of a frame are copied into.
+
+    ``fill`` decodes each face's landmark list straight from its serialized
+    form into the buffer and scales it to pixels (z on the x scale), so no
+    per-landmark Python objects are touched. The returned view is
+    overwritten by the next ``fill``.
+    """
+
+    def __init__(self, max_faces=1, num_landmarks=NUM_LANDMARKS):
+        self.points = np.zeros((max_faces, num_landmarks, 3), np.float32)
+        self._scale = np.ones(3, np.float32)
+
+    def fill(self, multi_face_landmarks, w, h):
+        faces = multi_face_landmarks or ()
+        count = min(len(faces), len(self.points))
+        for i in range(count):
+            self._copy(faces[i], self.points[i])
+        self._scale[:] = (w, h, w)
+        view = self.points[:count]
+        view *= self._scale
+        return view
+
+    @staticmethod
+    def _copy(face, out):
+        raw = face.SerializeToString()
+        n = len(raw) // _RECORD.itemsize
+        if n == len(out) and len(raw) == n * _RECORD.itemsize:
+            rec = np.frombuffer(raw, _RECORD)
+            if (rec["head"] == _HEAD).all() and (rec["tag_y"] == 0x15).all() and (rec["tag_z"] == 0x1D).all():
+                out[:, 0] = rec["x"]; out[:, 1] = rec["y"]; out[:, 2] = rec["z"]
+                return
+        # Unexpected layout (e.g. visibility set, or no iris points): go field by field
+        lm = face.landmark
+        k = min(len(lm), len(out))
+        out.reshape(-1)[:k * 3] = np.fromiter(
+            (c for p in lm for c in (p.x, p.y, p.z)), np.float32, k * 3)
+        out[k:] = 0
+
+
+def eye_aspect_ratios(points, eyes):
+    """EAR of every eye: points (..., N, 3), eyes (E, 6) indices -> (..., E)"""
+    p = points[..., eyes, :2]
+    lids = np.linalg.norm(p[..., _UPPER, :] - p[..., _LOWER, :], axis=-1).sum(-1)
+    width = np.linalg.norm(p[..., 0, :] - p[..., 3, :], axis=-1)
+    return lids / (2 * width + EPS)
+
+
+def iris_centers(points, irises):
+    """Mean of every iris ring: irises (E, 4) indices -> (..., E, 2)"""
+    return points[..., irises, :2].mean(-2)
+
+
+def gaze_ratios(points, eyes, irises):
+    """Distance of each iris to the eye's p4 corner over its distance to p1 -> (..., E)"""
+    corners = points[..., eyes[:, _CORNERS], :2]
+    d = np.linalg.norm(iris_centers(points, irises)[..., None, :] - corners, axis=-1)
+    return np.divide(d[..., 1], d[..., 0], out=np.ones_like(d[..., 0]), where=d[..., 0] > 0)
+
+
+def head_poses(points):
+    """Pitch (x) and yaw (y) in degrees of every face: (..., N, 3) -> (..., 2)"""
+    nose, chin = points[..., NOSE_TIP, :2], points[..., CHIN, :2]
+    eye_center = (points[..., EYE_OUTER_L, :2] + points[..., EYE_OUTER_R, :2]) / 2
+    eye_to_nose = nose - eye_center
+    nose_to_chin = chin - nose
+    yaw = np.degrees(np.arctan2(eye_to_nose[..., 0], np.abs(eye_to_nose[..., 1])))
+    pitch = np.degrees(np.arctan2(nose_to_chin[..., 1], np.abs(nose_to_chin[..., 0]))) - 90
+    return np.stack([pitch, yaw], axis=-1)
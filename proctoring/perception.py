@@ -0,0 +1,75 @@
+import cv2
+import mediapipe as mp
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from .landmarks import LandmarkBuffer, head_poses
+
+
+class FramePerception:
+    """What one frame shows: every face's landmarks, in pixels, from one mesh pass.
+
+    ``landmarks`` is a (faces, 478, 3) float32 array; z uses the same scale
+    as x. It is a view of the stage's buffer and only valid until the next
+    frame is processed. The primary face, the largest one, is the candidate
+    whose head pose and gaze are tracked.
+    """
+
+    def __init__(self, landmarks: np.ndarray, frame_size: Tuple[int, int]):
+        self.landmarks = landmarks
+        self.frame_size = frame_size
+        corners = np.concatenate([landmarks[..., :2].min(axis=1), landmarks[..., :2].max(axis=1)], axis=1)
+        sizes = corners[:, 2:] - corners[:, :2]
+        self.faces = [
+            {'bbox': (int(x), int(y), int(width), int(height))}
+            for (x, y), (width, height) in zip(corners[:, :2], sizes)
+        ]
+        self.primary_index = int(np.argmax(sizes.prod(axis=1))) if len(landmarks) else None
+
+    @property
+    def face_count(self) -> int:
+        return len(self.landmarks)
+
+    @property
+    def primary(self) -> Optional[np.ndarray]:
+        return self.landmarks[self.primary_index] if self.primary_index is not None else None
+
+    def head_pose(self) -> Optional[Dict[str, float]]:
+        """Pitch (x) and yaw (y) of the primary face in degrees, or None without a face"""
+        points = self.primary
+        if points is None:
+            return None
+        x_angle, y_angle = head_poses(points)
+        return {'x': float(x_angle), 'y': float(y_angle), 'z': 0}
+
+
+class PerceptionStage:
+    """The one place a frame is converted and run through MediaPipe.
+
+    Face count, head pose, iris gaze and blinks used to need a face
+    detector, a face mesh and a second mesh in the eye tracker, each with
+    its own BGR to RGB conversion. One multi-face mesh with iris refinement
+    answers all of them, so every frame is converted once and inferred once.
+    """
+
+    def __init__(self, max_num_faces: int = 5, min_detection_confidence: float = 0.5,
+                 min_tracking_confidence: float = 0.5):
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=False,
+            max_num_faces=max_num_faces,
+            refine_landmarks=True,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+        self.landmarks = LandmarkBuffer(max_faces=max_num_faces)
+
+    def process(self, frame: np.ndarray) -> FramePerception:
+        h, w = frame.shape[:2]
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # Lets MediaPipe use the buffer without copying it
+        rgb_frame.flags.writeable = False
+        results = self.face_mesh.process(rgb_frame)
+        return FramePerception(self.landmarks.fill(results.multi_face_landmarks, w, h), (w, h))
+
+    def close(self):
+        self.face_mesh.close()
@@ -10,24 +10,14 @@ import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from .eye_track import EyeTracker
+from .perception import PerceptionStage
 
 class IntegratedProctoringSystem:
     def __init__(self, disable_ui=False):
-        # Initialize MediaPipe
-        self.mp_face_detection = mp.solutions.face_detection
-        self.mp_face_mesh = mp.solutions.face_mesh
+        # Initialize MediaPipe: one multi-face mesh serves face count,
+        # head pose, gaze and blinks
         self.mp_drawing = mp.solutions.drawing_utils
-        
-        self.face_detection = self.mp_face_detection.FaceDetection(
-            model_selection=0, min_detection_confidence=0.5
-        )
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            static_image_mode=False,
-            max_num_faces=5,
-            refine_landmarks=True,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+        self.perception = PerceptionStage(max_num_faces=5)
         
         # Session management
         self.session_start_time = datetime.now()
@@ -137,72 +127,27 @@ class IntegratedProctoringSystem:
             print(f"Failed to initialize audio: {e}")
             return False
     
-    def detect_faces(self, frame):
-        """Detect faces using MediaPipe"""
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_detection.process(rgb_frame)
-        
-        faces = []
-        if results.detections:
-            for i, detection in enumerate(results.detections):
-                bbox = detection.location_data.relative_bounding_box
-                h, w, _ = frame.shape
-                x = int(bbox.xmin * w)
-                y = int(bbox.ymin * h)
-                width = int(bbox.width * w)
-                height = int(bbox.height * h)
-                
-                faces.append({
-                    'bbox': (x, y, width, height),
-                    'confidence': detection.score[0]
-                })
-        
-        return faces, frame
+    def detect_faces(self, frame, perception=None):
+        """Faces in the frame, from the shared face mesh pass"""
+        perception = perception or self.perception.process(frame)
+        return perception.faces, frame
     
-    def calculate_head_pose(self, frame):
-        """Calculate head pose angles"""
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_mesh.process(rgb_frame)
-        
-        if results.multi_face_landmarks:
-            for face_landmarks in results.multi_face_landmarks:
-                # Get specific landmarks for pose estimation
-                h, w, _ = frame.shape
-                
-                # Nose tip, chin, left eye, right eye
-                nose_tip = face_landmarks.landmark[1]
-                chin = face_landmarks.landmark[175]
-                left_eye = face_landmarks.landmark[33]
-                right_eye = face_landmarks.landmark[263]
-                
-                # Convert to pixel coordinates
-                nose_2d = np.array([nose_tip.x * w, nose_tip.y * h], dtype=np.float64)
-                chin_2d = np.array([chin.x * w, chin.y * h], dtype=np.float64)
-                left_eye_2d = np.array([left_eye.x * w, left_eye.y * h], dtype=np.float64)
-                right_eye_2d = np.array([right_eye.x * w, right_eye.y * h], dtype=np.float64)
-                
-                # Calculate angles (simplified approach)
-                eye_center = (left_eye_2d + right_eye_2d) / 2
-                
-                # Y-axis rotation (left/right turn)
-                eye_to_nose = nose_2d - eye_center
-                y_angle = np.arctan2(eye_to_nose[0], abs(eye_to_nose[1])) * 180 / np.pi
-                
-                # X-axis rotation (up/down tilt)
-                nose_to_chin = chin_2d - nose_2d
-                x_angle = np.arctan2(nose_to_chin[1], abs(nose_to_chin[0])) * 180 / np.pi - 90
-                
-                self.head_pose_angles = {'x': x_angle, 'y': y_angle, 'z': 0}
-                
-                # Draw pose info
-                cv2.putText(frame, f"Pose Y: {y_angle:.1f}°", (10, 200), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                cv2.putText(frame, f"Pose X: {x_angle:.1f}°", (10, 230), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                
-                return True
+    def calculate_head_pose(self, frame, perception=None):
+        """Calculate head pose angles of the primary face"""
+        perception = perception or self.perception.process(frame)
+        angles = perception.head_pose()
+        if angles is None:
+            return False
         
-        return False
+        self.head_pose_angles = angles
+        
+        # Draw pose info
+        cv2.putText(frame, f"Pose Y: {angles['y']:.1f}°", (10, 200), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        cv2.putText(frame, f"Pose X: {angles['x']:.1f}°", (10, 230), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+        
+        return True
     
     def take_snapshot(self, frame, violation_type: str):
         """Take snapshot during violation"""
@@ -465,14 +410,17 @@ class IntegratedProctoringSystem:
         """Process frame for all detections"""
         self.frame_count += 1
         
+        # One color conversion and one mesh pass feed every detection below
+        perception = self.perception.process(frame)
+        
         # Detect faces
-        faces, annotated_frame = self.detect_faces(frame)
+        faces, annotated_frame = self.detect_faces(frame, perception)
         
         # Calculate head pose
-        self.calculate_head_pose(annotated_frame)
+        self.calculate_head_pose(annotated_frame, perception)
         
-        # Analyze gaze using EyeTracker
-        gaze_data = self.eye_tracker.analyze_gaze(frame)
+        # Analyze gaze and blinks using EyeTracker
+        gaze_data = self.eye_tracker.analyze_gaze(perception.primary)
         annotated_frame = self.eye_tracker.draw_gaze_info(annotated_frame, gaze_data)
         
         # Add session info overlay
@@ -565,6 +513,7 @@ class IntegratedProctoringSystem:
         """Clean up all resources"""
         if self.camera:
             self.camera.release()
+        self.perception.close()
         if self.audio_stream:
             self.audio_stream.stop()
             self.audio_stream.close()
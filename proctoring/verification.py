@@ -1,6 +1,8 @@
-import base64, cv2, numpy as np, os
+import cv2, numpy as np, os
 from pathlib import Path
 from insightface.app import FaceAnalysis
+from .batching import FaceEmbedder
+from .frames import decode_image
 from PIL import Image
 
 # ─── SETTINGS ────────────────────────────────────────────
@@ -9,15 +11,14 @@ EMB_THRESH = 0.60            # cosine‑similarity threshold
 # ─────────────────────────────────────────────────────────
 
 # ---------- InsightFace initialisation ----------
-face_app = FaceAnalysis(providers=["CPUExecutionProvider"])
+face_app = FaceAnalysis(providers=["CPUExecutionProvider"],
+                        allowed_modules=["detection", "recognition"])
 face_app.prepare(ctx_id=0, det_size=(640, 640))
+# Concurrent requests share one batched recognition run
+embedder = FaceEmbedder(face_app)
 
 def get_emb(bgr):
-    faces = face_app.get(bgr)
-    if not faces:
-        return None
-    emb = faces[0].embedding
-    return emb / np.linalg.norm(emb)
+    return embedder.embed(bgr)
 
 # ---------- preload reference embeddings ----------
 reference = {}
@@ -97,15 +98,13 @@ def run_verification():
     cap.release()
     cv2.destroyAllWindows()
 
-def verify_image(b64_img):
+def verify_image(img):
     """
-    Performs face verification on a base64 encoded image.
+    Performs face verification on an encoded image: raw JPEG/WebP bytes
+    or a base64 data URL.
     """
     try:
-        # Decode the base64 image
-        img_data = base64.b64decode(b64_img.split(',')[1])
-        nparr = np.frombuffer(img_data, np.uint8)
-        bgr = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        bgr = decode_image(img)
 
         if bgr is None:
             return {"ok": False, "error": "Could not decode image."}
@@ -1,16 +1,25 @@
 """
-proctoring/vision.py  –  single‑user demo engine
-------------------------------------------------
-• verify_user(b64)   -> (bool_ok, dict_payload)
-• analyse_frame(b64) -> dict {frame,gaze,blinks,status,message,playBeep}
+proctoring/vision.py  –  multi‑session analysis engine
+------------------------------------------------------
+• verify_user(sid, img)   -> (bool_ok, dict_payload)
+• analyse_frame(sid, img) -> dict {frame,gaze,blinks,status,message,playBeep}
+  img is the encoded JPEG/WebP bytes, or a base64 data URL
+• end_session(sid)        -> frees the candidate's state
+Blink/gaze/termination state is kept per session id; a new id opens a
+session, idle ones are evicted, and SessionLimitError is raised when
+MAX_SESSIONS are already open. Frames run on a pool of at most MAX_MESHES
+tracking FaceMesh graphs (MeshBusyError when none frees up in time).
 """
 
-import base64, time, cv2, numpy as np
+import base64, os, threading, time, cv2, numpy as np
 from pathlib import Path
-from collections import deque
+from collections import OrderedDict, deque
 from datetime import datetime
 import mediapipe as mp
 from insightface.app import FaceAnalysis
+from .batching import FaceEmbedder
+from .frames import decode_image
+from .landmarks import LandmarkBuffer, eye_aspect_ratios, gaze_ratios, iris_centers
 
 # ─── constants ───────────────────────────────────────────
 REF_DIR          = Path(__file__).resolve().parent / "reference"
@@ -19,21 +28,21 @@ BLINK_EAR_THR, BLINK_CONSEC_FR = 0.21, 2
 GAZE_L_THR,  GAZE_R_THR        = 1.25, 0.75
 AWAY_GRACE_SEC, EXIT_DELAY_SEC = 1.5, 2.0
 FPS_BUF                           = 30
+MAX_SESSIONS     = int(os.environ.get("EVALEDGE_MAX_SESSIONS", 500))
+SESSION_IDLE_SEC = float(os.environ.get("EVALEDGE_SESSION_IDLE_SEC", 300))
+BATCH_DELAY_SEC  = float(os.environ.get("EVALEDGE_BATCH_DELAY_SEC", 0.005))
+MAX_MESHES       = int(os.environ.get("EVALEDGE_MAX_MESHES", os.cpu_count() or 4))
+MESH_IDLE_SEC    = float(os.environ.get("EVALEDGE_MESH_IDLE_SEC", 30))
+MESH_WAIT_SEC    = float(os.environ.get("EVALEDGE_MESH_WAIT_SEC", 2.0))
 L_EYE  = [33,160,158,133,153,144];   R_EYE  = [362,385,387,263,373,380]
 L_IRIS = [474,475,476,477];          R_IRIS = [469,470,471,472]
+EYES, IRISES = np.array([L_EYE, R_EYE]), np.array([L_IRIS, R_IRIS])
 
 # ─── helpers ─────────────────────────────────────────────
-def _decode_b64(data_url: str) -> np.ndarray:
-    raw = base64.b64decode(data_url.split(",", 1)[1])
-    return cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
-
-def _ear(pts):
-    p1,p2,p3,p4,p5,p6 = pts
-    return (np.linalg.norm(p2-p6)+np.linalg.norm(p3-p5)) / (2*np.linalg.norm(p1-p4))
-
-def _g_ratio(iris, lp, rp):
-    dl = np.linalg.norm(iris-lp); dr = np.linalg.norm(iris-rp)
-    return dr/(dl+1e-6)
+def _decode(img) -> np.ndarray:
+    bgr = decode_image(img)
+    if bgr is None: raise ValueError("Could not decode image.")
+    return bgr
 
 def _dir(r):  # mirrored webcam
     if r > GAZE_L_THR: return "RIGHT"
@@ -41,41 +50,192 @@ def _dir(r):  # mirrored webcam
     return "CENTER"
 
 # ─── singleton models ───────────────────────────────────
-_face = FaceAnalysis(providers=["CPUExecutionProvider"])
+_face = FaceAnalysis(providers=["CPUExecutionProvider"],
+                     allowed_modules=["detection", "recognition"])
 _face.prepare(ctx_id=0, det_size=(640,640))
-_mesh = mp.solutions.face_mesh.FaceMesh(
+# embeddings of concurrent sessions share one recognition run
+_embedder = FaceEmbedder(_face, max_delay=BATCH_DELAY_SEC)
+
+def _new_mesh():
+    return mp.solutions.face_mesh.FaceMesh(
             refine_landmarks=True, max_num_faces=1,
             min_detection_confidence=0.5, min_tracking_confidence=0.5)
 
+class MeshBusyError(RuntimeError):
+    """Raised when every FaceMesh graph stays busy for MESH_WAIT_SEC"""
+
+class _Mesh:
+    def __init__(self):
+        self.graph = _new_mesh()
+        self.owner = None     # session state whose face it last tracked
+        self.used  = time.monotonic()
+
+class MeshPool:
+    """At most ``max_meshes`` tracking FaceMesh graphs shared by all sessions.
+
+    A graph holds TFLite interpreters and threads of its own, so there are
+    far fewer graphs than sessions. A session gets back the graph it used
+    last while nobody took it, keeping MediaPipe's tracking (the detector
+    only runs when the face is lost); otherwise it takes the least recently
+    used free graph, which re-detects on the new face. Graphs free for
+    ``idle_sec`` are closed; a frame waits at most ``wait_sec`` for one.
+    """
+
+    def __init__(self, max_meshes=MAX_MESHES, idle_sec=MESH_IDLE_SEC, wait_sec=MESH_WAIT_SEC):
+        self.max_meshes = max_meshes
+        self.idle_sec   = idle_sec
+        self.wait_sec   = wait_sec
+        self._free  = OrderedDict()   # _Mesh -> None, least recently used first
+        self._count = 0
+        self._waiting = deque()       # frames waiting for a graph, oldest first
+        self._cond  = threading.Condition()
+
+    def acquire(self, st):
+        now, stale, mesh, me = time.monotonic(), [], None, object()
+        deadline = now + self.wait_sec
+        try:
+            with self._cond:
+                for m in list(self._free):
+                    if now - m.used <= self.idle_sec: break
+                    del self._free[m]; self._count -= 1; stale.append(m)
+                last = st["mesh"]
+                if not self._waiting and last is not None and last.owner is st and last in self._free:
+                    del self._free[last]
+                    return last
+                # first come, first served once frames have to wait
+                self._waiting.append(me)
+                try:
+                    while self._waiting[0] is not me or (not self._free and self._count >= self.max_meshes):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise MeshBusyError(f"all {self.max_meshes} face meshes busy")
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting.remove(me); self._cond.notify_all()
+                if last is not None and last.owner is st and last in self._free:
+                    del self._free[last]
+                    return last
+                if self._free:
+                    mesh = self._free.popitem(last=False)[0]
+                else:
+                    self._count += 1
+        finally:
+            for m in stale: m.graph.close()
+        if mesh is None:
+            try:
+                mesh = _Mesh()
+            except BaseException:
+                with self._cond:
+                    self._count -= 1; self._cond.notify_all()
+                raise
+        mesh.owner = st; st["mesh"] = mesh
+        return mesh
+
+    def release(self, mesh):
+        with self._cond:
+            mesh.used = time.monotonic()
+            self._free[mesh] = None
+            self._cond.notify_all()
+
+    def forget(self, st):
+        # the session ended: its graph is free for anyone, nothing to resume
+        with self._cond:
+            if st["mesh"] is not None and st["mesh"].owner is st:
+                st["mesh"].owner = None
+            st["mesh"] = None
+
+_meshes = MeshPool()
+
 # ─── preload reference embeddings ───────────────────────
 REF_DIR.mkdir(exist_ok=True)
 _refs = {}
 for p in REF_DIR.glob("*.[jp][pn]g"):
-    img = cv2.imread(str(p))
-    f   = _face.get(img)
-    if f:
-        e = f[0].embedding
-        _refs[p.stem] = e/np.linalg.norm(e)
+    e = _embedder.embed(cv2.imread(str(p)))
+    if e is not None:
+        _refs[p.stem] = e
 print("Loaded reference photos:", list(_refs.keys()))
 
-# ─── state (single user) ─────────────────────────────────
-_ps = {
-    "last_center": time.time(),
-    "warned"     : False,
-    "warning_time": 0.0,
-    "blink_ctr"  : 0,
-    "blinks"     : 0,
-    "fps_hist"   : deque(maxlen=FPS_BUF),
-    "active"     : False    # toggled True after successful verify
-}
+# ─── state (per session) ────────────────────────────────
+class SessionLimitError(RuntimeError):
+    """Raised when a new session would exceed MAX_SESSIONS"""
+
+def _new_state():
+    return {
+        "last_center": time.time(),
+        "warned"     : False,
+        "warning_time": 0.0,
+        "blink_ctr"  : 0,
+        "blinks"     : 0,
+        "fps_hist"   : deque(maxlen=FPS_BUF),
+        "active"     : False,   # toggled True after successful verify
+        "lm"         : LandmarkBuffer(max_faces=1),
+        "mesh"       : None,    # pooled graph it last ran on
+        "ended"      : False,
+        "lock"       : threading.Lock(),
+        "seen"       : time.monotonic()
+    }
+
+def _close(st):
+    # waits for a frame still being analysed on this session
+    with st["lock"]:
+        st["ended"] = True
+        _meshes.forget(st)
+
+class SessionStore:
+    """Session id -> state, least recently seen first.
+
+    Sessions idle for ``idle_sec`` are dropped on the next lookup; a new
+    session beyond ``max_sessions`` raises SessionLimitError. Dropped
+    sessions give up their claim on a mesh once a frame in progress finishes.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, idle_sec=SESSION_IDLE_SEC):
+        self.max_sessions = max_sessions
+        self.idle_sec     = idle_sec
+        self._states = OrderedDict()
+        self._lock   = threading.Lock()
+
+    def get(self, sid):
+        now, idle = time.monotonic(), []
+        try:
+            with self._lock:
+                while self._states:
+                    oldest = next(iter(self._states.values()))
+                    if now - oldest["seen"] <= self.idle_sec: break
+                    idle.append(self._states.popitem(last=False)[1])
+                st = self._states.get(sid)
+                if st is None:
+                    if len(self._states) >= self.max_sessions:
+                        raise SessionLimitError(f"{self.max_sessions} sessions already open")
+                    st = self._states[sid] = _new_state()
+                else:
+                    self._states.move_to_end(sid)
+                st["seen"] = now
+                return st
+        finally:
+            for old in idle: _close(old)
+
+    def drop(self, sid):
+        with self._lock:
+            st = self._states.pop(sid, None)
+        if st is not None: _close(st)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._states)
+
+_sessions = SessionStore()
 
 # ─── public api ──────────────────────────────────────────
-def verify_user(b64):
-    img   = _decode_b64(b64)
-    faces = _face.get(img)
-    if not faces:
+def end_session(sid):
+    _sessions.drop(sid)
+
+def verify_user(sid, img):
+    st    = _sessions.get(sid)
+    img   = _decode(img)
+    emb   = _embedder.embed(img)
+    if emb is None:
         return False, {"message": "No face detected."}
-    emb = faces[0].embedding / np.linalg.norm(faces[0].embedding)
 
     best, name = 0.0, "Unknown"
     for n, ref in _refs.items():
@@ -84,60 +244,68 @@ def verify_user(b64):
             best, name = s, n
 
     if best >= EMB_THRESH:
-        _ps.update({"active": True, "last_center": time.time()})
+        with st["lock"]:
+            st.update({"active": True, "last_center": time.time()})
         return True, {"person": name, "score": f"{best:.2f}"}
     return False, {"message": f"Closest match: {name} ({best:.2f})"}
 
-def analyse_frame(b64):
-    bgr  = _decode_b64(b64)
+def analyse_frame(sid, img):
+    bgr  = _decode(img)
+    while True:
+        st = _sessions.get(sid)
+        with st["lock"]:
+            # ended between lookup and lock: the next lookup opens it afresh
+            if not st["ended"]:
+                return _analyse(st, bgr)
+
+def _analyse(st, bgr):
     h,w  = bgr.shape[:2]
     t0   = time.time()
 
     # ------ MediaPipe inference ------
-    res  = _mesh.process(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+    rgb  = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    rgb.flags.writeable = False
+    mesh = _meshes.acquire(st)
+    try:
+        res = mesh.graph.process(rgb)
+    finally:
+        _meshes.release(mesh)
     gazeL = gazeR = "--"; ear_val = 0
     status = "OK"; msg = ""; beep = False
 
     if res.multi_face_landmarks:
-        lm = res.multi_face_landmarks[0].landmark
-        eL = np.array([[lm[i].x*w, lm[i].y*h] for i in L_EYE])
-        eR = np.array([[lm[i].x*w, lm[i].y*h] for i in R_EYE])
-        iL = np.array([[lm[i].x*w, lm[i].y*h] for i in L_IRIS]).mean(0)
-        iR = np.array([[lm[i].x*w, lm[i].y*h] for i in R_IRIS]).mean(0)
-
-        ear_val = (_ear(eL)+_ear(eR))/2
-        if ear_val < BLINK_EAR_THR: _ps["blink_ctr"] += 1
+        pts = st["lm"].fill(res.multi_face_landmarks, w, h)[0]
+        ear_val = float(eye_aspect_ratios(pts, EYES).mean())
+        if ear_val < BLINK_EAR_THR: st["blink_ctr"] += 1
         else:
-            if _ps["blink_ctr"] >= BLINK_CONSEC_FR: _ps["blinks"] += 1
-            _ps["blink_ctr"] = 0
+            if st["blink_ctr"] >= BLINK_CONSEC_FR: st["blinks"] += 1
+            st["blink_ctr"] = 0
 
-        gazeL = _dir(_g_ratio(iL, eL[0], eL[3]))
-        gazeR = _dir(_g_ratio(iR, eR[0], eR[3]))
+        gazeL, gazeR = map(_dir, gaze_ratios(pts, EYES, IRISES))
 
         # drawing
-        for poly in (eL,eR):
-            cv2.polylines(bgr,[poly.astype(int)],True,(0,255,0),1)
-        cv2.circle(bgr, tuple(iL.astype(int)),2,(0,255,0),-1)
-        cv2.circle(bgr, tuple(iR.astype(int)),2,(0,255,0),-1)
+        cv2.polylines(bgr, list(pts[EYES, :2].astype(np.int32)), True, (0,255,0), 1)
+        for iris in iris_centers(pts, IRISES).astype(int):
+            cv2.circle(bgr, tuple(iris),2,(0,255,0),-1)
 
     both_center = gazeL==gazeR=="CENTER"
     if both_center:
-        _ps["last_center"] = time.time(); _ps["warned"] = False
+        st["last_center"] = time.time(); st["warned"] = False
     else:
-        away = time.time()-_ps["last_center"]
+        away = time.time()-st["last_center"]
         if away > AWAY_GRACE_SEC:
             status="WARNING"; msg="LOOK BACK OR EXAM WILL CLOSE!"
-            if not _ps["warned"]:
-                _ps["warned"]=True; _ps["warning_time"]=time.time(); beep=True
-            if time.time()-_ps["warning_time"]>EXIT_DELAY_SEC:
-                status="TERMINATE"; msg="Focus lost too long. Exam terminated."; _ps["active"]=False
+            if not st["warned"]:
+                st["warned"]=True; st["warning_time"]=time.time(); beep=True
+            if time.time()-st["warning_time"]>EXIT_DELAY_SEC:
+                status="TERMINATE"; msg="Focus lost too long. Exam terminated."; st["active"]=False
 
     # HUD overlay
-    _ps["fps_hist"].append(time.time()-t0)
-    fps = 1/(np.mean(_ps["fps_hist"]) or 1)
+    st["fps_hist"].append(time.time()-t0)
+    fps = 1/(np.mean(st["fps_hist"]) or 1)
     cv2.putText(bgr,f"FPS:{fps:.1f}", (10,30), cv2.FONT_HERSHEY_SIMPLEX,1,(0,255,0),2)
     cv2.putText(bgr,f"EAR:{ear_val:.2f}",(10,70), cv2.FONT_HERSHEY_SIMPLEX,1,(0,0,255),2)
-    cv2.putText(bgr,f"Blinks:{_ps['blinks']}",(10,110), cv2.FONT_HERSHEY_SIMPLEX,1,(255,255,0),2)
+    cv2.putText(bgr,f"Blinks:{st['blinks']}",(10,110), cv2.FONT_HERSHEY_SIMPLEX,1,(255,255,0),2)
     cv2.putText(bgr,f"R:{gazeR}",(10,180), cv2.FONT_HERSHEY_SIMPLEX,1,(255,0,255),2)
     cv2.putText(bgr,f"L:{gazeL}",(10,250), cv2.FONT_HERSHEY_SIMPLEX,1,(255,0,255),2)
     if status=="WARNING":
@@ -151,7 +319,7 @@ def analyse_frame(b64):
     return {
         "frame"   : frame_url,
         "gaze"    : gaze_dir,
-        "blinks"  : _ps["blinks"],
+        "blinks"  : st["blinks"],
         "status"  : status,
         "message" : msg,
         "playBeep": beep
@@ -23,10 +23,13 @@ export default function FaceVerification() {
     canvas.height = videoRef.current.videoHeight;
     canvas.getContext('2d')!.drawImage(videoRef.current, 0, 0);
 
+    const jpeg = await new Promise<Blob | null>((resolve) =>
+      canvas.toBlob(resolve, 'image/jpeg', 0.8)
+    );
     const res = await fetch('/verify_api', {
       method: 'POST',
-      headers: { 'Content-Type': 'application/x-www-form-urlencoded' },
-      body: 'image=' + encodeURIComponent(canvas.toDataURL('image/jpeg', 0.8)),
+      headers: { 'Content-Type': 'image/jpeg' },
+      body: jpeg,
     });
     const json = await res.json();
     if (json.ok) {
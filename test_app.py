@@ -1,13 +1,30 @@
-from flask import Flask, jsonify, request, render_template
+from flask import Flask, Response, jsonify, request, render_template, stream_with_context
 from flask_cors import CORS
+from code_execution.complexity import ComplexityGrader
 from code_execution.executor import CodeExecutor
+from code_execution.jobs import JobScheduler, QueueFullError
+from code_execution.problem_listing import ListingError, ProblemListing
 from code_execution.problems import ProblemsDatabase
+from code_execution.result_cache import ResultCache
+from code_execution.run_control import RunOptionsError, parse_run_options
+from code_execution.sandbox import SandboxManager, parse_uid_range
+import json
 import os
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
-code_executor = CodeExecutor()
+result_cache = ResultCache()
 problems_db = ProblemsDatabase()
+# Required when running as root: submissions are switched to this account, or
+# to a uid of their own per working directory from EVALEDGE_SANDBOX_UIDS
+sandbox = SandboxManager(user=os.environ.get('EVALEDGE_SANDBOX_USER', 'nobody'),
+                         uids=parse_uid_range(os.environ.get('EVALEDGE_SANDBOX_UIDS', '2000000-2000999')))
+code_executor = CodeExecutor(worker_pool_size=4, result_cache=result_cache, problems_db=problems_db,
+                             sandbox=sandbox, time_budget=120)
+problems_db.add_change_listener(result_cache.invalidate_problem)
+job_scheduler = JobScheduler(code_executor, max_concurrency=4)
+complexity_grader = ComplexityGrader(code_executor, problems_db)
+problem_listing = ProblemListing(problems_db)
 
 @app.route('/')
 def home():
@@ -16,12 +33,38 @@ def home():
 # Code Execution Endpoints
 @app.route('/api/problems', methods=['GET'])
 def get_problems():
-    """Get all available coding problems"""
+    """List problems, with optional field projection, filters and pagination
+    
+    Query parameters: fields (comma-separated), difficulty, tag, page, per_page.
+    Test cases are limited to the samples.
+    """
     try:
-        problems = problems_db.get_all_problems()
-        return jsonify({"problems": problems}), 200
+        payload = problem_listing.get(
+            ProblemListing.parse_fields(request.args.get('fields')),
+            difficulty=request.args.get('difficulty'),
+            tag=request.args.get('tag'),
+            page=request.args.get('page', type=int),
+            per_page=request.args.get('per_page', type=int)
+        )
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    
+    # The payload is precomputed: serve it gzipped when the client accepts
+    # that, and not at all when the client's copy is still current
+    use_gzip = request.accept_encodings['gzip'] > 0
+    etag = payload.etag + ('-gzip' if use_gzip else '')
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(payload.gzipped() if use_gzip else payload.body, mimetype='application/json')
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/problems/<problem_id>', methods=['GET'])
 def get_problem(problem_id):
@@ -30,7 +73,7 @@ def get_problem(problem_id):
         problem = problems_db.get_problem(problem_id)
         if not problem:
             return jsonify({"error": "Problem not found"}), 404
-        return jsonify({"problem": problem}), 200
+        return jsonify({"problem": problems_db.public_view(problem)}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -61,14 +104,79 @@ def execute_code():
         if not test_cases:
             return jsonify({"error": "No test cases found for this problem"}), 404
         
-        # Execute code
-        result = code_executor.execute_code(code, language, test_cases, problem_id)
+        # Execute code; performance mode times scaled inputs instead
+        if data.get('mode') == 'performance':
+            result = complexity_grader.grade(code, language, problem_id)
+        else:
+            fail_fast, time_budget = parse_run_options(data)
+            result = code_executor.execute_code(code, language, test_cases, problem_id,
+                                                test_set_version=problems_db.get_test_set_version(problem_id),
+                                                fail_fast=fail_fast, time_budget=time_budget)
         
-        return jsonify(result), 200
+        # 503 tells the client to retry when the sandbox pool is saturated
+        return jsonify(result), 503 if result.get('busy') else 200
         
+    except RunOptionsError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/execute/stream', methods=['POST'])
+def execute_code_stream():
+    """Execute code and stream each test result as soon as it finishes
+    
+    Sends Server-Sent Events, or one JSON object per line when the client
+    accepts application/x-ndjson: a "start" event with the number of tests,
+    a "result" event per test, then "done" with the score (or
+    "compile_error" / "error"). Closing the connection cancels the run.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    
+    required_fields = ['code', 'language', 'problem_id']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({"error": f"Missing required field: {field}"}), 400
+    
+    # Same test cases as /api/execute, or /api/run-sample with "sample": true
+    problem_id = data['problem_id']
+    if data.get('sample'):
+        test_cases = problems_db.get_sample_test_cases(problem_id)
+        test_set_version = None
+    else:
+        test_cases = problems_db.get_test_cases(problem_id)
+        test_set_version = problems_db.get_test_set_version(problem_id)
+    if not test_cases:
+        return jsonify({"error": "No test cases found for this problem"}), 404
+    try:
+        fail_fast, time_budget = parse_run_options(data)
+    except RunOptionsError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    events = code_executor.stream_code(data['code'], data['language'], test_cases, problem_id,
+                                       test_set_version=test_set_version,
+                                       fail_fast=fail_fast, time_budget=time_budget)
+    ndjson = request.accept_mimetypes.best_match(['text/event-stream', 'application/x-ndjson']) == 'application/x-ndjson'
+    
+    def generate():
+        yield stream_line('start', {"total_tests": len(test_cases)}, ndjson)
+        for event, payload in events:
+            if event == 'ping':
+                yield "\n" if ndjson else ": ping\n\n"  # Keeps idle connections open
+            else:
+                yield stream_line(event, payload, ndjson)
+    
+    return Response(stream_with_context(generate()),
+                    mimetype='application/x-ndjson' if ndjson else 'text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def stream_line(event, data, ndjson):
+    """Format one streamed event as an NDJSON line or an SSE message"""
+    if ndjson:
+        return json.dumps({"event": event, "data": data}) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @app.route('/api/run-sample', methods=['POST'])
 def run_sample():
     """Run code with sample input only"""
@@ -84,24 +192,95 @@ def run_sample():
         language = data['language']
         problem_id = data['problem_id']
         
-        # Get only the first test case as sample
-        test_cases = problems_db.get_test_cases(problem_id)
+        # Only the sample test cases, the ones candidates can see
+        sample_test = problems_db.get_sample_test_cases(problem_id)
+        if not sample_test:
+            return jsonify({"error": "No test cases found for this problem"}), 404
+        
+        # "fail_fast": "first_fail" stops at the first failing case
+        fail_fast, time_budget = parse_run_options(data)
+        result = code_executor.execute_code(code, language, sample_test, problem_id,
+                                            fail_fast=fail_fast, time_budget=time_budget)
+        
+        # 503 tells the client to retry when the sandbox pool is saturated
+        return jsonify(result), 503 if result.get('busy') else 200
+        
+    except RunOptionsError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Asynchronous Execution Endpoints
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Queue code for execution and return a job id immediately"""
+    try:
+        data = request.get_json()
+        
+        required_fields = ['code', 'language', 'problem_id']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({"error": f"Missing required field: {field}"}), 400
+        
+        test_cases = problems_db.get_test_cases(data['problem_id'])
         if not test_cases:
             return jsonify({"error": "No test cases found for this problem"}), 404
+        test_set_version = problems_db.get_test_set_version(data['problem_id'])
+        if data.get('sample'):
+            test_cases = problems_db.get_sample_test_cases(data['problem_id'])  # Same as /api/run-sample
+            test_set_version = None
         
-        sample_test = [test_cases[0]]  # Only run first test case
-        result = code_executor.execute_code(code, language, sample_test, problem_id)
+        # Jobs are queued fairly per candidate, identified by the server: a
+        # client-supplied id would let one client take a turn per id
+        candidate_id = request.remote_addr
+        fail_fast, time_budget = parse_run_options(data)
+        job = job_scheduler.submit(candidate_id, data['code'], data['language'], test_cases, data['problem_id'],
+                                   fail_fast=fail_fast, time_budget=time_budget,
+                                   test_set_version=test_set_version)
         
-        return jsonify(result), 200
+        return jsonify({"job_id": job.id, "status": job.status}), 202
         
+    except RunOptionsError as e:
+        return jsonify({"error": str(e)}), 400
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get the status and the test results finished so far"""
+    job = job_scheduler.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+@app.route('/api/jobs/<job_id>/stream', methods=['GET'])
+def stream_job(job_id):
+    """Stream test results as Server-Sent Events as they finish"""
+    job = job_scheduler.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    
+    def generate():
+        for event, data in job.events():
+            if event == 'ping':
+                yield ": ping\n\n"  # SSE comment keeps idle connections open
+            else:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 if __name__ == '__main__':
     print("Starting EvalEdge Code Execution Server...")
     print("Available endpoints:")
-    print("- GET /api/problems - Get all problems")
+    print("- GET /api/problems - List problems (?fields=, difficulty=, tag=, page=, per_page=)")
     print("- GET /api/problems/<id> - Get specific problem")
-    print("- POST /api/execute - Execute code with all test cases")
+    print("- POST /api/execute - Execute code with all test cases (\"mode\": \"performance\" grades growth on scaled inputs)")
+    print("- POST /api/execute/stream - Execute code, streaming each test result (SSE or NDJSON)")
     print("- POST /api/run-sample - Execute code with sample test case")
+    print("- POST /api/jobs - Queue code for execution, returns a job id")
+    print("- GET /api/jobs/<id> - Poll job status and results")
+    print("- GET /api/jobs/<id>/stream - Stream job results (SSE)")
     app.run(debug=True, port=5001)
@@ -5,6 +5,11 @@ Test script to verify code execution functionality
 
 import requests
 import json
+import os
+import tempfile
+
+from code_execution.problem_listing import ProblemListing
+from code_execution.problems import ProblemsDatabase
 
 # Test the code execution API
 API_BASE = "http://localhost:5001"
@@ -157,6 +162,29 @@ function solution(nums, target) {
     except Exception as e:
         print(f"❌ Sample test error: {e}")
 
+def test_listing_sees_other_process_changes():
+    """Test that a cached listing is dropped when another store writes the same file"""
+    print("\n🧪 Testing: Listing picks up changes from another process")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "problems.sqlite3")
+        # Two stores on one file stand in for two Flask workers
+        server = ProblemsDatabase(path, reload_interval=0)
+        importer = ProblemsDatabase(path, reload_interval=0)
+        listing = ProblemListing(server)
+        
+        before = listing.get()
+        assert listing.get() is before, "listing should be served from its cache"
+        
+        problem = dict(importer.get_problem("two_sum"), title="Two Sum (revised)")
+        importer.add_problem(problem)
+        
+        after = listing.get()
+        titles = [p["title"] for p in json.loads(after.body)["problems"]]
+        assert after.etag != before.etag, "stale listing served after another store changed the file"
+        assert "Two Sum (revised)" in titles
+        print("✅ Listing was rebuilt with the other store's change")
+
 if __name__ == "__main__":
     print("🚀 EvalEdge Code Execution Tests")
     print("=" * 50)
@@ -165,6 +193,7 @@ if __name__ == "__main__":
     test_execute_two_sum()
     test_execute_wrong_solution()
     test_sample_execution()
+    test_listing_sees_other_process_changes()
     
     print("\n✨ Tests completed!")
     print("\nTo run the frontend:")
@@ -1,12 +1,20 @@
-import base64, cv2, numpy as np, os
+import cv2, json, numpy as np, os
 from pathlib import Path
 from flask import Blueprint, request, jsonify, send_from_directory
 from werkzeug.utils import safe_join
 from flask_cors import CORS
 from insightface.app import FaceAnalysis
+from proctoring.batching import FaceEmbedder
+from proctoring.frames import decode_image, request_image
+
+try:
+    from flask_sock import Sock
+except ImportError:  # WebSocket frame stream is optional
+    Sock = None
 
 verify_bp = Blueprint('verify_bp', __name__, static_folder="static", static_url_path="/")
 CORS_orig = CORS  # Save reference to CORS for use in main app if needed
+sock = Sock() if Sock else None  # main app calls sock.init_app(app)
 
 REF_DIR     = "reference"
 EMB_THRESH  = 0.60
@@ -20,15 +28,14 @@ def serve_spa():
     return send_from_directory(STATIC_DIR, 'index.html')
 
 # ---------- InsightFace setup ----------
-face_app = FaceAnalysis(providers=["CPUExecutionProvider"])
+face_app = FaceAnalysis(providers=["CPUExecutionProvider"],
+                        allowed_modules=["detection", "recognition"])
 face_app.prepare(ctx_id=0, det_size=(640, 640))
+# Concurrent requests share one batched recognition run
+embedder = FaceEmbedder(face_app)
 
 def get_emb(bgr):
-    faces = face_app.get(bgr)
-    if not faces:
-        return None
-    emb = faces[0].embedding
-    return emb / np.linalg.norm(emb)
+    return embedder.embed(bgr)
 
 # ---------- preload reference embeddings ----------
 reference = {}
@@ -39,26 +46,42 @@ for img_p in Path(REF_DIR).glob("*.[jp][pn]g"):
         reference[img_p.name] = emb
 print("Loaded reference:", list(reference))
 
-@verify_bp.route("/verify_api", methods=["POST"])
-def verify_api():
+def verify(img):
+    """img: encoded JPEG/WebP bytes or a base64 data URL"""
     try:
-        data_url = request.form["image"].split(",")[1]
-        bgr = cv2.imdecode(
-            np.frombuffer(base64.b64decode(data_url), np.uint8), cv2.IMREAD_COLOR
-        )
+        bgr = decode_image(img)
+        if bgr is None:
+            return dict(ok=False, msg="Could not decode image")
         emb = get_emb(bgr)
         if emb is None:
-            return jsonify(ok=False, msg="No face detected")
+            return dict(ok=False, msg="No face detected")
         best, name = 0.0, "Unknown"
         for n, ref in reference.items():
             score = float(np.dot(ref, emb))
             if score > best:
                 best, name = score, n
         if best >= EMB_THRESH:
-            return jsonify(ok=True, person=name, score=best)
-        return jsonify(ok=False, msg="No match", closest=name, score=best)
+            return dict(ok=True, person=name, score=best)
+        return dict(ok=False, msg="No match", closest=name, score=best)
     except Exception as e:
-        return jsonify(ok=False, msg=str(e))
+        return dict(ok=False, msg=str(e))
+
+@verify_bp.route("/verify_api", methods=["POST"])
+def verify_api():
+    """Body: the raw image (image/jpeg, image/webp, ...), a multipart
+    ``image`` file, or the legacy ``image`` form field as a data URL"""
+    try:
+        img = request_image(request)
+    except KeyError:
+        return jsonify(ok=False, msg="No image in request")
+    return jsonify(verify(img))
+
+if sock:
+    @sock.route("/verify_ws", bp=verify_bp)
+    def verify_ws(ws):
+        # Each binary message is one encoded frame; each reply is verify_api's JSON
+        while True:
+            ws.send(json.dumps(verify(ws.receive())))
 
 @verify_bp.route("/api/problems", methods=["GET"])
 def get_problems():